@@ -4,7 +4,7 @@
 #                                                                          
 # PROGRAMMER: Chaklader A. Arefe
 # DATE CREATED: 08/03/2024
-# REVISED DATE: 08/03/2024
+# REVISED DATE: 10/18/2026
 # PURPOSE: Create a function adjust_results4_isadog that adjusts the results 
 #          dictionary to indicate whether or not the pet image label is of-a-dog, 
 #          and to indicate whether or not the classifier image label is of-a-dog.
@@ -17,9 +17,26 @@
 #          could also read all the dog names into a list and then if the label
 #          is found to exist within this list - the label is of-a-dog, otherwise
 #          the label isn't of a dog. 
+#          Because the top-k predictions are stored with the results, the
+#          classifier label can also count as of-a-dog when any dog is among
+#          the top-k predictions, and predictions below a confidence threshold
+#          can be ignored, all without running the model again.
+#          The dog names are looked up in a compiled DogNameIndex (see
+#          dog_names.py) that resolves each comma separated alias on its own
+#          and is built only once per process. The classifier's predictions
+#          are classified as dogs with the precomputed ImageNet ClassTable
+#          (see class_table.py) as one array lookup over the predicted class
+#          ids of all images.
 ##
 
-def adjust_results4_isadog(results_dic, dogfile):
+import numpy as np
+
+from class_table import get_class_table
+from dog_names import load_dog_index
+from results_store import ResultsStore
+
+def adjust_results4_isadog(results_dic, dogfile, dog_in_topk=False,
+                           min_confidence=0.0, dog_index_file=None):
     """
     Adjusts the results dictionary to determine if classifier correctly 
     classified images 'as a dog' or 'not a dog' especially when not a match. 
@@ -32,12 +49,16 @@ def adjust_results4_isadog(results_dic, dogfile):
                   index 1 = classifier label (string)
                   index 2 = 1/0 (int)  where 1 = match between pet image
                     and classifer labels and 0 = no match between labels
+                  last index = top-k predictions (list) of (class index,
+                    classifier label, probability) tuples, optional
                 ------ where index 3 & index 4 are added by this function -----
+                ------ (inserted ahead of the top-k predictions) -----
                  NEW - index 3 = 1/0 (int)  where 1 = pet image 'is-a' dog and 
                             0 = pet Image 'is-NOT-a' dog. 
                  NEW - index 4 = 1/0 (int)  where 1 = Classifier classifies image 
                             'as-a' dog and 0 = Classifier classifies image  
                             'as-NOT-a' dog.
+                    A ResultsStore gets both flags set as whole columns.
      dogfile - A text file that contains names of all dogs from the classifier
                function and dog names from the pet image files. This file has 
                one dog name per line dog names are all in lowercase with 
@@ -46,15 +67,50 @@ def adjust_results4_isadog(results_dic, dogfile):
                by commas when a particular breed of dog has multiple dog names 
                associated with that breed (ex. maltese dog, maltese terrier, 
                maltese) (string - indicates text file's filename)
+     dog_in_topk - True classifies the image 'as-a' dog when any of the top-k
+               predictions is a dog, False only looks at the classifier
+               label (default) (bool)
+     min_confidence - Predictions with a lower probability don't count as
+               classifying the image 'as-a' dog, 0.0 counts every prediction
+               (default) (float)
+     dog_index_file - Optional binary file the compiled dog name index is
+               loaded from, or written to when it's missing or out of date
+               (string)
     Returns:
            None - results_dic is mutable data type so no return needed.
     """
-    dog_names = set()
+    dog_names = load_dog_index(dogfile, dog_index_file)
+    table = get_class_table(dog_names)
     
-    with open(dogfile, 'r') as f:
-        dog_names = {line.strip() for line in f if line.strip()}
+    if isinstance(results_dic, ResultsStore):
+        # is-dog of every distinct pet label, then gathered by label id
+        label_is_dog = np.array([label in dog_names for label in results_dic.pool.labels],
+                                dtype=np.uint8)
+        n_candidates = None if dog_in_topk else 1
+        results_dic.set_dog_flags(
+            label_is_dog[results_dic.column('pet_label')],
+            table.classified_as_dog(results_dic.column('topk_ids')[:, :n_candidates],
+                                    results_dic.column('topk_probs')[:, :n_candidates],
+                                    min_confidence))
+        return
+    
+    # predictions of all images with top-k results as (images x k) arrays
+    with_topk = [key for key, value in results_dic.items() if len(value) > 3]
+    classified_as_dog = {}
+    if with_topk:
+        n_candidates = None if dog_in_topk else 1
+        topk_ids = np.array([[class_id for class_id, _, _ in results_dic[key][3][:n_candidates]]
+                             for key in with_topk])
+        topk_probs = np.array([[prob for _, _, prob in results_dic[key][3][:n_candidates]]
+                               for key in with_topk])
+        classified_as_dog = dict(zip(with_topk, table.classified_as_dog(
+            topk_ids, topk_probs, min_confidence).tolist()))
     
     for key, value in results_dic.items():
         pet_label_is_dog = int(value[0] in dog_names)
-        classifier_label_is_dog = int(value[1] in dog_names)
-        value.extend((pet_label_is_dog, classifier_label_is_dog))
\ No newline at end of file
+        classifier_label_is_dog = classified_as_dog.get(key)
+        if classifier_label_is_dog is None:
+            classifier_label_is_dog = int(value[1] in dog_names)
+
+        # inserted ahead of the top-k predictions so they stay at index 3 & 4
+        value[3:3] = (pet_label_is_dog, classifier_label_is_dog)
\ No newline at end of file
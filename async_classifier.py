@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND-revision/intropyproject-classify-pet-images/async_classifier.py
+#
+# PROGRAMMER: Chaklader A. Arefe
+# DATE CREATED: 10/18/2026
+# REVISED DATE: 10/18/2026
+# PURPOSE: asyncio API of the classifier for services running an event loop.
+#          Calling classifier() from a coroutine blocks the loop for the whole
+#          decode and forward pass, with this API the images are decoded on a
+#          thread pool and the pending awaits of all coroutines are coalesced
+#          into batched forward passes by the micro-batchers of a
+#          ClassificationService (see classification_server.py), so the loop
+#          stays free. A semaphore caps the number of images in flight
+#          (backpressure): beyond max_pending, classify waits and
+#          classify_stream stops pulling paths until some images are done.
+#
+#   Example:
+#    result = await classify_async('pet_images/Beagle_01141.jpg', 'vgg')
+#    async for path, result in classify_stream(paths, 'vgg'):
+#        ...
+##
+
+import asyncio
+import os
+import threading
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from classification_server import ClassificationService
+from get_pet_labels import create_pet_label
+
+class AsyncClassifier:
+    """
+    Classifies images from coroutines without blocking the event loop.
+    Attributes:
+     service - ClassificationService holding the models and micro-batchers
+     max_pending - Largest number of images being decoded or classified at
+                   the same time, further calls wait their turn (int)
+    """
+
+    def __init__(self, archs=('vgg',), decode_workers=4, max_pending=64,
+                 service=None, **service_args):
+        """
+        Parameters:
+         archs - Model architectures classifying the images (sequence of
+                 strings), ignored when a service is given
+         decode_workers - Number of threads decoding images (int)
+         max_pending - See the class attributes (int)
+         service - Optional ClassificationService to reuse
+         service_args - Keyword arguments of ClassificationService (ex.
+                 dogfile, topk, max_batch_size, max_wait)
+        """
+        self.service = service or ClassificationService(list(archs), **service_args)
+        self.max_pending = max_pending
+        self.decode_pool = ThreadPoolExecutor(max_workers=decode_workers,
+                                              thread_name_prefix='decode')
+        # one semaphore per event loop, an asyncio.Semaphore is bound to the
+        # loop it's first used on
+        self.semaphores = weakref.WeakKeyDictionary()
+        self.lock = threading.Lock()
+        self.n_pending = 0
+
+    @property
+    def pending(self):
+        """Number of images currently being decoded or classified (int)."""
+        return self.n_pending
+
+    def semaphore(self):
+        """Returns the semaphore of the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            if loop not in self.semaphores:
+                self.semaphores[loop] = asyncio.Semaphore(self.max_pending)
+            return self.semaphores[loop]
+
+    async def classify(self, path=None, data=None, archs=None, pet_label=None):
+        """
+        Classifies one image, given by its path or its bytes, see
+        ClassificationService.classify for the result. Waits while
+        max_pending images are already in flight.
+        """
+        archs = self.service.check_request(path, data, archs)
+        if pet_label is None and path is not None:
+            pet_label = create_pet_label(os.path.basename(path))
+
+        async with self.semaphore():
+            with self.lock:
+                self.n_pending += 1
+            try:
+                loop = asyncio.get_running_loop()
+                image = await loop.run_in_executor(self.decode_pool, self.service.decode,
+                                                   path, data)
+                futures = [asyncio.wrap_future(self.service.batchers[arch].submit(image))
+                           for arch in archs]
+                predictions = await asyncio.gather(*futures)
+            finally:
+                with self.lock:
+                    self.n_pending -= 1
+        return {'pet_label': pet_label,
+                'results': {arch: self.service.score(topk, pet_label)
+                            for arch, topk in zip(archs, predictions)}}
+
+    async def classify_stream(self, paths, archs=None, ordered=True):
+        """
+        Classifies the images of paths (an iterable or async iterable) and
+        yields (path, result) pairs. At most max_pending images are in flight,
+        paths are only pulled from the iterable as earlier images finish.
+        ordered=True yields in the order of paths, False as soon as each image
+        is done.
+        """
+        in_flight = deque()
+
+        async def next_done():
+            if ordered:
+                task = in_flight.popleft()
+                return await task
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            task = done.pop()
+            in_flight.remove(task)
+            return task.result()
+
+        async def classify_path(path):
+            return path, await self.classify(path, archs=archs)
+
+        try:
+            async for path in aiterate(paths):
+                if len(in_flight) >= self.max_pending:
+                    yield await next_done()
+                in_flight.append(asyncio.ensure_future(classify_path(path)))
+            while in_flight:
+                yield await next_done()
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    def close(self):
+        self.decode_pool.shutdown(wait=True)
+        self.service.close()
+
+async def aiterate(items):
+    """Iterates an iterable or an async iterable asynchronously."""
+    if hasattr(items, '__aiter__'):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+# one AsyncClassifier per model architecture, created the first time it's used
+# (as a future, so concurrent first calls from any event loop share it)
+async_classifiers = {}
+async_classifiers_lock = threading.Lock()
+# builds the AsyncClassifiers, loading a model would block the event loop
+builder = ThreadPoolExecutor(max_workers=1, thread_name_prefix='async-classifier')
+
+async def get_async_classifier(model_name):
+    """
+    Returns the (cached) AsyncClassifier of a model architecture, the first
+    call loads the model on a builder thread while the event loop runs on.
+    """
+    with async_classifiers_lock:
+        if model_name not in async_classifiers:
+            async_classifiers[model_name] = builder.submit(AsyncClassifier, (model_name,))
+        future = async_classifiers[model_name]
+    try:
+        return await asyncio.wrap_future(future)
+    except Exception:
+        # a later call tries again
+        with async_classifiers_lock:
+            if async_classifiers.get(model_name) is future:
+                del async_classifiers[model_name]
+        raise
+
+async def classify_async(img_path, model_name='vgg'):
+    """
+    Classifies a single image without blocking the event loop. Returns the
+    classifier label of the predicted class: its ImageNet label in lower
+    case and stripped, as in the results (classifier() returns it as is).
+    """
+    classifier = await get_async_classifier(model_name)
+    result = await classifier.classify(img_path)
+    return result['results'][model_name]['classifier_label']
+
+async def classify_stream(img_paths, model_name='vgg', ordered=True):
+    """
+    Classifies many images concurrently without blocking the event loop,
+    yields (path, result) pairs, see AsyncClassifier.classify_stream.
+    """
+    classifier = await get_async_classifier(model_name)
+    async for path, result in classifier.classify_stream(img_paths, ordered=ordered):
+        yield path, result['results'][model_name]
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND-revision/intropyproject-classify-pet-images/bench_classifier.py
+#
+# PROGRAMMER: Chaklader A. Arefe
+# DATE CREATED: 10/18/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Micro-benchmark of the per-image latency of the classifier. Compares
+#          the original per-call classifier (rebuilds the transforms, parses
+#          the torch version, calls model.eval() and runs the forward pass with
+#          autograd enabled on every call) to a prepared InferenceSession that
+#          does that setup once and runs forwards under torch.inference_mode().
+#
+# Usage: python bench_classifier.py --arch vgg --n 20
+##
+
+import argparse
+from os import listdir
+from time import perf_counter
+from statistics import median
+
+import torchvision.transforms as transforms
+from PIL import Image
+from torch import __version__
+
+from classifier import InferenceSession, imagenet_classes_dict, models
+
+def legacy_classifier(img_path, model_name):
+    """The per-call classifier as it was before InferenceSession existed."""
+    preprocess = transforms.Compose([
+        transforms.Resize(256),
+        transforms.CenterCrop(224),
+        transforms.ToTensor(),
+        transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
+    ])
+    img_tensor = preprocess(Image.open(img_path).convert('RGB'))
+    img_tensor.unsqueeze_(0)
+
+    pytorch_ver = __version__.split('.')
+    if int(pytorch_ver[0]) > 0 or int(pytorch_ver[1]) >= 4:
+        img_tensor.requires_grad_(False)
+
+    model = models[model_name].eval()
+    output = model(img_tensor)
+
+    return imagenet_classes_dict[output.data.numpy().argmax()]
+
+def time_per_image(classify, img_paths, repeat):
+    """Returns the latency (seconds) of every call of classify over img_paths."""
+    latencies = []
+    for _ in range(repeat):
+        for img_path in img_paths:
+            start = perf_counter()
+            classify(img_path)
+            latencies.append(perf_counter() - start)
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dir', type=str, default='pet_images/',
+                        help='path to folder of images')
+    parser.add_argument('--arch', type=str, default='vgg',
+                        help='chosen model')
+    parser.add_argument('--n', type=int, default=20,
+                        help='number of images to time')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='number of passes over the images')
+    parser.add_argument('--weights_dir', type=str, default='weights/',
+                        help='folder with the local pretrained weights files')
+    in_arg = parser.parse_args()
+
+    models.weights_dir = in_arg.weights_dir
+    img_paths = [in_arg.dir + f for f in sorted(listdir(in_arg.dir))
+                 if not f.startswith('.')][:in_arg.n]
+
+    session = InferenceSession(in_arg.arch)
+
+    # warm up both paths so one-time costs (weights, allocator) aren't timed
+    legacy_classifier(img_paths[0], in_arg.arch)
+    session.predict(img_paths[0])
+
+    legacy = time_per_image(lambda p: legacy_classifier(p, in_arg.arch),
+                            img_paths, in_arg.repeat)
+    prepared = time_per_image(session.predict, img_paths, in_arg.repeat)
+
+    print("\n*** Per-image latency for CNN Model Architecture {} ({} images) ***"
+          .format(in_arg.arch.upper(), len(legacy)))
+    print("{:20}: {:>10} {:>10}".format('', 'mean ms', 'median ms'))
+    for name, latencies in (('per-call classifier', legacy),
+                            ('InferenceSession', prepared)):
+        print("{:20}: {:10.2f} {:10.2f}".format(
+            name, 1000 * sum(latencies) / len(latencies), 1000 * median(latencies)))
+    print("{:20}: {:10.2f}x".format(
+        'speedup', sum(legacy) / sum(prepared)))
+
+if __name__ == "__main__":
+    main()
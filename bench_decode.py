@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND-revision/intropyproject-classify-pet-images/bench_decode.py
+#
+# PROGRAMMER: Chaklader A. Arefe
+# DATE CREATED: 10/18/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Compares the full decode of the pet images with the JPEG draft mode
+#          decode (see classifier.open_image) at several draft scales, and with
+#          reading the preprocessed images back from a tensor cache (see
+#          tensor_cache.py). For every draft scale it prints the decode and
+#          preprocess time, the largest and mean difference of the tensors from
+#          the full decode and the share of images whose top-1 prediction is
+#          unchanged. The tolerance is the largest share of changed top-1
+#          predictions accepted, the fastest draft scale within it is
+#          recommended for --jpeg_draft, and the exit status is 1 when no
+#          draft scale is within it.
+#
+# Usage: python bench_decode.py --dir pet_images/ --arch resnet --scales 1,1.5,2,3
+##
+
+import argparse
+import os
+import sys
+import tempfile
+from time import perf_counter
+
+import torch
+
+from classifier import get_session, load_image, models
+from tensor_cache import TensorCache
+
+def decode_all(img_paths, draft_scale, repeats):
+    """
+    Decodes and preprocesses every image repeats times. Returns the tensors
+    of the last pass stacked into one batch and the best seconds per pass.
+    """
+    best = None
+    for _ in range(repeats):
+        start = perf_counter()
+        batch = torch.stack([load_image(img_path, draft_scale=draft_scale)
+                             for img_path in img_paths])
+        seconds = perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return batch, best
+
+def read_cached(img_paths, batch_size, repeats):
+    """
+    Fills a temporary tensor cache with the images, then returns the best
+    seconds per pass of reading all of them back.
+    """
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = TensorCache(cache_dir)
+        for _ in cache.iter_batches(img_paths, batch_size, workers=0):
+            pass
+        best = None
+        for _ in range(repeats):
+            start = perf_counter()
+            for _, batch in cache.iter_batches(img_paths, batch_size, workers=0):
+                batch.sum()
+            seconds = perf_counter() - start
+            best = seconds if best is None else min(best, seconds)
+        cache.close()
+    return best
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dir', type=str, default='pet_images/',
+                        help='path to folder of images')
+    parser.add_argument('--arch', type=str, default='resnet',
+                        help='model the top-1 agreement is measured with')
+    parser.add_argument('--scales', type=str, default='1,1.5,2,3',
+                        help='comma separated draft scales')
+    parser.add_argument('--tolerance', type=float, default=0.025,
+                        help='largest share of images whose top-1 prediction may change')
+    parser.add_argument('--repeats', type=int, default=3,
+                        help='decode passes timed, the best one is reported')
+    parser.add_argument('--batch_size', type=int, default=32,
+                        help='number of images classified per forward pass')
+    parser.add_argument('--weights_dir', type=str, default='weights/',
+                        help='folder with the local pretrained weights files')
+    in_arg = parser.parse_args()
+
+    models.weights_dir = in_arg.weights_dir
+    session = get_session(in_arg.arch)
+    img_paths = sorted(os.path.join(in_arg.dir, filename)
+                       for filename in os.listdir(in_arg.dir)
+                       if not filename.startswith('.'))
+
+    def top1(batch):
+        return torch.cat([session.forward(batch[start:start + in_arg.batch_size]).argmax(dim=1)
+                          for start in range(0, len(batch), in_arg.batch_size)])
+
+    reference, reference_seconds = decode_all(img_paths, 0, in_arg.repeats)
+    reference_top1 = top1(reference)
+
+    print("\n*** Decode of {} Images (top-1 of {}, tolerance {:.1f}%) ***".format(
+        len(img_paths), in_arg.arch.upper(), 100.0 * in_arg.tolerance))
+    row = "{:14} {:>10} {:>9} {:>10} {:>10} {:>10}"
+    print(row.format('decode', 'ms/image', 'speedup', 'max diff', 'mean diff', 'same top1'))
+    print(row.format('full', "{:.2f}".format(1000.0 * reference_seconds / len(img_paths)),
+                     '1.00x', '-', '-', '100.0%'))
+
+    recommended = None
+    for scale in sorted(float(scale) for scale in in_arg.scales.split(',')):
+        batch, seconds = decode_all(img_paths, scale, in_arg.repeats)
+        difference = (batch - reference).abs()
+        same = (top1(batch) == reference_top1).double().mean().item()
+        within = 1.0 - same <= in_arg.tolerance
+        if within and (recommended is None or seconds < recommended[1]):
+            recommended = (scale, seconds)
+        print(row.format('draft {:g}'.format(scale),
+                         "{:.2f}".format(1000.0 * seconds / len(img_paths)),
+                         "{:.2f}x".format(reference_seconds / seconds),
+                         "{:.3f}".format(difference.max().item()),
+                         "{:.4f}".format(difference.mean().item()),
+                         "{:.1f}%{}".format(100.0 * same, '' if within else ' *')))
+
+    seconds = read_cached(img_paths, in_arg.batch_size, in_arg.repeats)
+    print(row.format('tensor cache', "{:.2f}".format(1000.0 * seconds / len(img_paths)),
+                     "{:.2f}x".format(reference_seconds / seconds), '0.000', '0.0000', '100.0%'))
+
+    if recommended is None:
+        print("\nNo draft scale within the tolerance (* = outside)")
+        sys.exit(1)
+    print("\nFastest draft scale within the tolerance: --jpeg_draft {:g}".format(recommended[0]))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND-revision/intropyproject-classify-pet-images/bench_precision.py
+#
+# PROGRAMMER: Chaklader A. Arefe
+# DATE CREATED: 10/18/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Compares the inference precisions of the classifier (fp32, bf16 and
+#          int8-dynamic, see classifier.py) on the pet images. For every model
+#          architecture and precision the images are classified, the results
+#          statistics are calculated with calculates_results_stats and printed
+#          as the change from fp32 next to the forward pass throughput and its
+#          gain over fp32, so the precision can be chosen per deployment.
+#
+# Usage: python bench_precision.py --dir pet_images/ --arch all
+##
+
+import argparse
+
+import torch
+
+from classifier import architectures, get_session, models, precisions
+from get_pet_labels import get_pet_labels
+from classify_images import classify_images
+from image_pipeline import PipelineTimer
+from adjust_results4_isadog import adjust_results4_isadog
+from calculates_results_stats import calculates_results_stats
+
+# statistics whose change from fp32 is reported
+REPORTED_STATS = ('pct_match', 'pct_correct_dogs', 'pct_correct_breed', 'pct_correct_notdogs')
+
+def run_precision(images_dir, arch, precision, batch_size, dogfile):
+    """
+    Classifies the images at a precision. Returns the results dictionary, its
+    results statistics and the images per second of the forward passes.
+    """
+    # first forward passes pay for one-time setup (kernels, packed weights)
+    get_session(arch, precision).forward(torch.zeros(batch_size, 3, 224, 224))
+
+    results = get_pet_labels(images_dir)
+    timer = PipelineTimer()
+    classify_images(images_dir, results, arch, batch_size, workers=1, timer=timer,
+                    precision=precision)
+    adjust_results4_isadog(results, dogfile)
+    return results, calculates_results_stats(results), len(results) / timer.inference
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dir', type=str, default='pet_images/',
+                        help='path to folder of images')
+    parser.add_argument('--arch', type=str, default='all',
+                        help='chosen models, a comma separated list or all')
+    parser.add_argument('--precisions', type=str, default=','.join(precisions),
+                        help='comma separated precisions, the first is the reference')
+    parser.add_argument('--batch_size', type=int, default=32,
+                        help='number of images classified per forward pass')
+    parser.add_argument('--dogfile', type=str, default='dognames.txt',
+                        help='text file that has dognames')
+    parser.add_argument('--weights_dir', type=str, default='weights/',
+                        help='folder with the local pretrained weights files')
+    in_arg = parser.parse_args()
+
+    models.weights_dir = in_arg.weights_dir
+    archs = list(architectures) if in_arg.arch == 'all' else in_arg.arch.split(',')
+    run_precisions = in_arg.precisions.split(',')
+
+    for arch in archs:
+        runs = {precision: run_precision(in_arg.dir, arch, precision,
+                                         in_arg.batch_size, in_arg.dogfile)
+                for precision in run_precisions}
+        reference_results, reference_stats, reference_speed = runs[run_precisions[0]]
+
+        print("\n*** Precision of CNN Model Architecture {} (change from {}) ***"
+              .format(arch.upper(), run_precisions[0]))
+        row = "{:14}" + " {:>10}" * 3 + " {:>19}" * len(REPORTED_STATS)
+        print(row.format('precision', 'images/s', 'speedup', 'same top1', *REPORTED_STATS))
+        for precision, (results, stats, speed) in runs.items():
+            same = sum(results[key][1] == reference_results[key][1] for key in results)
+            print(row.format(
+                precision, "{:.1f}".format(speed), "{:.2f}x".format(speed / reference_speed),
+                "{:.1f}%".format(100.0 * same / len(results)),
+                *("{:.1f}% ({:+.1f})".format(stats[key], stats[key] - reference_stats[key])
+                  for key in REPORTED_STATS)))
+
+if __name__ == "__main__":
+    main()
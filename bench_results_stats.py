@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND-revision/intropyproject-classify-pet-images/bench_results_stats.py
+#
+# PROGRAMMER: Chaklader A. Arefe
+# DATE CREATED: 10/18/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Benchmark of calculates_results_stats on a large synthetic results
+#          dictionary. Compares the original per-image loop (unpacks every
+#          result and updates dictionary counters) to the vectorized version,
+#          both from a results dictionary and from a ResultsStore's columns,
+#          and checks that every count and percentage agrees exactly.
+#
+# Usage: python bench_results_stats.py --n 1000000
+##
+
+import argparse
+from time import perf_counter
+
+import numpy as np
+
+from calculates_results_stats import add_percentages, calculates_results_stats
+from results_store import ResultsStore
+
+def legacy_results_stats(results_dic):
+    """calculates_results_stats as it was before the columnar version."""
+    stats = {
+        'n_dogs_img': 0,
+        'n_match': 0,
+        'n_correct_dogs': 0,
+        'n_correct_notdogs': 0,
+        'n_correct_breed': 0,
+        'n_images': len(results_dic)
+    }
+    has_topk = bool(results_dic) and all(len(result) > 5 for result in results_dic.values())
+    if has_topk:
+        stats['n_breed_in_topk'] = 0
+
+    for _, result in results_dic.items():
+        pet_label, _, label_match, is_dog, classified_as_dog = result[:5]
+        stats['n_match'] += label_match
+        if is_dog:
+            stats['n_dogs_img'] += 1
+            stats['n_correct_dogs'] += classified_as_dog
+            stats['n_correct_breed'] += (label_match and is_dog)
+            if has_topk:
+                stats['n_breed_in_topk'] += any(
+                    pet_label in label for _, label, _ in result[5])
+        else:
+            stats['n_correct_notdogs'] += (not classified_as_dog)
+
+    return add_percentages(stats)
+
+def synthetic_results(n_images, n_breeds=120, seed=0):
+    """
+    Returns a results dictionary (after adjust_results4_isadog) of n_images
+    random results and a ResultsStore holding the same results.
+    """
+    rng = np.random.default_rng(seed)
+    breeds = ['breed {}'.format(breed) for breed in range(n_breeds)] + ['cat', 'tiger']
+    pet_ids = rng.integers(0, len(breeds), n_images)
+    is_dog = pet_ids < n_breeds
+    match = rng.random(n_images) < 0.7
+    classified_as_dog = np.where(is_dog, rng.random(n_images) < 0.9,
+                                 rng.random(n_images) < 0.1)
+    pred_ids = np.where(match, pet_ids, rng.integers(0, len(breeds), n_images))
+
+    results_dic = {}
+    for row, (pet_id, pred_id, flags) in enumerate(zip(
+            pet_ids.tolist(), pred_ids.tolist(),
+            zip(match.tolist(), is_dog.tolist(), classified_as_dog.tolist()))):
+        results_dic['image_{:07d}.jpg'.format(row)] = [
+            breeds[pet_id], breeds[pred_id]] + [int(flag) for flag in flags]
+
+    store = ResultsStore(capacity=n_images)
+    for filename, value in results_dic.items():
+        store.add(filename, value[0])
+    store.set_predictions(list(results_dic), np.asarray(breeds, dtype=object)[pred_ids],
+                          match.astype(np.uint8), pred_ids[:, None],
+                          np.ones((n_images, 1), dtype=np.float32))
+    store.set_dog_flags(is_dog.astype(np.uint8), classified_as_dog.astype(np.uint8))
+    return results_dic, store
+
+def timed(function, *args):
+    """Returns the result of function(*args) and the seconds it took."""
+    start = perf_counter()
+    result = function(*args)
+    return result, perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--n', type=int, default=1000000,
+                        help='number of synthetic results')
+    in_arg = parser.parse_args()
+
+    results_dic, store = synthetic_results(in_arg.n)
+    # the store also holds (unused) top-k predictions, leave them out
+    store.topk_ids = None
+
+    legacy, legacy_time = timed(legacy_results_stats, results_dic)
+    from_dict, dict_time = timed(calculates_results_stats, results_dic)
+    from_store, store_time = timed(calculates_results_stats, store)
+
+    for name, stats in (('results dictionary', from_dict), ('ResultsStore', from_store)):
+        for key, value in legacy.items():
+            assert stats[key] == value, "{} {}: {} != {}".format(name, key, stats[key], value)
+    assert from_dict['confusion_matrix'] == from_store['confusion_matrix']
+    assert from_dict['breed_accuracy'] == from_store['breed_accuracy']
+
+    print("\n*** calculates_results_stats on {} results ***".format(in_arg.n))
+    print("{:30}: {:>10}".format('', 'seconds'))
+    for name, seconds in (('per-image loop', legacy_time),
+                          ('vectorized (dictionary)', dict_time),
+                          ('vectorized (ResultsStore)', store_time)):
+        print("{:30}: {:10.3f}".format(name, seconds))
+    print("{:30}: {:10.1f}x".format('speedup (ResultsStore)', legacy_time / store_time))
+    print("All counts and percentages agree.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND-revision/intropyproject-classify-pet-images/bench_suite.py
+#
+# PROGRAMMER: Chaklader A. Arefe
+# DATE CREATED: 10/18/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Reproducible benchmark suite of the classification pipeline.
+#          corpus - generates a synthetic image corpus offline: the pet images
+#                   replicated and perturbed (crop, flip, brightness, contrast,
+#                   JPEG quality) from a fixed seed and resized to a chosen
+#                   resolution, keeping the pet labels of their filenames.
+#          run    - runs check_images.py in a fresh process for every model
+#                   architecture, batch size and worker count over the corpus
+#                   and writes the results as JSON: end-to-end throughput,
+#                   the stage timings and per-image latency percentiles of
+#                   --profile json, the startup time (launch to main), the
+#                   cold start (launch to first prediction) and the peak RSS
+#                   of the process and of its worker processes.
+#          compare - compares two result files run by run and flags the
+#                   metrics that got worse by more than the threshold, the
+#                   exit status is 1 when any did.
+#
+# Use argparse Expected Call with <> indicating expected user input:
+#      python bench_suite.py corpus --corpus_dir <folder> --n_images <count>
+#             --resolution <longer side in pixels> --seed <random seed>
+#      python bench_suite.py run --corpus_dir <folder> --arch <models>
+#             --batch_sizes <list> --workers <list> --output <results file>
+#      python bench_suite.py compare <baseline file> <results file>
+#             --threshold <largest accepted change>
+#   Example call:
+#    python bench_suite.py run --n_images 200 --arch resnet,vgg --batch_sizes 16,32
+##
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+from time import strftime, time
+
+import numpy
+import torch
+import torchvision
+from PIL import Image, ImageEnhance, ImageOps
+
+from classifier import architectures
+
+# runs check_images.main in a fresh process, then records the launch-to-main
+# time and the peak RSS (kilobytes on Linux) of the process and its children
+RUNNER_SCRIPT = """
+import json, resource, sys, time
+import check_images
+main_start = time.time()
+sys.argv = {argv!r}
+check_images.main()
+with open({stats_file!r}, 'w') as f:
+    json.dump({{'startup_s': main_start - {launch!r},
+               'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               'worker_peak_rss_kb': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss}}, f)
+"""
+
+# metrics compared by compare, with True when higher is better
+COMPARED_METRICS = {
+    'images_per_sec': True,
+    'process_images_per_sec': True,
+    'startup_s': False,
+    'cold_start_s': False,
+    'latency_p50_ms': False,
+    'latency_p95_ms': False,
+    'latency_p99_ms': False,
+    'peak_rss_mb': False
+}
+
+def make_corpus(corpus_dir, source_dir='pet_images/', n_images=200, resolution=1024,
+                seed=0, quality=(75, 95)):
+    """
+    Writes a synthetic corpus of n_images JPEGs to corpus_dir, made from the
+    images of source_dir in turn with random perturbations drawn from seed and
+    resized so their longer side is resolution pixels. The filenames keep the
+    source's name (and so its pet label) with a serial number appended. An
+    existing corpus made with the same parameters is reused.
+    Returns:
+     manifest - Dictionary with the corpus parameters
+    """
+    manifest = {'source_dir': os.path.abspath(source_dir), 'n_images': n_images,
+                'resolution': resolution, 'seed': seed, 'quality': list(quality)}
+    manifest_path = os.path.join(corpus_dir, 'manifest.json')
+    if os.path.isfile(manifest_path):
+        with open(manifest_path) as f:
+            if json.load(f) == manifest:
+                return manifest
+
+    os.makedirs(corpus_dir, exist_ok=True)
+    for filename in os.listdir(corpus_dir):
+        if filename.lower().endswith('.jpg'):
+            os.remove(os.path.join(corpus_dir, filename))
+    sources = sorted(filename for filename in os.listdir(source_dir)
+                     if not filename.startswith('.'))
+
+    for serial in range(n_images):
+        source = sources[serial % len(sources)]
+        rng = random.Random(seed * 1000003 + serial)
+        image = Image.open(os.path.join(source_dir, source)).convert('RGB')
+
+        # random crop of 80-100% of each side
+        width, height = image.size
+        crop_w, crop_h = int(width * rng.uniform(0.8, 1.0)), int(height * rng.uniform(0.8, 1.0))
+        left, top = rng.randint(0, width - crop_w), rng.randint(0, height - crop_h)
+        image = image.crop((left, top, left + crop_w, top + crop_h))
+        if rng.random() < 0.5:
+            image = ImageOps.mirror(image)
+        image = ImageEnhance.Brightness(image).enhance(rng.uniform(0.8, 1.2))
+        image = ImageEnhance.Contrast(image).enhance(rng.uniform(0.8, 1.2))
+
+        scale = resolution / max(image.size)
+        image = image.resize((max(1, round(image.width * scale)),
+                              max(1, round(image.height * scale))), Image.BICUBIC)
+        stem = os.path.splitext(source)[0]
+        image.save(os.path.join(corpus_dir, '{}_s{:05d}.jpg'.format(stem, serial)),
+                   quality=rng.randint(*quality))
+
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def run_once(corpus_dir, arch, batch_size, workers, extra_args):
+    """
+    Runs check_images.py over the corpus in a fresh process. Returns the
+    measurements of the run (dict).
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        profile_file = os.path.join(tmp, 'profile.json')
+        stats_file = os.path.join(tmp, 'stats.json')
+        argv = ['check_images.py', '--dir', os.path.join(corpus_dir, ''), '--arch', arch,
+                '--batch_size', str(batch_size), '--workers', str(workers),
+                '--profile', 'json', '--profile_file', profile_file] + extra_args
+        launch = time()
+        subprocess.run([sys.executable, '-c', RUNNER_SCRIPT.format(
+            argv=argv, stats_file=stats_file, launch=launch)],
+            stdout=subprocess.DEVNULL, check=True)
+        process_s = time() - launch
+        with open(profile_file) as f:
+            profile = json.load(f)
+        with open(stats_file) as f:
+            stats = json.load(f)
+
+    latency = profile['latency_ms']
+    return {
+        'n_images': profile['n_images'],
+        'process_s': process_s,
+        'process_images_per_sec': profile['n_images'] / process_s,
+        'images_per_sec': profile['images_per_sec'],
+        'startup_s': stats['startup_s'],
+        'cold_start_s': (profile['cold_start_ms'] / 1e3 if profile['cold_start_ms'] is not None
+                         else None),
+        'latency_p50_ms': latency.get('p50'),
+        'latency_p95_ms': latency.get('p95'),
+        'latency_p99_ms': latency.get('p99'),
+        'stages_ms_per_image': {name: stage['ms_per_image']
+                                for name, stage in profile['stages'].items()},
+        'peak_rss_mb': stats['peak_rss_kb'] / 1024.0,
+        # children also include short-lived helpers started by the imports
+        'worker_peak_rss_mb': stats['worker_peak_rss_kb'] / 1024.0 if workers else None
+    }
+
+def run_suite(corpus_dir, archs, batch_sizes, worker_counts, repeats=1, extra_args=()):
+    """
+    Runs every combination of model architecture, batch size and worker
+    count repeats times, keeping the repeat with the median process time.
+    Returns the list of runs (dicts).
+    """
+    runs = []
+    for arch in archs:
+        for batch_size in batch_sizes:
+            for workers in worker_counts:
+                repeated = sorted((run_once(corpus_dir, arch, batch_size, workers,
+                                            list(extra_args))
+                                   for _ in range(repeats)),
+                                  key=lambda run: run['process_s'])
+                run = dict(arch=arch, batch_size=batch_size, workers=workers,
+                           **repeated[(len(repeated) - 1) // 2])
+                runs.append(run)
+                print("{:8} batch {:4d} workers {:2d}: {:8.2f} images/s {:8.2f} s startup "
+                      "{:8.1f} MB peak RSS".format(arch, batch_size, workers,
+                                                   run['images_per_sec'], run['startup_s'],
+                                                   run['peak_rss_mb']), flush=True)
+    return runs
+
+def environment():
+    """Describes the machine and the library versions of the runs (dict)."""
+    return {'python': platform.python_version(), 'platform': platform.platform(),
+            'cpu_count': os.cpu_count(), 'torch': torch.__version__,
+            'torchvision': torchvision.__version__, 'numpy': numpy.__version__,
+            'torch_threads': torch.get_num_threads()}
+
+def run_key(run):
+    return (run['arch'], run['batch_size'], run['workers'])
+
+def compare_results(baseline, results, threshold=0.1):
+    """
+    Compares the runs of two result files that have the same model
+    architecture, batch size and worker count. Returns the list of
+    (run key, metric, baseline value, new value, relative change, regressed)
+    tuples, the relative change is positive when the metric got worse.
+    """
+    baseline_runs = {run_key(run): run for run in baseline['runs']}
+    rows = []
+    for run in results['runs']:
+        base = baseline_runs.get(run_key(run))
+        if base is None:
+            continue
+        metrics = [(metric, higher_is_better) for metric, higher_is_better
+                   in COMPARED_METRICS.items()]
+        metrics += [('stage ' + name, False) for name in run['stages_ms_per_image']
+                    if name in base['stages_ms_per_image']]
+        for metric, higher_is_better in metrics:
+            if metric.startswith('stage '):
+                old = base['stages_ms_per_image'][metric[6:]]
+                new = run['stages_ms_per_image'][metric[6:]]
+            else:
+                old, new = base.get(metric), run.get(metric)
+            if not old or new is None:
+                continue
+            change = (old - new) / old if higher_is_better else (new - old) / old
+            rows.append((run_key(run), metric, old, new, change, change > threshold))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description='benchmark suite of the classification pipeline')
+    parser.add_argument('command', choices=['corpus', 'run', 'compare'])
+    parser.add_argument('files', nargs='*',
+                        help='compare: the baseline and the new results files')
+    parser.add_argument('--corpus_dir', type=str, default='bench_corpus/',
+                        help='folder of the synthetic corpus')
+    parser.add_argument('--source_dir', type=str, default='pet_images/',
+                        help='folder of the images the corpus is made from')
+    parser.add_argument('--n_images', type=int, default=200,
+                        help='number of images of the corpus')
+    parser.add_argument('--resolution', type=int, default=1024,
+                        help='longer side of the corpus images in pixels')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='random seed of the perturbations')
+    parser.add_argument('--arch', type=str, default='all',
+                        help='models run, a comma separated list or all')
+    parser.add_argument('--batch_sizes', type=str, default='32',
+                        help='comma separated batch sizes')
+    parser.add_argument('--workers', type=str, default='0',
+                        help='comma separated worker process counts (0 = in process)')
+    parser.add_argument('--repeats', type=int, default=1,
+                        help='runs of every combination, the median is kept')
+    parser.add_argument('--weights_dir', type=str, default='weights/',
+                        help='folder with the local pretrained weights files')
+    parser.add_argument('--output', type=str, default='bench_results.json',
+                        help='results file written by run')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='largest relative change of a metric accepted by compare')
+    in_arg = parser.parse_args()
+
+    if in_arg.command == 'compare':
+        if len(in_arg.files) != 2:
+            parser.error('compare needs a baseline and a results file')
+        with open(in_arg.files[0]) as f:
+            baseline = json.load(f)
+        with open(in_arg.files[1]) as f:
+            results = json.load(f)
+        rows = compare_results(baseline, results, in_arg.threshold)
+        print("{:26} {:28} {:>12} {:>12} {:>9}".format('run', 'metric', 'baseline', 'new',
+                                                        'worse by'))
+        for key, metric, old, new, change, regressed in rows:
+            print("{:26} {:28} {:12.3f} {:12.3f} {:8.1f}%{}".format(
+                '{} b{} w{}'.format(*key), metric, old, new, 100.0 * change,
+                '  REGRESSION' if regressed else ''))
+        regressions = sum(regressed for *_, regressed in rows)
+        print("\n{} regressions (threshold {:.0f}%)".format(regressions, 100.0 * in_arg.threshold))
+        sys.exit(1 if regressions else 0)
+
+    manifest = make_corpus(in_arg.corpus_dir, in_arg.source_dir, in_arg.n_images,
+                           in_arg.resolution, in_arg.seed)
+    if in_arg.command == 'corpus':
+        print("Corpus of {} images in {}".format(in_arg.n_images, in_arg.corpus_dir))
+        return
+
+    archs = list(architectures) if in_arg.arch == 'all' else in_arg.arch.split(',')
+    runs = run_suite(in_arg.corpus_dir, archs,
+                     [int(size) for size in in_arg.batch_sizes.split(',')],
+                     [int(count) for count in in_arg.workers.split(',')],
+                     in_arg.repeats, ['--weights_dir', in_arg.weights_dir])
+    with open(in_arg.output, 'w') as f:
+        json.dump({'created': strftime('%Y-%m-%dT%H:%M:%S'), 'environment': environment(),
+                   'corpus': manifest, 'runs': runs}, f, indent=2)
+    print("Results written to {}".format(in_arg.output))
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,7 @@
 #                                                                          
 # PROGRAMMER: Chaklader A. Arefe
 # DATE CREATED: 08/03/2024
-# REVISED DATE: 08/03/2024
+# REVISED DATE: 10/18/2026
 # PURPOSE: Create a function calculates_results_stats that calculates the 
 #          statistics of the results of the programrun using the classifier's model 
 #          architecture to classify the images. This function will use the 
@@ -16,8 +16,16 @@
 #          will be counts and percentages. Please see "Intro to Python - Project
 #          classifying Images - xx Calculating Results" for details on the 
 #          how to calculate the counts and percentages for this function.    
+#          The counts are reductions over NumPy columns (a results dictionary
+#          is read into columns first, a ResultsStore already is one) and the
+#          same pass adds a dog/not-dog confusion matrix and the accuracy of
+#          every dog breed.
 ##
 
+import numpy as np
+
+from results_store import ResultsStore
+
 def calculates_results_stats(results_dic):
     """
     Calculates statistics of the results of the program run using classifier's model 
@@ -25,6 +33,8 @@ def calculates_results_stats(results_dic):
     dictionary (results_stats_dic) so that it's returned for printing as to help
     the user to determine the 'best' model for classifying images. Note that 
     the statistics calculated as the results are either percentages or counts.
+    The results are turned into NumPy columns (see results_columns) and every
+    count is a reduction over boolean columns.
     Parameters:
       results_dic - Dictionary with key as image filename and value as a List 
              (index)idx 0 = pet image label (string)
@@ -36,45 +46,147 @@ def calculates_results_stats(results_dic):
                     idx 4 = 1/0 (int)  where 1 = Classifier classifies image 
                             'as-a' dog and 0 = Classifier classifies image  
                             'as-NOT-a' dog.
+                    idx 5 = top-k predictions (list) of (class index,
+                            classifier label, probability) tuples, optional.
+                            When present the share of dog images whose breed
+                            is among the top-k is added as pct_breed_in_topk
+                    (a ResultsStore is read from its columns directly)
     Returns:
      results_stats_dic - Dictionary that contains the results statistics (either
                     a percentage or a count) where the key is the statistic's 
                      name (starting with 'pct' for percentage or 'n' for count)
-                     and the value is the statistic's value.
+                     and the value is the statistic's value. It also holds the
+                     'confusion_matrix' and 'breed_accuracy' tables, see
+                     calculates_results_stats_columns.
     """
-    stats = {
-        'n_dogs_img': 0,
-        'n_match': 0,
-        'n_correct_dogs': 0,
-        'n_correct_notdogs': 0,
-        'n_correct_breed': 0,
-        'n_images': len(results_dic)
-    }
-    
-    for _, result in results_dic.items():
-        # Unpack values for better readability
-        _, _, label_match, is_dog, classified_as_dog = result
-        
-        # Update match count
-        stats['n_match'] += label_match
-        
-        if is_dog:
-            stats['n_dogs_img'] += 1
-            stats['n_correct_dogs'] += classified_as_dog
-            stats['n_correct_breed'] += (label_match and is_dog)
-        else:
-            stats['n_correct_notdogs'] += (not classified_as_dog)
-    
+    return calculates_results_stats_columns(**results_columns(results_dic))
+
+def calculate_percentage(numerator, denominator):
+    return (numerator / denominator * 100.0) if denominator > 0 else 0.0
+
+def add_percentages(stats):
+    """Adds n_notdogs_img and the percentages to a dictionary of counts."""
     # Calculate derived statistics
     stats['n_notdogs_img'] = stats['n_images'] - stats['n_dogs_img']
     
     # Calculate percentages
-    def calculate_percentage(numerator, denominator):
-        return (numerator / denominator * 100.0) if denominator > 0 else 0.0
-    
     stats['pct_match'] = calculate_percentage(stats['n_match'], stats['n_images'])
     stats['pct_correct_dogs'] = calculate_percentage(stats['n_correct_dogs'], stats['n_dogs_img'])
     stats['pct_correct_breed'] = calculate_percentage(stats['n_correct_breed'], stats['n_dogs_img'])
     stats['pct_correct_notdogs'] = calculate_percentage(stats['n_correct_notdogs'], stats['n_notdogs_img'])
+    if 'n_breed_in_topk' in stats:
+        stats['pct_breed_in_topk'] = calculate_percentage(stats['n_breed_in_topk'], stats['n_dogs_img'])
+    
+    return stats
+
+def results_columns(results_dic):
+    """
+    Returns the columns the statistics are calculated from, as a dictionary
+    of keyword arguments for calculates_results_stats_columns. A ResultsStore
+    hands out its own columns, a results dictionary is read into NumPy arrays
+    once (one pass per column, no per-image counters).
+    """
+    if isinstance(results_dic, ResultsStore):
+        return store_columns(results_dic)
+    
+    n_images = len(results_dic)
+    values = list(results_dic.values())
+    label_ids = {}
+    columns = {
+        'match': np.fromiter((value[2] for value in values), dtype=bool, count=n_images),
+        'is_dog': np.fromiter((value[3] for value in values), dtype=bool, count=n_images),
+        'classified_as_dog': np.fromiter((value[4] for value in values),
+                                         dtype=bool, count=n_images),
+        'pet_label': np.fromiter((label_ids.setdefault(value[0], len(label_ids))
+                                  for value in values), dtype=np.int32, count=n_images),
+        'pet_labels': list(label_ids),
+        'breed_in_topk': None
+    }
+    if values and all(len(value) > 5 for value in values):
+        columns['breed_in_topk'] = np.fromiter(
+            (is_dog and any(value[0] in label for _, label, _ in value[5])
+             for value, is_dog in zip(values, columns['is_dog'].tolist())),
+            dtype=bool, count=n_images)
+    return columns
+
+def store_columns(store):
+    """Returns the columns of a ResultsStore, see results_columns."""
+    is_dog = store.column('is_dog') == 1
+    pet_label = store.column('pet_label')
+    columns = {
+        'match': store.column('match') == 1,
+        'is_dog': is_dog,
+        'classified_as_dog': store.column('classified_as_dog') == 1,
+        'pet_label': pet_label,
+        'pet_labels': store.pool.labels,
+        'breed_in_topk': None
+    }
+    
+    if store.topk_ids is not None and len(store):
+        # pet label found within any top-k classifier label, per (label, class)
+        labels = store.pool.labels
+        topk_ids = store.column('topk_ids')
+        breed_in_topk = np.zeros(len(store), dtype=bool)
+        for label_id in np.unique(pet_label[is_dog]).tolist():
+            rows = np.flatnonzero(is_dog & (pet_label == label_id))
+            candidates = np.unique(topk_ids[rows])
+            found = [class_id for class_id in candidates.tolist()
+                     if labels[label_id] in store.class_labels[class_id]]
+            breed_in_topk[rows] = np.isin(topk_ids[rows], found).any(axis=1)
+        columns['breed_in_topk'] = breed_in_topk
+    return columns
+
+def calculates_results_stats_columns(match, is_dog, classified_as_dog,
+                                     pet_label=None, pet_labels=None,
+                                     breed_in_topk=None):
+    """
+    Calculates the statistics of calculates_results_stats from columns, every
+    count is one reduction over boolean arrays.
+    Parameters:
+     match, is_dog, classified_as_dog - Flags of every image (NumPy bool arrays)
+     pet_label - Label id of every pet image label (NumPy int array, optional)
+     pet_labels - The pet labels, pet_labels[label id] (list, optional)
+     breed_in_topk - True for the dog images whose breed is among the top-k
+                     predictions (NumPy bool array, optional)
+    Returns:
+     results_stats_dic - The counts and percentages of calculates_results_stats,
+                     plus:
+                     'confusion_matrix' - Dog/not-dog counts, rows are the pet
+                       image (dog, not dog) and columns the classifier
+                       (dog, not dog): [[n, n], [n, n]] (list of lists)
+                     'breed_accuracy' - Dictionary with every dog breed's pet
+                       label as 'key' and (n images, n correct breed,
+                       percentage correct) as 'value', when pet labels are given
+    """
+    not_dog = ~is_dog
+    dog_as_dog = int((is_dog & classified_as_dog).sum())
+    notdog_as_dog = int((not_dog & classified_as_dog).sum())
+    correct_breed = is_dog & match
+    
+    stats = {
+        'n_dogs_img': int(is_dog.sum()),
+        'n_match': int(match.sum()),
+        'n_correct_dogs': dog_as_dog,
+        'n_correct_notdogs': int(not_dog.sum()) - notdog_as_dog,
+        'n_correct_breed': int(correct_breed.sum()),
+        'n_images': len(match)
+    }
+    if breed_in_topk is not None:
+        stats['n_breed_in_topk'] = int((is_dog & breed_in_topk).sum())
+    add_percentages(stats)
+    
+    stats['confusion_matrix'] = [
+        [dog_as_dog, stats['n_dogs_img'] - dog_as_dog],
+        [notdog_as_dog, stats['n_correct_notdogs']]]
+    
+    if pet_label is not None and pet_labels is not None:
+        n_labels = len(pet_labels)
+        n_breed = np.bincount(pet_label[is_dog], minlength=n_labels)
+        n_correct = np.bincount(pet_label[correct_breed], minlength=n_labels)
+        stats['breed_accuracy'] = {
+            pet_labels[label_id]: (int(n_breed[label_id]), int(n_correct[label_id]),
+                                   calculate_percentage(int(n_correct[label_id]),
+                                                        int(n_breed[label_id])))
+            for label_id in np.flatnonzero(n_breed).tolist()}
     
-    return stats
\ No newline at end of file
+    return stats
@@ -4,7 +4,7 @@
 #                                                                          
 # PROGRAMMER: Chaklader A. Arefe
 # DATE CREATED: 08/03/2024
-# REVISED DATE: 08/03/2024
+# REVISED DATE: 10/18/2026
 # PURPOSE: Classifies pet images using a pretrained CNN model, compares these
 #          classifications to the true identity of the pets in the images, and
 #          summarizes how well the CNN performed on the image classification task.
@@ -18,33 +18,195 @@
 # Use argparse Expected Call with <> indicating expected user input:
 #      python check_images.py --dir <directory with images> --arch <model>
 #             --dogfile <file that contains dognames>
+#             --batch_size <images per forward pass>
+#             --weights_dir <folder with pretrained weights files>
+#             --decode_workers <number of image decode workers>
+#             --prefetch <decoded batches queued ahead of the model>
+#             --decode_backend <thread or process>
+#             --cache_file <prediction cache file> --cache_size <max predictions>
+#             --topk <classes kept per image> --dog_in_topk
+#             --min_confidence <lowest probability counted as a dog>
+#             --recursive --dog_index <compiled dog name index file>
+#             --print_every <images between running statistics>
+#             --workers <number of classification worker processes>
+#             --weights_sharing <none, mmap or shared>
+#             --precision <fp32, bf16 or int8-dynamic> --scripted
+#             --server <classification server address>
+#             --jpeg_draft <draft decode scale> --tensor_cache <cache folder>
+#             --profile <table or json> --profile_file <JSON report file>
+#             --checks <off, sample or full> --check_samples <images checked>
+#             --checkpoint <checkpoint log file>
+#             --checkpoint_every <images per checkpoint write> --resume
+#             --overwrite_checkpoint
+#             --print_topk --print_breakdown
 #   Example call:
 #    python check_images.py --dir pet_images/ --arch vgg --dogfile dognames.txt
+#   Comparing all 3 architectures in one pass (each image is decoded once):
+#    python check_images.py --dir pet_images/ --arch all --dogfile dognames.txt
 ##
 
 from time import time, sleep
 from print_functions_for_lab_checks import *
 from get_input_args import get_input_args
-from get_pet_labels import get_pet_labels
-from classify_images import classify_images
+from classifier import architectures, models
+from get_pet_labels import iter_pet_labels
+from classify_images import classify_images_multi, combine_on_batch
+from sharded_classify import classify_images_sharded, print_worker_memory
+from classification_server import ClassificationClient, classify_images_remote
+from image_pipeline import PipelineTimer
+from prediction_cache import PredictionCache
+from tensor_cache import TensorCache
+from stage_profiler import StageProfiler, print_profile, write_profile
+from checkpoint_log import CheckpointLog, checkpoint_settings
+from dog_names import load_dog_index
+from stats_accumulator import RollingStats
+from results_store import ResultsStore
 from adjust_results4_isadog import adjust_results4_isadog
-from calculates_results_stats import calculates_results_stats
-from print_results import print_results
+from calculates_results_stats import (calculates_results_stats,
+                                      calculates_results_stats_columns, results_columns)
+from print_results import print_results, print_results_comparison
 
 def main():
     start_time = time()
+    # stage timings, reported with --profile
+    profiler = StageProfiler()
     in_arg = get_input_args()
-    check_command_line_arguments(in_arg)
+    checks = in_arg.checks
+    if checks != 'off':
+        check_command_line_arguments(in_arg)
+    models.weights_dir = in_arg.weights_dir
+    models.mmap = in_arg.weights_sharing == 'mmap'
+    models.scripted = in_arg.scripted
     
-    results = get_pet_labels(in_arg.dir)
-    check_creating_pet_image_labels(results)
-    classify_images(in_arg.dir, results, in_arg.arch)
-    check_classifying_images(results)
-    adjust_results4_isadog(results, in_arg.dogfile)
-    check_classifying_labels_as_dogs(results)
-    results_stats = calculates_results_stats(results)
-    check_calculating_results(results, results_stats)
-    print_results(results, results_stats, in_arg.arch, True, True)
+    if in_arg.arch == 'all':
+        archs = list(architectures)
+    else:
+        archs = [arch.strip() for arch in in_arg.arch.split(',') if arch.strip()]
+    
+    # one columnar results store per architecture, filled with the pet labels
+    # while the image folder is scanned so classification starts on the first
+    # images (read like a results dictionary by the checks and printouts)
+    results_by_arch = {arch: ResultsStore() for arch in archs}
+    pipeline_timer = PipelineTimer()
+    cache = None
+    if in_arg.cache_file:
+        cache = PredictionCache(in_arg.cache_file, in_arg.cache_size)
+    tensor_cache = None
+    if in_arg.tensor_cache:
+        tensor_cache = TensorCache(in_arg.tensor_cache)
+    # running statistics printed while the images are classified
+    rolling_stats = None
+    if in_arg.print_every > 0:
+        rolling_stats = RollingStats(results_by_arch,
+                                     load_dog_index(in_arg.dogfile, in_arg.dog_index),
+                                     in_arg.print_every, in_arg.dog_in_topk,
+                                     in_arg.min_confidence)
+    classify_start = time()
+    worker_memory = None
+    entries = profiler.timed('get_pet_labels', iter_pet_labels(in_arg.dir, in_arg.recursive))
+    # append-only log of the predictions, --resume skips the images it holds
+    checkpoint = None
+    if in_arg.checkpoint:
+        checkpoint = CheckpointLog(
+            in_arg.checkpoint, results_by_arch,
+            load_dog_index(in_arg.dogfile, in_arg.dog_index),
+            checkpoint_settings(archs, in_arg.precision, in_arg.topk, in_arg.jpeg_draft, cache),
+            in_arg.checkpoint_every, in_arg.resume, in_arg.dog_in_topk,
+            in_arg.min_confidence, in_arg.overwrite_checkpoint)
+        if in_arg.resume:
+            entries = checkpoint.resume(entries, rolling_stats)
+    on_batch = combine_on_batch(rolling_stats, checkpoint)
+    if in_arg.server:
+        # a classification server (see classification_server.py) runs the models
+        client = ClassificationClient(in_arg.server)
+        client.check_settings(topk=in_arg.topk, precision=in_arg.precision,
+                              scripted=in_arg.scripted, draft_scale=in_arg.jpeg_draft)
+        classify_images_remote(client, in_arg.dir,
+                               results_by_arch, entries, in_arg.batch_size,
+                               on_batch)
+    elif in_arg.workers > 0:
+        # shards of the images classified by worker processes, merged in order
+        worker_memory = classify_images_sharded(
+            in_arg.dir, results_by_arch, in_arg.workers, in_arg.batch_size,
+            in_arg.decode_workers, in_arg.prefetch, pipeline_timer, cache,
+            in_arg.topk, entries, on_batch, weights_sharing=in_arg.weights_sharing,
+            precision=in_arg.precision, draft_scale=in_arg.jpeg_draft)
+    else:
+        classify_images_multi(in_arg.dir, results_by_arch, in_arg.batch_size,
+                              in_arg.decode_workers, in_arg.prefetch,
+                              in_arg.decode_backend, pipeline_timer, cache, in_arg.topk,
+                              entries, on_batch, in_arg.precision, in_arg.jpeg_draft,
+                              tensor_cache)
+    if checkpoint is not None:
+        checkpoint.close()
+        checkpoint.restore()
+    classify_time = time() - classify_start
+    if checks != 'off':
+        # the preview only reads the pet labels of the first images
+        check_creating_pet_image_labels(results_by_arch[archs[0]])
+    if checks == 'sample':
+        # the same random images are checked for every architecture
+        checked_keys = sample_keys(results_by_arch[archs[0]], in_arg.check_samples)
+    
+    results_stats_by_arch = {}
+    wall_by_arch = {}
+    for arch, results in results_by_arch.items():
+        arch_start = time()
+        if checks == 'full':
+            with profiler.stage('lab_checks'):
+                check_classifying_images(results, {'match': match_column(results)})
+        with profiler.stage('adjust_results4_isadog'):
+            adjust_results4_isadog(results, in_arg.dogfile, in_arg.dog_in_topk,
+                                   in_arg.min_confidence, in_arg.dog_index)
+        with profiler.stage('calculates_results_stats'):
+            # columnar summary shared by the statistics and the full checks
+            columns = results_columns(results)
+            results_stats = calculates_results_stats_columns(**columns)
+        if checks == 'full':
+            with profiler.stage('lab_checks'):
+                check_classifying_labels_as_dogs(results, columns)
+                # recounted from the same columns by the check's own reductions
+                check_calculating_results(results, results_stats, columns)
+        elif checks == 'sample':
+            with profiler.stage('lab_checks'):
+                # the reference loops against the statistics of the same sample
+                sample = sample_results(results, checked_keys)
+                check_classifying_images(sample)
+                check_classifying_labels_as_dogs(sample)
+                check_calculating_results(sample, calculates_results_stats(sample))
+        with profiler.stage('print_results'):
+            print_results(results, results_stats, arch, True, True, in_arg.print_topk,
+                          in_arg.print_breakdown)
+        results_stats_by_arch[arch] = results_stats
+        # shared decode/classify pass split by each model's share of inference
+        inference_share = (pipeline_timer.inference_by_model.get(arch, 0.0) /
+                           pipeline_timer.inference if pipeline_timer.inference else
+                           1.0 / len(archs))
+        wall_by_arch[arch] = classify_time * inference_share + time() - arch_start
+    
+    if len(archs) > 1:
+        with profiler.stage('print_results'):
+            print_results_comparison(results_stats_by_arch,
+                                     pipeline_timer.inference_by_model, wall_by_arch,
+                                     in_arg.print_topk)
+    if not in_arg.server:
+        # nothing is decoded or run in this process with a server
+        pipeline_timer.print_summary()
+    if worker_memory:
+        print_worker_memory(worker_memory)
+    if cache is not None:
+        cache.print_summary()
+        cache.close()
+    if tensor_cache is not None:
+        tensor_cache.print_summary()
+        tensor_cache.close()
+    if in_arg.profile:
+        report = profiler.report(len(results_by_arch[archs[0]]),
+                                 None if in_arg.server else pipeline_timer)
+        if in_arg.profile == 'json':
+            write_profile(report, in_arg.profile_file)
+        else:
+            print_profile(report)
 
     end_time = time()
     tot_time = end_time - start_time
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND-revision/intropyproject-classify-pet-images/checkpoint_log.py
+#
+# PROGRAMMER: Chaklader A. Arefe
+# DATE CREATED: 10/18/2026
+# REVISED DATE: 10/18/2026
+# PURPOSE: Append-only checkpoint log of the classification, so a long
+#          check_images.py run that dies can be resumed. Every classified
+#          image is logged per model architecture as one tab separated line:
+#          model, filename and pet label (as JSON strings, so tabs and
+#          newlines in filenames are escaped), flags (1 = match, 2 = is a
+#          dog, 4 = classified as a dog), the top-k class ids and their
+#          probabilities. The lines are buffered and written (and fsync-ed)
+#          every flush_every images, so checkpointing doesn't slow down the
+#          inference loop. The first line describes the run's settings that
+#          change the predictions (see checkpoint_settings, the digest of
+#          every model's weights included), resuming with other settings is
+#          refused. A line cut short by a crash is dropped when the log is
+#          reopened, an existing log is only started over when asked to.
+#          With --resume the log is read in one streaming pass and the images
+#          it holds for every model are restored instead of classified.
+##
+
+import json
+import os
+
+from classifier import imagenet_classes_dict, models, preprocess_config, scripted_path, weights_path
+from class_table import get_class_table
+from prediction_cache import file_digest
+from sharded_classify import merge_predictions
+from stats_accumulator import score_predictions
+
+HEADER = '# checkpoint 2 '
+# restored images are handed to on_batch in chunks of this many
+RESUME_CHUNK = 1024
+
+def checkpoint_settings(archs, precision='fp32', topk=5, draft_scale=0, cache=None):
+    """
+    Returns the settings line of a run's checkpoint log (string): the
+    precision, top-k, TorchScript flag, preprocessing and, by model
+    architecture, the SHA-256 of the file its weights are loaded from (the
+    TorchScript artifact or the weights file, see InferenceSession). With a
+    PredictionCache as cache the digests it remembers by the files' mtime and
+    size are reused instead of hashing the weights on every start.
+    """
+    digest = cache.weights_digest if cache is not None else file_digest
+    digests = []
+    for arch in archs:
+        path = scripted_path(arch, models.weights_dir)
+        if not (models.scripted and precision == 'fp32' and os.path.isfile(path)):
+            path = weights_path(arch, models.weights_dir)
+        digests.append("{}={}".format(arch, digest(path) if os.path.isfile(path)
+                                      else 'missing'))
+    return "precision={} topk={} scripted={} preprocess={} weights={}".format(
+        precision, topk, models.scripted, ' '.join(preprocess_config(draft_scale).split()),
+        ','.join(digests))
+
+class CheckpointLog:
+    """
+    on_batch callback of classify_images_multi (see classify_images.py) that
+    appends the predictions to the checkpoint log.
+    Attributes:
+     path - Path of the log file (string)
+     settings - Settings of the run written on the log's first line (string)
+     flush_every - Number of logged images buffered before a write (int)
+     restored - Dictionary with the model architecture as 'key' and the list
+                of (filename, (classifier label, match, top-k)) restored from
+                the log by resume as 'value'
+    """
+
+    def __init__(self, path, results_by_model, dog_names, settings, flush_every=1000,
+                 resume=False, dog_in_topk=False, min_confidence=0.0, overwrite=False):
+        self.path = path
+        self.results_by_model = results_by_model
+        self.dog_names = dog_names
+        self.table = get_class_table(dog_names)
+        self.settings = settings
+        self.flush_every = flush_every
+        self.dog_in_topk = dog_in_topk
+        self.min_confidence = min_confidence
+        self.buffer = []
+        self.n_buffered = 0
+        self.restored = {model: [] for model in results_by_model}
+
+        self.logged = {model: {} for model in results_by_model}
+        if not (resume or overwrite) and os.path.isfile(path):
+            raise FileExistsError("Checkpoint {} already exists, pass --resume to continue it "
+                                  "or --overwrite_checkpoint to start it over".format(path))
+        if resume and os.path.isfile(path):
+            self.read()
+            self.drop_partial_line()
+            self.file = open(path, 'a')
+        else:
+            self.file = open(path, 'w')
+            self.file.write(HEADER + settings + '\n')
+            self.file.flush()
+
+    def read(self):
+        """
+        Reads the log in one streaming pass into logged: by model, the flags
+        and top-k predictions of every filename (the last line of a filename
+        wins). A last line without its newline was cut short and is skipped.
+        """
+        with open(self.path) as f:
+            header = f.readline()
+            if header.rstrip('\n') != HEADER + self.settings:
+                raise ValueError("Checkpoint {} was written with other settings ({}), "
+                                 "expected {}".format(self.path, header.strip(),
+                                                      HEADER + self.settings))
+            for line in f:
+                if not line.endswith('\n'):
+                    break
+                model, filename, _, flags, ids, probs = line.rstrip('\n').split('\t')
+                if model in self.logged:
+                    self.logged[model][json.loads(filename)] = (int(flags), ids, probs)
+
+    def drop_partial_line(self):
+        """Truncates a last line cut short by a crash, so appends start on a new line."""
+        with open(self.path, 'rb+') as f:
+            size = f.seek(0, os.SEEK_END)
+            # lines are far shorter than the tail read
+            tail_start = f.seek(max(0, size - 65536))
+            tail = f.read()
+            if tail and not tail.endswith(b'\n'):
+                f.truncate(tail_start + tail.rfind(b'\n') + 1)
+
+    def resume(self, entries, on_batch=None):
+        """
+        Yields the (filename, pet label) entries that still have to be
+        classified. The entries logged for every model are added to the
+        results with their pet label (keeping the order of the images) and
+        their predictions are kept in restored for restore, on_batch gets
+        them like classified images.
+        """
+        models = list(self.results_by_model)
+        pending = {model: [] for model in models}
+
+        def report():
+            for model, chunk in pending.items():
+                if chunk and on_batch is not None:
+                    on_batch(model, [key for key, _ in chunk],
+                             [prediction[2] for _, prediction in chunk])
+                self.restored[model].extend(chunk)
+                pending[model] = []
+
+        for key, pet_label in entries:
+            logged = [self.logged[model].get(key) for model in models]
+            if any(record is None for record in logged):
+                yield key, pet_label
+                continue
+            for results_dic in self.results_by_model.values():
+                if key not in results_dic:
+                    results_dic[key] = [pet_label]
+            for model, (flags, ids, probs) in zip(models, logged):
+                topk = [(class_id, imagenet_classes_dict[class_id].lower().strip(), prob)
+                        for class_id, prob in zip(map(int, ids.split()),
+                                                  map(float, probs.split()))]
+                pending[model].append(
+                    (key, (self.table.labels[topk[0][0]], flags & 1, topk)))
+            if len(pending[models[0]]) >= RESUME_CHUNK:
+                report()
+        report()
+
+    def restore(self):
+        """Adds the restored predictions to the results, like classify_images_multi."""
+        for model, restored in self.restored.items():
+            if restored:
+                merge_predictions({model: self.results_by_model[model]},
+                                  [key for key, _ in restored],
+                                  {model: [prediction for _, prediction in restored]})
+
+    def __call__(self, model, filenames, predictions):
+        results_dic = self.results_by_model[model]
+        pet_labels = [results_dic[filename][0] for filename in filenames]
+        match, is_dog, classified_as_dog = score_predictions(
+            self.table, self.dog_names, pet_labels, predictions, self.dog_in_topk,
+            self.min_confidence)
+        flags = match.astype(int) | 2 * is_dog.astype(int) | 4 * classified_as_dog.astype(int)
+        logged = self.logged[model]
+        for filename, pet_label, flag, topk in zip(filenames, pet_labels, flags.tolist(),
+                                                   predictions):
+            if filename in logged:
+                # reclassified on resume for the models that weren't logged yet
+                continue
+            self.n_buffered += 1
+            self.buffer.append("{}\t{}\t{}\t{}\t{}\t{}\n".format(
+                model, json.dumps(filename), json.dumps(pet_label), flag,
+                ' '.join(str(class_id) for class_id, _, _ in topk),
+                ' '.join('{:.9g}'.format(prob) for _, _, prob in topk)))
+        if self.n_buffered >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered lines to the log and syncs it to disk."""
+        if self.buffer:
+            self.file.write(''.join(self.buffer))
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.buffer = []
+            self.n_buffered = 0
+
+    def close(self):
+        self.flush()
+        self.file.close()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND-revision/intropyproject-classify-pet-images/class_table.py
+#
+# PROGRAMMER: Chaklader A. Arefe
+# DATE CREATED: 10/18/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Precomputed lookup table over the 1000 ImageNet class ids. For
+#          every class id it holds the normalized classifier label, its
+#          normalized aliases, whether the class is a dog and its canonical
+#          breed id (see dog_names.py). With it, matching pet labels to the
+#          predicted classes and classifying the predictions as dogs become
+#          NumPy array operations over the predicted class ids of a whole batch
+#          instead of per-image string handling.
+##
+
+import numpy as np
+
+from classifier import imagenet_classes_dict
+
+class ClassTable:
+    """
+    Lookup table indexed by ImageNet class id.
+    Attributes:
+     labels - Normalized (lower case, stripped) classifier label of every
+              class (NumPy object array)
+     aliases - Normalized comma separated aliases of every class (list of tuples)
+     breed_id - Canonical breed id of every class, -1 when the class isn't a
+                dog (NumPy int32 array)
+     is_dog - 1 when the class is a dog, 0 otherwise (NumPy uint8 array)
+    """
+
+    def __init__(self, class_labels, dog_index=None):
+        n_classes = max(class_labels) + 1
+        self.labels = np.empty(n_classes, dtype=object)
+        self.labels[:] = ''
+        for class_id, label in class_labels.items():
+            self.labels[class_id] = label.lower().strip()
+        self.aliases = [tuple(alias.strip() for alias in label.split(','))
+                        for label in self.labels]
+
+        self.breed_id = np.full(n_classes, -1, dtype=np.int32)
+        if dog_index is not None:
+            self.breed_id[:] = [dog_index.breed_id(label) for label in self.labels]
+            self.resolve_shared_breeds(dog_index)
+        self.is_dog = (self.breed_id >= 0).astype(np.uint8)
+
+        # pet label -> boolean match vector over all classes
+        self.match_rows = {}
+
+    def resolve_shared_breeds(self, dog_index):
+        """
+        A breed resolved from several classes belongs to the class sharing the
+        most aliases with it, the other classes only matched through a single
+        overloaded alias (ex. the 'cardigan' sweater and the cardigan welsh
+        corgi) and aren't dogs.
+        """
+        breed_ids, counts = np.unique(self.breed_id[self.breed_id >= 0],
+                                      return_counts=True)
+        for breed_id in breed_ids[counts > 1]:
+            breed_aliases = {alias.strip() for alias
+                             in dog_index.breeds[breed_id].split(',')}
+            class_ids = np.flatnonzero(self.breed_id == breed_id)
+            overlaps = [len(breed_aliases.intersection(self.aliases[class_id]))
+                        for class_id in class_ids]
+            best = max(overlaps)
+            for class_id, overlap in zip(class_ids, overlaps):
+                if overlap < best:
+                    self.breed_id[class_id] = -1
+
+    def match_row(self, pet_label):
+        """
+        Returns a boolean vector over all classes that's True where the pet
+        label is found within the class's classifier label (computed once per
+        pet label).
+        """
+        row = self.match_rows.get(pet_label)
+        if row is None:
+            row = np.fromiter((pet_label in label for label in self.labels),
+                              dtype=bool, count=len(self.labels))
+            self.match_rows[pet_label] = row
+        return row
+
+    def matches(self, pet_labels, pred_ids):
+        """
+        Returns 1/0 (NumPy uint8 array) for every image where 1 = the pet label
+        is found within the classifier label of the predicted class.
+        Parameters:
+         pet_labels - Pet image label of every image (sequence of strings)
+         pred_ids - Predicted class id of every image (sequence of ints)
+        """
+        if len(pet_labels) == 0:
+            return np.zeros(0, dtype=np.uint8)
+        unique_labels, label_rows = np.unique(np.asarray(pet_labels, dtype=object),
+                                              return_inverse=True)
+        rows = np.stack([self.match_row(label) for label in unique_labels])
+        return rows[label_rows.ravel(), np.asarray(pred_ids)].astype(np.uint8)
+
+    def classified_as_dog(self, topk_ids, topk_probs, min_confidence=0.0):
+        """
+        Returns 1/0 (NumPy uint8 array) for every image where 1 = one of the
+        given predictions is a dog with at least min_confidence probability.
+        Parameters:
+         topk_ids - Class ids of the predictions considered, one row per image
+                    (2-D int array)
+         topk_probs - Probabilities of those predictions (2-D float array)
+         min_confidence - Lowest probability of a prediction counted (float)
+        """
+        topk_ids = np.asarray(topk_ids).reshape(len(topk_ids), -1)
+        topk_probs = np.asarray(topk_probs).reshape(topk_ids.shape)
+        return ((self.is_dog[topk_ids] == 1) &
+                (topk_probs >= min_confidence)).any(axis=1).astype(np.uint8)
+
+# tables built in this process, by the dog index they were built with
+class_tables = {}
+
+def get_class_table(dog_index=None):
+    """
+    Returns the ClassTable of the ImageNet classes, built once per process and
+    dog index. Without a dog index no class is a dog (labels and matching
+    only).
+    """
+    key = id(dog_index)
+    cached = class_tables.get(key)
+    if cached is None or cached[0] is not dog_index:
+        cached = class_tables[key] = (dog_index, ClassTable(imagenet_classes_dict,
+                                                            dog_index))
+    return cached[1]
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND-revision/intropyproject-classify-pet-images/classification_server.py
+#
+# PROGRAMMER: Chaklader A. Arefe
+# DATE CREATED: 10/18/2026
+# REVISED DATE: 10/18/2026
+# PURPOSE: Long lived classification server so online callers don't pay for
+#          loading the models on every run. The server loads the models of
+#          classifier.py once and answers HTTP requests on a local TCP port or
+#          Unix socket. A request holds an image path (or the image's bytes)
+#          and optionally its pet label. Every request is decoded on its own
+#          handler thread, then concurrent requests are coalesced into
+#          micro-batches per model (see micro_batcher.py) that run as one
+#          forward pass. The response holds the classifier label, the top-k
+#          predictions and, with the same rules as classify_images and
+#          adjust_results4_isadog, the match and the is-dog and
+#          classified-as-dog flags. ClassificationClient talks to the server,
+#          check_images.py uses it through classify_images_remote with
+#          --server, after checking that the server's settings (top-k,
+#          precision, TorchScript, JPEG draft) are those of the run.
+#
+#          Requests:
+#           GET  /health    - {"status": "ok", "archs": [...], "settings": {...}}
+#           GET  /stats     - micro-batch counters of every model
+#           POST /classify  - JSON {"path": ..., "archs": [...], "pet_label": ...}
+#                             or the image's bytes with archs and pet_label
+#                             as query parameters
+#
+# Use argparse Expected Call with <> indicating expected user input:
+#      python classification_server.py --arch <models> --port <TCP port>
+#             --socket <Unix socket path> --batch_size <largest micro-batch>
+#             --max_wait_ms <longest wait for a micro-batch to fill>
+#   Example call:
+#    python classification_server.py --arch all --socket /tmp/classifier.sock
+##
+
+import argparse
+import http.client
+import io
+import json
+import os
+import socket
+import socketserver
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+import torch
+
+from classifier import architectures, get_session, load_image, models, precisions
+from class_table import get_class_table
+from dog_names import load_dog_index
+from get_pet_labels import create_pet_label
+from micro_batcher import MicroBatcher
+from sharded_classify import merge_predictions
+from stats_accumulator import score_predictions
+
+class ClassificationService:
+    """
+    The models of the server with one MicroBatcher each, and the dog names
+    the predictions are checked against.
+    Attributes:
+     sessions - Dictionary with the model architecture as 'key' and its
+                InferenceSession as 'value'
+     batchers - Dictionary with the model architecture as 'key' and the
+                MicroBatcher running its forward passes as 'value'
+     topk - Number of most probable classes returned for every image (int)
+     draft_scale - JPEG draft mode decoding, 0 decodes in full (see
+                   classifier.open_image) (float)
+     settings - Settings that change the predictions: topk, precision,
+                scripted and draft_scale (dict)
+    """
+
+    def __init__(self, archs, dogfile='dognames.txt', dog_index_file=None, topk=5,
+                 max_batch_size=32, max_wait=0.005, precision='fp32',
+                 dog_in_topk=False, min_confidence=0.0, draft_scale=0):
+        self.sessions = {arch: get_session(arch, precision) for arch in archs}
+        self.dog_names = load_dog_index(dogfile, dog_index_file)
+        self.table = get_class_table(self.dog_names)
+        self.topk = topk
+        self.dog_in_topk = dog_in_topk
+        self.min_confidence = min_confidence
+        self.draft_scale = draft_scale
+        self.settings = {'topk': topk, 'precision': precision, 'scripted': models.scripted,
+                         'draft_scale': draft_scale}
+        self.batchers = {arch: MicroBatcher(partial(self.forward_batch, arch),
+                                            max_batch_size, max_wait,
+                                            name='batcher-' + arch)
+                         for arch in archs}
+
+    def forward_batch(self, arch, images):
+        """Classifies a micro-batch of preprocessed images with one forward pass."""
+        session = self.sessions[arch]
+        return session.topk(session.forward(torch.stack(images)), self.topk)
+
+    def classify(self, path=None, data=None, archs=None, pet_label=None):
+        """
+        Classifies one image, given by its path or its bytes, with every model
+        of archs (defaults to all the server's models).
+        Returns:
+         Dictionary with the pet label (from the request or the filename,
+         None when unknown) and by model architecture: the classifier label,
+         the top-k predictions as [class index, label, probability] lists,
+         classified_as_dog and, when the pet label is known, match and is_dog
+         (1/0 ints)
+        """
+        archs = self.check_request(path, data, archs)
+        if pet_label is None and path is not None:
+            pet_label = create_pet_label(os.path.basename(path))
+
+        # decoded once on this (handler) thread, shared by every model
+        image = self.decode(path, data)
+        futures = {arch: self.batchers[arch].submit(image) for arch in archs}
+        return {'pet_label': pet_label,
+                'results': {arch: self.score(future.result(), pet_label)
+                            for arch, future in futures.items()}}
+
+    def check_request(self, path=None, data=None, archs=None):
+        """Returns the models of a request (all by default), checking the request."""
+        archs = archs or list(self.sessions)
+        unknown = [arch for arch in archs if arch not in self.batchers]
+        if unknown:
+            raise ValueError("Models not served: {}".format(' '.join(unknown)))
+        if path is None and data is None:
+            raise ValueError("A request needs an image path or the image's bytes")
+        return archs
+
+    def decode(self, path=None, data=None):
+        """Decodes and preprocesses an image given by its path or its bytes."""
+        return load_image(path if data is None else io.BytesIO(data),
+                          draft_scale=self.draft_scale)
+
+    def score(self, topk, pet_label=None):
+        """
+        Returns the result of a model for an image (see classify) from its
+        top-k predictions.
+        """
+        match, is_dog, classified_as_dog = score_predictions(
+            self.table, self.dog_names, [pet_label or ''], [topk],
+            self.dog_in_topk, self.min_confidence)
+        result = {
+            'classifier_label': topk[0][1],
+            'topk': topk,
+            'classified_as_dog': int(classified_as_dog[0])
+        }
+        if pet_label is not None:
+            result.update(match=int(match[0]), is_dog=int(is_dog[0]))
+        return result
+
+    def stats(self):
+        """Returns the micro-batch counters of every model (dict)."""
+        return {arch: batcher.stats() for arch, batcher in self.batchers.items()}
+
+    def close(self):
+        for batcher in self.batchers.values():
+            batcher.close()
+
+class ClassificationHandler(BaseHTTPRequestHandler):
+    """HTTP requests of the server, see the header of this file."""
+
+    # keep connections open between requests of a client
+    protocol_version = 'HTTP/1.1'
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        service = self.server.service
+        route = urlsplit(self.path).path
+        if route == '/health':
+            self.send_json(200, {'status': 'ok', 'archs': list(service.sessions),
+                                 'settings': service.settings})
+        elif route == '/stats':
+            self.send_json(200, service.stats())
+        else:
+            self.send_json(404, {'error': 'unknown path {}'.format(route)})
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if url.path != '/classify':
+            self.send_json(404, {'error': 'unknown path {}'.format(url.path)})
+            return
+
+        try:
+            if self.headers.get('Content-Type', '').startswith('application/json'):
+                request = json.loads(body)
+                response = self.server.service.classify(
+                    path=request.get('path'), archs=request.get('archs'),
+                    pet_label=request.get('pet_label'))
+            else:
+                query = parse_qs(url.query)
+                response = self.server.service.classify(
+                    data=body, archs=query['archs'][0].split(',') if 'archs' in query else None,
+                    pet_label=query['pet_label'][0] if 'pet_label' in query else None)
+        except (ValueError, OSError) as error:
+            self.send_json(400, {'error': str(error)})
+            return
+        except Exception as error:
+            # ex. a failed forward pass, the client still gets an answer
+            self.send_json(500, {'error': '{}: {}'.format(type(error).__name__, error)})
+            return
+        self.send_json(200, response)
+
+    def address_string(self):
+        # Unix socket clients have no address
+        return str(self.client_address or 'unix')
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+# pending connections accepted by the servers, clients connect concurrently
+REQUEST_QUEUE_SIZE = 128
+
+class ClassificationHTTPServer(ThreadingHTTPServer):
+    """HTTP server on a TCP port, one thread per connection."""
+    request_queue_size = REQUEST_QUEUE_SIZE
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTP server on a Unix socket, one thread per connection."""
+    daemon_threads = True
+    request_queue_size = REQUEST_QUEUE_SIZE
+
+def make_server(service, port=8765, host='127.0.0.1', socket_path=None, verbose=False):
+    """
+    Returns the HTTP server of a ClassificationService, listening on the Unix
+    socket socket_path when it's given, on host:port otherwise.
+    """
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = ThreadingUnixHTTPServer(socket_path, ClassificationHandler)
+    else:
+        server = ClassificationHTTPServer((host, port), ClassificationHandler)
+    server.service = service
+    server.verbose = verbose
+    return server
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection over a Unix socket."""
+
+    def __init__(self, socket_path, timeout=None):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+class ClassificationClient:
+    """
+    Client of the classification server, safe to use from several threads
+    (each thread keeps its own connection).
+    Attributes:
+     address - 'unix:<socket path>' or 'http://<host>:<port>' (string)
+    """
+
+    def __init__(self, address, timeout=300):
+        self.address = address
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            if self.address.startswith('unix:'):
+                connection = UnixHTTPConnection(self.address[len('unix:'):], self.timeout)
+            else:
+                url = urlsplit(self.address if '//' in self.address
+                               else 'http://' + self.address)
+                connection = http.client.HTTPConnection(url.hostname, url.port or 80,
+                                                        timeout=self.timeout)
+            self.local.connection = connection
+        return connection
+
+    def request(self, method, url, body=None, headers=None):
+        """Sends a request, returns the decoded JSON response."""
+        connection = self.connection()
+        try:
+            connection.request(method, url, body, headers or {})
+            response = connection.getresponse()
+            payload = json.loads(response.read())
+        except (OSError, http.client.HTTPException):
+            # the server closed the connection, retry once on a new one
+            connection.close()
+            self.local.connection = None
+            connection = self.connection()
+            connection.request(method, url, body, headers or {})
+            response = connection.getresponse()
+            payload = json.loads(response.read())
+        if response.status != 200:
+            raise RuntimeError("Classification server error {}: {}".format(
+                response.status, payload.get('error')))
+        return payload
+
+    def classify(self, path=None, data=None, archs=None, pet_label=None):
+        """
+        Classifies an image given by its path (read by the server, so made
+        absolute) or its bytes, see ClassificationService.classify.
+        """
+        if data is None:
+            request = {'path': os.path.abspath(path), 'archs': archs, 'pet_label': pet_label}
+            return self.request('POST', '/classify', json.dumps(request).encode(),
+                                {'Content-Type': 'application/json'})
+        query = {key: value for key, value in (('archs', ','.join(archs or [])),
+                                               ('pet_label', pet_label)) if value}
+        return self.request('POST', '/classify?' + urlencode(query), data,
+                            {'Content-Type': 'application/octet-stream'})
+
+    def health(self):
+        return self.request('GET', '/health')
+
+    def stats(self):
+        return self.request('GET', '/stats')
+
+    def check_settings(self, **settings):
+        """
+        Raises ValueError when the server classifies with other settings (see
+        ClassificationService.settings) than the given ones.
+        """
+        served = self.health().get('settings', {})
+        different = ["{}={} (run: {})".format(name, served.get(name), value)
+                     for name, value in settings.items() if served.get(name) != value]
+        if different:
+            raise ValueError("Classification server {} classifies with other settings: {}, "
+                             "restart it with the run's settings".format(
+                                 self.address, ', '.join(different)))
+
+def classify_images_remote(client, images_dir, results_by_model, entries=None,
+                           concurrency=32, on_batch=None):
+    """
+    Classifies the pet images on a classification server and fills the
+    results dictionaries like classify_images_multi (see classify_images.py),
+    the dog flags are still added by adjust_results4_isadog.
+    Parameters:
+     client - ClassificationClient of the server
+     images_dir - The (full) path to the folder of images that are to be
+                 classified by the classifier function (string)
+     results_by_model - Dictionary with the model architecture (string) as
+                 'key' and that model's results dictionary (or ResultsStore)
+                 as 'value'
+     entries, on_batch - See classify_images_multi, on_batch gets the
+                 predictions of concurrency images at a time
+     concurrency - Number of requests in flight, the server batches them (int)
+    Returns:
+     None - the results dictionaries are mutable data types so no return needed.
+    """
+    archs = list(results_by_model)
+    if entries is None:
+        entries = [(key, value[0]) for key, value
+                   in next(iter(results_by_model.values())).items()]
+
+    keys = []
+    predictions_by_model = {arch: [] for arch in archs}
+    # responses not handed to on_batch yet
+    reported = 0
+
+    def collect(key, response):
+        nonlocal reported
+        keys.append(key)
+        for arch, result in response['results'].items():
+            predictions_by_model[arch].append(
+                (result['classifier_label'], result['match'],
+                 [tuple(prediction) for prediction in result['topk']]))
+        if on_batch is not None and len(keys) - reported >= concurrency:
+            report()
+
+    def report():
+        nonlocal reported
+        for arch in archs:
+            on_batch(arch, keys[reported:],
+                     [topk for _, _, topk in predictions_by_model[arch][reported:]])
+        reported = len(keys)
+
+    in_flight = deque()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # at most two requests per thread submitted, answers taken in the
+        # order of the images
+        for key, pet_label in entries:
+            for results_dic in results_by_model.values():
+                if key not in results_dic:
+                    results_dic[key] = [pet_label]
+            in_flight.append((key, executor.submit(client.classify, images_dir + key,
+                                                   archs=archs, pet_label=pet_label)))
+            if len(in_flight) >= 2 * concurrency:
+                key, future = in_flight.popleft()
+                collect(key, future.result())
+        while in_flight:
+            key, future = in_flight.popleft()
+            collect(key, future.result())
+    if on_batch is not None and reported < len(keys):
+        report()
+
+    merge_predictions(results_by_model, keys, predictions_by_model)
+
+def main():
+    parser = argparse.ArgumentParser(description='classification server')
+    parser.add_argument('--arch', type=str, default='all',
+                        help='models served, a comma separated list or all')
+    parser.add_argument('--host', type=str, default='127.0.0.1',
+                        help='address the HTTP server listens on')
+    parser.add_argument('--port', type=int, default=8765,
+                        help='TCP port the HTTP server listens on')
+    parser.add_argument('--socket', type=str, default=None,
+                        help='Unix socket to listen on instead of the TCP port')
+    parser.add_argument('--batch_size', type=int, default=32,
+                        help='largest micro-batch of images per forward pass')
+    parser.add_argument('--max_wait_ms', type=float, default=5.0,
+                        help='longest time a micro-batch waits to fill (milliseconds)')
+    parser.add_argument('--dogfile', type=str, default='dognames.txt',
+                        help='text file that has dognames')
+    parser.add_argument('--dog_index', type=str, default=None,
+                        help='binary file caching the compiled dog name index')
+    parser.add_argument('--topk', type=int, default=5,
+                        help='number of most probable classes returned for every image')
+    parser.add_argument('--dog_in_topk', action='store_true',
+                        help='classify an image as a dog when any top-k prediction is a dog')
+    parser.add_argument('--min_confidence', type=float, default=0.0,
+                        help='lowest probability of a prediction that classifies an image as a dog')
+    parser.add_argument('--weights_dir', type=str, default='weights/',
+                        help='folder with the local pretrained weights files')
+    parser.add_argument('--precision', type=str, default='fp32', choices=precisions,
+                        help='inference precision')
+    parser.add_argument('--scripted', action='store_true',
+                        help='use the TorchScript models exported by export_models.py')
+    parser.add_argument('--jpeg_draft', type=float, default=0,
+                        help='decode JPEGs in draft mode to at least this many times the '
+                             'resize target, 0 decodes in full')
+    parser.add_argument('--verbose', action='store_true',
+                        help='log every request')
+    in_arg = parser.parse_args()
+
+    models.weights_dir = in_arg.weights_dir
+    models.scripted = in_arg.scripted
+    archs = list(architectures) if in_arg.arch == 'all' else in_arg.arch.split(',')
+    service = ClassificationService(archs, in_arg.dogfile, in_arg.dog_index, in_arg.topk,
+                                    in_arg.batch_size, in_arg.max_wait_ms / 1000.0,
+                                    in_arg.precision, in_arg.dog_in_topk,
+                                    in_arg.min_confidence, in_arg.jpeg_draft)
+    server = make_server(service, in_arg.port, in_arg.host, in_arg.socket, in_arg.verbose)
+    print("Serving {} on {}".format(', '.join(archs), 'unix:' + in_arg.socket if in_arg.socket
+                                    else 'http://{}:{}'.format(in_arg.host, in_arg.port)),
+          flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        if in_arg.socket and os.path.exists(in_arg.socket):
+            os.remove(in_arg.socket)
+
+if __name__ == "__main__":
+    main()
@@ -1,75 +1,364 @@
 import ast
+import copy
+import os
+import torch
 from PIL import Image
 import torchvision.transforms as transforms
-from torch.autograd import Variable
-import torchvision.models as models
-from torch import __version__
+import torchvision.models as tv_models
 
-# resnet18 = models.resnet18(pretrained=True)
-# alexnet = models.alexnet(pretrained=True)
-vgg16 = models.vgg16(pretrained=True)
+# torchvision constructor used for every supported model architecture
+architectures = {'resnet': 'resnet18', 'alexnet': 'alexnet', 'vgg': 'vgg16'}
 
-# models = {'resnet': resnet18, 'alexnet': alexnet, 'vgg': vgg16}
-models = {'vgg': vgg16}
+# folder with the locally stored pretrained weights, one state dict per
+# architecture named after its constructor (ex. weights/vgg16.pth)
+WEIGHTS_DIR = os.environ.get('CLASSIFIER_WEIGHTS_DIR', 'weights/')
+
+def weights_path(model_name, weights_dir=None):
+    """Returns the path of the local weights file of a model architecture."""
+    return os.path.join(weights_dir or WEIGHTS_DIR,
+                        architectures[model_name] + '.pth')
+
+def scripted_path(model_name, weights_dir=None):
+    """
+    Returns the path of the TorchScript artifact of a model architecture
+    (written by export_models.py next to the weights files).
+    """
+    return os.path.join(weights_dir or WEIGHTS_DIR,
+                        architectures[model_name] + '.torchscript.pt')
+
+def load_model(model_name, weights_dir=None, mmap=False):
+    """
+    Builds a pretrained CNN model in evaluation mode. The weights are loaded
+    from the local weights file (see weights_path) so no network access is
+    needed, a missing file raises FileNotFoundError (store it once with
+    save_weights).
+    Parameters:
+     model_name - CNN model architecture, values must be either:
+                  resnet alexnet vgg (string)
+     weights_dir - Folder with the local weights files, defaults to WEIGHTS_DIR
+     mmap - True memory-maps the local weights file and uses its pages as the
+            model's parameters without copying them, so processes loading the
+            same file share one copy of the weights in the page cache (bool)
+    Returns:
+     model - The pretrained model (torch.nn.Module)
+    """
+    if model_name not in architectures:
+        raise ValueError("Unknown model architecture '{}', values must be "
+                         "either: {}".format(model_name, ' '.join(architectures)))
+
+    build = getattr(tv_models, architectures[model_name])
+    path = weights_path(model_name, weights_dir)
+
+    if not os.path.isfile(path):
+        raise FileNotFoundError(
+            "No weights file {} for '{}': store the pretrained weights once with "
+            "python -c \"from classifier import save_weights; save_weights('{}')\" "
+            "(downloads them) or point --weights_dir at the folder holding "
+            "{}".format(path, model_name, model_name, os.path.basename(path)))
+    if mmap:
+        return attach_model(model_name, torch.load(path, map_location='cpu', mmap=True))
+    model = build()
+    model.load_state_dict(torch.load(path, map_location='cpu'))
+
+    return model.eval()
+
+def attach_model(model_name, state_dict):
+    """
+    Builds a model in evaluation mode whose parameters and buffers are the
+    tensors of state_dict themselves (no copy), ex. memory-mapped or shared
+    memory tensors. The model is built on the meta device so its own randomly
+    initialized weights are never allocated.
+    """
+    build = getattr(tv_models, architectures[model_name])
+    with torch.device('meta'):
+        model = build()
+    model.load_state_dict(state_dict, assign=True)
+    return model.eval()
+
+def save_weights(model_name, weights_dir=None):
+    """
+    Stores torchvision's pretrained weights of a model architecture (downloaded
+    into the torch hub cache, the only step that needs network access) in its
+    local weights file so later runs can load them offline. Returns the
+    file's path.
+    """
+    path = weights_path(model_name, weights_dir)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    build = getattr(tv_models, architectures[model_name])
+    torch.save(build(weights='DEFAULT').state_dict(), path)
+    return path
+
+class ModelRegistry(dict):
+    """
+    Dictionary of model architecture name -> pretrained model that builds each
+    model lazily, the first time it's requested, and then keeps it for the
+    rest of the process. Only the architectures that are actually used are
+    ever materialized. With mmap the local weights files are memory-mapped
+    (see load_model). With scripted the inference sessions load the exported
+    TorchScript artifacts (see scripted_path) instead, when they exist.
+    """
+
+    def __init__(self, weights_dir=None, mmap=False, scripted=False):
+        super().__init__()
+        self.weights_dir = weights_dir
+        self.mmap = mmap
+        self.scripted = scripted
+
+    def __missing__(self, model_name):
+        model = self[model_name] = load_model(model_name, self.weights_dir, self.mmap)
+        return model
+
+models = ModelRegistry()
 
 # obtain ImageNet labels
 with open('imagenet1000_clsid_to_human.txt') as imagenet_classes_file:
     imagenet_classes_dict = ast.literal_eval(imagenet_classes_file.read())
 
-def classifier(img_path, model_name):
-    # load the image
-    img_pil = Image.open(img_path)
-
-    # define transforms
-    preprocess = transforms.Compose([
-        transforms.Resize(256),
-        transforms.CenterCrop(224),
-        transforms.ToTensor(),
-        transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
-    ])
-    
-    # preprocess the image
-    img_tensor = preprocess(img_pil)
-    
-    # resize the tensor (add dimension for batch)
-    img_tensor.unsqueeze_(0)
-    
-    # wrap input in variable, wrap input in variable - no longer needed for
-    # v 0.4 & higher code changed 04/26/2018 by Jennifer S. to handle PyTorch upgrade
-    pytorch_ver = __version__.split('.')
-    
-    # pytorch versions 0.4 & hihger - Variable depreciated so that it returns
-    # a tensor. So to address tensor as output (not wrapper) and to mimic the 
-    # affect of setting volatile = True (because we are using pretrained models
-    # for inference) we can set requires_gradient to False. Here we just set 
-    # requires_grad_ to False on our tensor 
-    if int(pytorch_ver[0]) > 0 or int(pytorch_ver[1]) >= 4:
-        img_tensor.requires_grad_(False)
-    
-    # pytorch versions less than 0.4 - uses Variable because not-depreciated
-    else:
-        # apply model to input
-        # wrap input in variable
-        data = Variable(img_tensor, volatile = True) 
-
-    # apply model to input
-    model = models[model_name]
-
-    # puts model in evaluation mode
-    # instead of (default)training mode
-    model = model.eval()
-    
-    # apply data to model - adjusted based upon version to account for 
-    # operating on a Tensor for version 0.4 & higher.
-    if int(pytorch_ver[0]) > 0 or int(pytorch_ver[1]) >= 4:
-        output = model(img_tensor)
-
-    # pytorch versions less than 0.4
+# define transforms - built once and shared by every call
+IMAGENET_MEAN = [0.485, 0.456, 0.406]
+IMAGENET_STD = [0.229, 0.224, 0.225]
+preprocess = transforms.Compose([
+    transforms.Resize(256),
+    transforms.CenterCrop(224),
+    transforms.ToTensor(),
+    transforms.Normalize(mean=IMAGENET_MEAN, std=IMAGENET_STD)
+])
+# the same without the normalization, for models that normalize their input
+preprocess_unnormalized = transforms.Compose(preprocess.transforms[:-1])
+
+class NormalizedModel(torch.nn.Module):
+    """
+    A model with the ImageNet normalization of its input built in, it takes
+    the unnormalized (0 to 1) images of preprocess_unnormalized. Exported
+    TorchScript artifacts hold this module so the normalization runs inside
+    the optimized graph.
+    """
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+        self.register_buffer('mean', torch.tensor(IMAGENET_MEAN).view(1, 3, 1, 1))
+        self.register_buffer('std', torch.tensor(IMAGENET_STD).view(1, 3, 1, 1))
+
+    def forward(self, x):
+        return self.model((x - self.mean) / self.std)
+
+def load_scripted_model(path):
+    """
+    Loads an exported (frozen) TorchScript artifact and optimizes it for
+    inference on this machine. Optimized graphs can't be serialized, so this
+    pass runs on load and is part of the cold start.
+    """
+    model = torch.jit.load(path, map_location='cpu').eval()
+    return torch.jit.optimize_for_inference(model)
+
+# inference precisions of an InferenceSession: fp32 runs the model as loaded,
+# bf16 and int8-dynamic (dynamically quantized Linear layers) also run the
+# convolutions in channels-last memory format
+precisions = ('fp32', 'bf16', 'int8-dynamic')
+
+def prepare_model(model, precision='fp32'):
+    """
+    Returns the model prepared for inference at a precision (see precisions).
+    For bf16 and int8-dynamic the model is copied (the fp32 model stays as
+    it is), its convolutions use channels-last memory format and either all
+    its weights are converted to bfloat16 or its Linear layers are replaced by
+    dynamically quantized int8 ones (the activations are quantized on the
+    fly, the convolutions stay fp32).
+    """
+    if precision not in precisions:
+        raise ValueError("Unknown precision '{}', values must be either: "
+                         "{}".format(precision, ' '.join(precisions)))
+    if precision == 'fp32':
+        return model
+
+    model = copy.deepcopy(model).to(memory_format=torch.channels_last)
+    if precision == 'bf16':
+        model = model.to(torch.bfloat16)
     else:
-        # apply data to model
-        output = model(data)
+        model = torch.ao.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    return model.eval()
 
-    # return index corresponding to predicted class
-    pred_idx = output.data.numpy().argmax()
+# pytorch 1.9 & higher - inference_mode also skips autograd's version counter
+# and view tracking, older versions (0.4 & higher) fall back to no_grad. Checked
+# once here instead of parsing torch.__version__ on every call
+inference_mode = getattr(torch, 'inference_mode', torch.no_grad)
+
+def open_image(img_path, draft_scale=0):
+    """
+    Opens an image as RGB. With draft_scale > 0 JPEGs are decoded in PIL's
+    draft mode: scaled down by 1/2, 1/4 or 1/8 while decoding (in the DCT
+    domain) as long as the shorter side stays at least draft_scale times the
+    Resize target (256), the exact Resize and CenterCrop of preprocess then
+    finish the job. Most of the pixels of large photos are never decoded,
+    a larger draft_scale keeps the result closer to the full decode (see
+    bench_decode.py for the tolerance). Other formats are decoded in full.
+    """
+    image = Image.open(img_path)
+    if draft_scale > 0 and image.format == 'JPEG':
+        size = int(preprocess.transforms[0].size * draft_scale)
+        image.draft('RGB', (size, size))
+    return image.convert('RGB')
+
+def preprocess_config(draft_scale=0):
+    """
+    Describes the preprocessing of load_image (string), part of the cache keys
+    of its results (see prediction_cache.py and tensor_cache.py).
+    """
+    if draft_scale > 0:
+        return "{} draft_scale={}".format(repr(preprocess), draft_scale)
+    return repr(preprocess)
+
+def load_image(img_path, normalized=True, draft_scale=0):
+    """
+    Loads an image and preprocesses it into a (3 x 224 x 224) tensor,
+    normalized=False leaves out the normalization (see NormalizedModel),
+    draft_scale > 0 decodes JPEGs in draft mode (see open_image).
+    """
+    transform = preprocess if normalized else preprocess_unnormalized
+    return transform(open_image(img_path, draft_scale))
+
+class InferenceSession:
+    """
+    A CNN model prepared for inference. All per-model setup (model lookup,
+    evaluation mode, preprocessing) happens once when the session is created
+    so every prediction only pays for loading the image and the forward pass,
+    which runs without any autograd bookkeeping.
+    Attributes:
+     model_name - CNN model architecture: resnet alexnet vgg (string)
+     model - The pretrained model in evaluation mode (torch.nn.Module)
+     weights_file - Local weights file (or TorchScript artifact) the model
+                    was loaded from, None when the model didn't come from a
+                    file (string)
+     precision - Inference precision, see precisions (string)
+     includes_normalization - True when the model normalizes its input itself
+                    (TorchScript artifacts, see NormalizedModel) (bool)
+    """
+
+    # ImageNet normalization, as (1 x 3 x 1 x 1) tensors
+    mean = torch.tensor(IMAGENET_MEAN).view(1, 3, 1, 1)
+    std = torch.tensor(IMAGENET_STD).view(1, 3, 1, 1)
+
+    def __init__(self, model_name, precision='fp32'):
+        self.model_name = model_name
+        self.precision = precision
+        self.input_dtype = torch.bfloat16 if precision == 'bf16' else torch.float32
+
+        # exported fp32 artifacts skip building the torchvision model
+        script_file = scripted_path(model_name, models.weights_dir)
+        self.includes_normalization = (models.scripted and precision == 'fp32' and
+                                       os.path.isfile(script_file))
+        if self.includes_normalization:
+            self.model = load_scripted_model(script_file)
+            self.weights_file = script_file
+            return
+
+        self.model = prepare_model(models[model_name].eval(), precision)
+        path = weights_path(model_name, models.weights_dir)
+        self.weights_file = path if os.path.isfile(path) else None
+
+    def forward(self, batch, normalized=True):
+        """
+        Returns the model's output (fp32 logits) for a (N x 3 x 224 x 224)
+        batch, converted to the session's input dtype and memory format first.
+        normalized tells whether the batch was normalized (see load_image), it
+        is normalized (or unnormalized) here when the model expects otherwise.
+        """
+        if normalized and self.includes_normalization:
+            batch = batch * self.std + self.mean
+        elif not normalized and not self.includes_normalization:
+            batch = (batch - self.mean) / self.std
+        if self.precision != 'fp32':
+            batch = batch.to(dtype=self.input_dtype, memory_format=torch.channels_last)
+        with inference_mode():
+            return self.model(batch).float()
+
+    def labels(self, output):
+        """Returns the ImageNet label of the predicted class of every output row."""
+        return [imagenet_classes_dict[pred_idx]
+                for pred_idx in output.argmax(dim=1).tolist()]
+
+    def topk(self, output, k=5):
+        """
+        Returns, for every output row, the k most probable classes as a list of
+        (class index, ImageNet label, probability) tuples, most probable first.
+        The labels are lower case with surrounding whitespace stripped (the
+        format of the pet labels). The softmax and the top-k selection run as
+        one vectorized call over the whole batch.
+        """
+        probs, idxs = torch.softmax(output, dim=1).topk(min(k, output.shape[1]), dim=1)
+        return [[(idx, imagenet_classes_dict[idx].lower().strip(), prob)
+                 for idx, prob in zip(row_idxs, row_probs)]
+                for row_idxs, row_probs in zip(idxs.tolist(), probs.tolist())]
+
+    def top_logits(self, output, k=5):
+        """
+        Returns, for every output row, the k highest logits as a list of
+        (class index, logit) pairs and the log-sum-exp over all the logits of
+        that row, which is enough to recover the softmax probabilities of
+        those k classes later on.
+        """
+        values, idxs = output.topk(min(k, output.shape[1]), dim=1)
+        lses = torch.logsumexp(output, dim=1)
+        return [(list(zip(row_idxs, row_values)), lse)
+                for row_idxs, row_values, lse in zip(idxs.tolist(), values.tolist(),
+                                                     lses.tolist())]
+
+    def predict(self, img_path):
+        """Returns the ImageNet label predicted for a single image."""
+        return self.labels(self.forward(load_image(img_path).unsqueeze(0)))[0]
+
+    def predict_many(self, img_paths, batch_size=32):
+        """
+        Classifies a list of images with one forward pass per batch of images.
+        The preprocessed image tensors of each batch are stacked into a single
+        (N x 3 x 224 x 224) tensor, the final batch holds whatever images
+        remain (it may be smaller than batch_size).
+        Parameters:
+         img_paths - List of (full) paths to the images to classify (list)
+         batch_size - Maximum number of images per forward pass (int)
+        Returns:
+         labels - List of ImageNet labels (strings) in the same order as img_paths
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1, got {}".format(batch_size))
+
+        labels = []
+        for start in range(0, len(img_paths), batch_size):
+            batch = torch.stack([load_image(img_path)
+                                 for img_path in img_paths[start:start + batch_size]])
+            labels.extend(self.labels(self.forward(batch)))
+
+        return labels
+
+# one session per model architecture and precision, created the first time
+# it's used
+sessions = {}
+
+def get_session(model_name, precision='fp32'):
+    """Returns the (cached) InferenceSession of a model architecture."""
+    key = (model_name, precision)
+    if key not in sessions:
+        sessions[key] = InferenceSession(model_name, precision)
+    return sessions[key]
+
+def classifier(img_path, model_name):
+    """
+    Classifies a single image, kept for compatibility - see InferenceSession.
+    Parameters:
+     img_path - The (full) path to the image to classify (string)
+     model_name - CNN model architecture to use, values must be either:
+                  resnet alexnet vgg (string)
+    Returns:
+     The ImageNet label of the predicted class (string)
+    """
+    return get_session(model_name).predict(img_path)
 
-    return imagenet_classes_dict[pred_idx]
+def classify_batch(img_paths, model_name, batch_size=32):
+    """
+    Classifies a list of images in batches of batch_size images per forward
+    pass, see InferenceSession.predict_many. Returns the ImageNet labels in
+    the same order as img_paths.
+    """
+    return get_session(model_name).predict_many(img_paths, batch_size)
@@ -4,7 +4,7 @@
 #                                                                          
 # PROGRAMMER: Chaklader A. Arefe
 # DATE CREATED: 08/03/2024
-# REVISED DATE: 08/03/2024
+# REVISED DATE: 10/18/2026
 # PURPOSE: Create a function classify_images that uses the classifier function 
 #          to create the classifier labels and then compares the classifier 
 #          labels to the pet image labels. This function inputs:
@@ -14,15 +14,46 @@
 #             function and results for the functin call within main.
 #            -The CNN model architecture as model wihtin classify_images function
 #             and in_arg.arch for the function call within main. 
+#            -The number of images per forward pass as batch_size within
+#             classify_images function and in_arg.batch_size for the function
+#             call within main.
+#            -The decode pipeline settings as workers, prefetch and backend
+#             within classify_images function and in_arg.decode_workers,
+#             in_arg.prefetch and in_arg.decode_backend for the function call
+#             within main (see image_pipeline.py).
+#            -An optional PredictionCache as cache within classify_images
+#             function, only images missing from the cache are run through
+#             the model (see prediction_cache.py).
+#           classify_images_multi does the same for several model architectures
+#           in one pass, every image is decoded once and the shared tensor is
+#           fed to every model. The models run at the inference precision
+#           given as precision (see classifier.py), JPEGs are decoded in draft
+#           mode with draft_scale > 0 and an optional TensorCache as
+#           tensor_cache keeps the preprocessed images of earlier runs (see
+#           tensor_cache.py). An optional on_batch callback receives every
+#           batch of predictions as soon as it's made (ex. to update running
+#           statistics, see stats_accumulator.py), combine_on_batch chains
+#           several callbacks into one.
 #           This function uses the extend function to add items to the list 
 #           that's the 'value' of the results dictionary. You will be adding the
 #           classifier label as the item at index 1 of the list and the comparison 
 #           of the pet and classifier labels as the item at index 2 of the list.
+#           The top-k predictions with their probabilities are added as the last
+#           item of the list (adjust_results4_isadog later inserts its items
+#           ahead of it, moving it to index 5).
 ##
 
-from classifier import classifier 
+from collections import deque
+from time import perf_counter
+from classifier import get_session, imagenet_classes_dict, preprocess_config
+from class_table import get_class_table
+from results_store import ResultsStore
+from image_pipeline import iter_batches
+from prediction_cache import file_digest, topk_probabilities
 
-def classify_images(images_dir, results_dic, model):
+def classify_images(images_dir, results_dic, model, batch_size=32, workers=4,
+                    prefetch=2, backend='thread', timer=None, cache=None, topk=5,
+                    precision='fp32', draft_scale=0, tensor_cache=None):
     """
     Creates classifier labels with classifier function, compares pet labels to 
     the classifier labels, and adds the classifier label and the comparison of 
@@ -40,17 +71,187 @@ def classify_images(images_dir, results_dic, model):
                  NEW - index 1 = classifier label (string)
                  NEW - index 2 = 1/0 (int)  where 1 = match between pet image
                  and classifer labels and 0 = no match between labels
+                 NEW - last index = top-k predictions (list) of (class index,
+                 classifier label, probability) tuples, most probable first
      model - Indicates which CNN model architecture will be used by the 
              classifier function to classify the pet images,
              values must be either: resnet alexnet vgg (string)
+     batch_size - Number of images the classifier processes per forward
+                  pass, the last batch may hold fewer images (int)
+     workers - Number of workers decoding images ahead of the model, 0
+               decodes on the main thread (int)
+     prefetch - Number of decoded batches queued ahead of the model (int)
+     backend - Kind of decode workers, values must be either:
+               thread process (string)
+     timer - Optional PipelineTimer that records decode and inference times
+     cache - Optional PredictionCache, cached predictions are reused and new
+             ones are stored in it
+     topk - Number of most probable classes kept for every image (int)
+     precision - Inference precision, values must be either:
+             fp32 bf16 int8-dynamic (string)
+     draft_scale - JPEG draft mode decoding, 0 decodes in full (see
+             classifier.open_image) (float)
+     tensor_cache - Optional TensorCache, cached preprocessed images are read
+             instead of decoded and the decoded ones are stored in it
     Returns:
      None - results_dic is mutable data type so no return needed.
     """
-    for key in results_dic:
-        image_classification = classifier(images_dir + key, model)
-        image_classification = image_classification.lower().strip()
-        truth = results_dic[key][0]
-        if truth in image_classification:
-            results_dic[key].extend((image_classification, 1))
-        else:
-            results_dic[key].extend((image_classification, 0))
\ No newline at end of file
+    classify_images_multi(images_dir, {model: results_dic}, batch_size, workers,
+                          prefetch, backend, timer, cache, topk, precision=precision,
+                          draft_scale=draft_scale, tensor_cache=tensor_cache)
+
+def classify_images_multi(images_dir, results_by_model, batch_size=32, workers=4,
+                          prefetch=2, backend='thread', timer=None, cache=None,
+                          topk=5, entries=None, on_batch=None, precision='fp32',
+                          draft_scale=0, tensor_cache=None):
+    """
+    Classifies the pet images with several CNN model architectures in a single
+    pass - see classify_images. Every image is decoded and preprocessed once
+    and the resulting batch is fed to each model that still needs it (images
+    found in the cache skip the models they're cached for).
+    Parameters:
+     images_dir - The (full) path to the folder of images that are to be
+                 classified by the classifier function (string)
+     results_by_model - Dictionary with the model architecture (string) as
+                 'key' and that model's results dictionary as 'value'. All the
+                 results dictionaries hold the same filenames and pet labels,
+                 each one is extended as described in classify_images. A
+                 ResultsStore gets its prediction columns set instead.
+     batch_size, workers, prefetch, backend, timer, cache, topk, precision,
+     draft_scale, tensor_cache - See classify_images
+     entries - Optional iterable of (filename, pet label) pairs, ex. the
+                 iter_pet_labels scanner. The images are classified while it's
+                 consumed and every results dictionary gets a [pet label]
+                 list for each filename that it doesn't hold yet, so the
+                 results dictionaries may start out empty.
+     on_batch - Optional function called as on_batch(model, filenames,
+                 predictions) with every batch of images a model has
+                 classified (or found in the cache), predictions are the top-k
+                 lists described in classify_images
+    Returns:
+     None - the results dictionaries are mutable data types so no return needed.
+    """
+    sessions = {model: get_session(model, precision) for model in results_by_model}
+    classifications = {model: {} for model in sessions}
+    image_hashes = {}
+    # cache hits found by the producer, reported to on_batch by the consumer
+    cached_keys = {model: deque() for model in sessions}
+    if cache is not None:
+        model_keys = {model: cache.model_key(session, preprocess_config(draft_scale))
+                      for model, session in sessions.items()}
+    if entries is None:
+        entries = [(key, value[0]) for key, value
+                   in next(iter(results_by_model.values())).items()]
+
+    def pending_paths():
+        """Yields the path of every image at least one model has to classify."""
+        for key, pet_label in entries:
+            for results_dic in results_by_model.values():
+                if key not in results_dic:
+                    results_dic[key] = [pet_label]
+
+            # reuse the cached predictions of unchanged images
+            if cache is not None:
+                image_hashes[key] = file_digest(images_dir + key)
+                for model in sessions:
+                    cached = cache.get(image_hashes[key], model_keys[model], topk)
+                    if cached is not None:
+                        _, top_logits, lse = cached
+                        classifications[model][key] = [
+                            (idx, imagenet_classes_dict[idx].lower().strip(), prob)
+                            for idx, prob in topk_probabilities(top_logits[:topk], lse)]
+                        cached_keys[model].append(key)
+
+            if any(key not in classifications[model] for model in sessions):
+                yield images_dir + key
+
+    def report_cached():
+        """Hands the cache hits found so far to on_batch."""
+        for model, keys in cached_keys.items():
+            batch_keys = [keys.popleft() for _ in range(len(keys))]
+            if batch_keys:
+                on_batch(model, batch_keys,
+                         [classifications[model][key] for key in batch_keys])
+
+    # the paths are produced (scanned, hashed, looked up) while batches decode,
+    # left unnormalized when every model normalizes its input itself
+    normalized = not all(session.includes_normalization for session in sessions.values())
+    read_batches = iter_batches if tensor_cache is None else tensor_cache.iter_batches
+    batches = read_batches(pending_paths(), batch_size, workers, prefetch,
+                           backend, timer, normalized, draft_scale)
+
+    for batch_paths, batch in batches:
+        batch_keys = [path[len(images_dir):] for path in batch_paths]
+        if on_batch is not None:
+            report_cached()
+
+        for model, session in sessions.items():
+            rows = [row for row, key in enumerate(batch_keys)
+                    if key not in classifications[model]]
+            if not rows:
+                continue
+            keys = [batch_keys[row] for row in rows]
+
+            forward_start = perf_counter()
+            output = session.forward(batch if len(rows) == len(batch_keys)
+                                     else batch[rows], normalized)
+            predictions = session.topk(output, topk)
+            if timer is not None:
+                timer.add_inference(model, perf_counter() - forward_start,
+                                    [batch_paths[row] for row in rows])
+
+            classifications[model].update(zip(keys, predictions))
+            if on_batch is not None:
+                on_batch(model, keys, predictions)
+            if cache is not None:
+                for key, (top_logits, lse) in zip(keys, session.top_logits(
+                        output, max(topk, 5))):
+                    cache.put(image_hashes[key], model_keys[model],
+                              top_logits[0][0], top_logits, lse)
+
+    if on_batch is not None:
+        report_cached()
+    if cache is not None:
+        cache.flush()
+    if tensor_cache is not None:
+        tensor_cache.flush()
+
+    # pet label found within the predicted class's label - as class id lookups
+    table = get_class_table()
+    for model, results_dic in results_by_model.items():
+        # images restored from a checkpoint log are filled in by its restore
+        keys = [key for key in results_dic if key in classifications[model]]
+        model_predictions = [classifications[model][key] for key in keys]
+        pred_ids = [predictions[0][0] for predictions in model_predictions]
+        if not keys:
+            continue
+
+        if isinstance(results_dic, ResultsStore):
+            pet_labels = [results_dic.pool.labels[label_id] for label_id in
+                          results_dic.column('pet_label')[results_dic.row_indexes(keys)].tolist()]
+            results_dic.class_labels = table.labels
+            results_dic.set_predictions(
+                keys, table.labels[pred_ids], table.matches(pet_labels, pred_ids),
+                [[class_id for class_id, _, _ in predictions] for predictions in model_predictions],
+                [[prob for _, _, prob in predictions] for predictions in model_predictions])
+            continue
+
+        matches = table.matches([results_dic[key][0] for key in keys], pred_ids)
+        for key, predictions, match in zip(keys, model_predictions, matches.tolist()):
+            results_dic[key].extend((table.labels[predictions[0][0]], match, predictions))
+
+def combine_on_batch(*callbacks):
+    """
+    Returns an on_batch callback calling every given callback (None ones are
+    skipped) in turn, or None when none is given.
+    """
+    callbacks = [callback for callback in callbacks if callback is not None]
+    if not callbacks:
+        return None
+    if len(callbacks) == 1:
+        return callbacks[0]
+
+    def on_batch(model, filenames, predictions):
+        for callback in callbacks:
+            callback(model, filenames, predictions)
+    return on_batch
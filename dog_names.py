@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND-revision/intropyproject-classify-pet-images/dog_names.py
+#
+# PROGRAMMER: Chaklader A. Arefe
+# DATE CREATED: 10/18/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Compiled index of the dog names in dognames.txt. Every line of the
+#          dog file is one breed (its line number is the canonical breed id)
+#          that may list several comma separated aliases, ex.
+#          'maltese dog, maltese terrier, maltese'. The index maps every
+#          normalized alias (and every full line) to its breed id so that a
+#          label like 'collie' or a multi-alias classifier label resolves to
+#          its breed with O(1) dictionary lookups. Indexes are built once per
+#          process and can be serialized to a compact binary file that is
+#          loaded instead of re-parsing the dog file.
+#
+# Use argparse Expected Call with <> indicating expected user input:
+#      python dog_names.py --dogfile <file that contains dognames>
+#             --index_file <binary index file to write>
+#   Example call:
+#    python dog_names.py --dogfile dognames.txt --index_file dognames.idx
+##
+
+import argparse
+import marshal
+import os
+
+# identifies (and versions) the binary index files
+INDEX_MAGIC = 'dog-name-index-v1'
+
+def normalize_name(name):
+    """Lower cases a name, turns '_' into spaces and collapses whitespace."""
+    return ' '.join(name.lower().replace('_', ' ').split())
+
+def file_stamp(path):
+    """Returns what identifies a version of a file: (size, modification time)."""
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+class DogNameIndex:
+    """
+    Index of dog names resolving labels to canonical breed ids.
+    Attributes:
+     breeds - The normalized lines of the dog file, breeds[breed id] (list)
+     aliases - Dictionary with every normalized alias and full line as 'key'
+               and its breed id as 'value', the first breed listing an alias
+               owns it (dict)
+    """
+
+    def __init__(self, breeds):
+        self.breeds = [normalize_name(breed) for breed in breeds]
+        self.aliases = {}
+        for breed_id, breed in enumerate(self.breeds):
+            self.aliases.setdefault(breed, breed_id)
+            for alias in breed.split(','):
+                self.aliases.setdefault(alias.strip(), breed_id)
+        self.aliases.pop('', None)
+
+    @classmethod
+    def from_file(cls, dogfile):
+        """Builds the index of a dog file (one breed per line)."""
+        with open(dogfile, 'r') as f:
+            return cls([line for line in f if line.strip()])
+
+    def breed_id(self, label):
+        """
+        Returns the breed id of a label, -1 when it isn't a dog name. The whole
+        label is looked up first, then each of its comma separated aliases.
+        """
+        name = normalize_name(label)
+        breed_id = self.aliases.get(name)
+        if breed_id is not None:
+            return breed_id
+
+        for alias in name.split(','):
+            breed_id = self.aliases.get(alias.strip())
+            if breed_id is not None:
+                return breed_id
+        return -1
+
+    def is_dog(self, label):
+        """Returns True when the label (or one of its aliases) is a dog name."""
+        return self.breed_id(label) >= 0
+
+    def __contains__(self, label):
+        return self.is_dog(label)
+
+    def __len__(self):
+        return len(self.breeds)
+
+    def save(self, index_file, source_stamp=None):
+        """
+        Serializes the index to a compact binary file (marshal format),
+        source_stamp (see file_stamp) records the dog file it was built from.
+        """
+        with open(index_file, 'wb') as f:
+            marshal.dump((INDEX_MAGIC, source_stamp, self.breeds, self.aliases), f)
+
+    @classmethod
+    def load(cls, index_file, source_stamp=None):
+        """
+        Loads an index written by save. Returns None when the file isn't an
+        index or, given a source_stamp, was built from another dog file.
+        """
+        try:
+            with open(index_file, 'rb') as f:
+                magic, stamp, breeds, aliases = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if magic != INDEX_MAGIC or (source_stamp is not None and
+                                    tuple(stamp or ()) != tuple(source_stamp)):
+            return None
+
+        index = cls.__new__(cls)
+        index.breeds = breeds
+        index.aliases = aliases
+        return index
+
+# indexes built in this process, by dog file path
+loaded_indexes = {}
+
+def load_dog_index(dogfile, index_file=None):
+    """
+    Returns the DogNameIndex of a dog file. The index is built once per
+    process and per version of the dog file. With an index_file the index is
+    loaded from that binary file when it was built from the current dog file,
+    otherwise it's built from the dog file and written to index_file.
+    Parameters:
+     dogfile - Text file with one dog name per line (string)
+     index_file - Optional binary index file (string)
+    Returns:
+     The DogNameIndex of the dog file
+    """
+    stamp = file_stamp(dogfile)
+    key = os.path.abspath(dogfile)
+    cached = loaded_indexes.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    index = DogNameIndex.load(index_file, stamp) if index_file else None
+    if index is None:
+        index = DogNameIndex.from_file(dogfile)
+        if index_file:
+            index.save(index_file, stamp)
+
+    loaded_indexes[key] = (stamp, index)
+    return index
+
+def main():
+    parser = argparse.ArgumentParser(description='compile the dog name index')
+    parser.add_argument('--dogfile', type=str, default='dognames.txt',
+                        help='text file that has dognames')
+    parser.add_argument('--index_file', type=str, default='dognames.idx',
+                        help='binary index file to write')
+    in_arg = parser.parse_args()
+
+    index = DogNameIndex.from_file(in_arg.dogfile)
+    index.save(in_arg.index_file, file_stamp(in_arg.dogfile))
+    print("Indexed {} breeds ({} names) into {}".format(
+        len(index), len(index.aliases), in_arg.index_file))
+
+if __name__ == "__main__":
+    main()
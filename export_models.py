@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND-revision/intropyproject-classify-pet-images/export_models.py
+#
+# PROGRAMMER: Chaklader A. Arefe
+# DATE CREATED: 10/18/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Exports the model architectures of classifier.py as TorchScript
+#          artifacts for a faster cold start. Every model is wrapped with the
+#          ImageNet normalization of its input (NormalizedModel), traced (or
+#          scripted), frozen (the weights become constants of the graph) and
+#          saved next to the weights files (see scripted_path). With
+#          --scripted, check_images.py loads these artifacts instead of
+#          building the torchvision models and loading their weights. The
+#          --cold_start option measures the time from launching a fresh
+#          process to its first prediction, with and without the artifacts.
+#
+# Use argparse Expected Call with <> indicating expected user input:
+#      python export_models.py --arch <models> --weights_dir <weights folder>
+#             --method <trace or script> --cold_start <image to classify>
+#   Example call:
+#    python export_models.py --arch all --cold_start pet_images/Beagle_01141.jpg
+##
+
+import argparse
+import subprocess
+import sys
+from time import perf_counter
+
+import torch
+
+from classifier import (NormalizedModel, architectures, inference_mode, load_scripted_model,
+                        models, scripted_path)
+
+# launched in a fresh process: classifies one image and prints its label
+COLD_START_SCRIPT = """
+from classifier import get_session, load_image, models
+models.weights_dir = {weights_dir!r}
+models.scripted = {scripted!r}
+session = get_session({arch!r})
+normalized = not session.includes_normalization
+print(session.labels(session.forward(load_image({image!r}, normalized).unsqueeze(0),
+                                     normalized))[0], flush=True)
+"""
+
+def export_model(model_name, weights_dir=None, method='trace'):
+    """
+    Exports a model architecture with its input normalization as a frozen
+    TorchScript artifact. Returns the artifact's path and the largest
+    difference between its output and the eager model's output on a random
+    batch.
+    """
+    model = NormalizedModel(models[model_name].eval()).eval()
+    example = torch.rand(2, 3, 224, 224)
+    with inference_mode():
+        expected = model(example)
+
+    if method == 'trace':
+        scripted = torch.jit.trace(model, example[:1])
+    else:
+        scripted = torch.jit.script(model)
+    frozen = torch.jit.freeze(scripted)
+
+    path = scripted_path(model_name, weights_dir)
+    torch.jit.save(frozen, path)
+    with inference_mode():
+        difference = (load_scripted_model(path)(example) - expected).abs().max().item()
+    return path, difference
+
+def cold_start(model_name, image, weights_dir, scripted):
+    """
+    Returns the seconds from launching a fresh Python process to its first
+    prediction (the label printed by COLD_START_SCRIPT) and that label.
+    """
+    start = perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, '-c', COLD_START_SCRIPT.format(
+            weights_dir=weights_dir, scripted=scripted, arch=model_name, image=image)],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    label = process.stdout.readline().strip()
+    seconds = perf_counter() - start
+    process.wait()
+    return seconds, label
+
+def main():
+    parser = argparse.ArgumentParser(description='export TorchScript artifacts')
+    parser.add_argument('--arch', type=str, default='all',
+                        help='models to export, a comma separated list or all')
+    parser.add_argument('--weights_dir', type=str, default='weights/',
+                        help='folder with the weights files, the artifacts are written there')
+    parser.add_argument('--method', type=str, default='trace', choices=['trace', 'script'],
+                        help='torch.jit.trace or torch.jit.script')
+    parser.add_argument('--cold_start', type=str, default=None,
+                        help='image classified to measure the cold start')
+    in_arg = parser.parse_args()
+
+    models.weights_dir = in_arg.weights_dir
+    archs = list(architectures) if in_arg.arch == 'all' else in_arg.arch.split(',')
+
+    for arch in archs:
+        path, difference = export_model(arch, in_arg.weights_dir, in_arg.method)
+        print("Exported {} to {} (max difference {:.2e})".format(arch, path, difference))
+
+    if in_arg.cold_start:
+        print("\n*** Cold Start, Launch to First Prediction ***")
+        print("{:10} {:>12} {:>12} {:>10}".format('', 'torchvision', 'torchscript', 'speedup'))
+        for arch in archs:
+            eager, eager_label = cold_start(arch, in_arg.cold_start, in_arg.weights_dir, False)
+            scripted, scripted_label = cold_start(arch, in_arg.cold_start,
+                                                  in_arg.weights_dir, True)
+            print("{:10} {:11.2f}s {:11.2f}s {:9.2f}x{}".format(
+                arch, eager, scripted, eager / scripted,
+                '' if eager_label == scripted_label else '  (labels differ)'))
+
+if __name__ == "__main__":
+    main()
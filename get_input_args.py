@@ -4,29 +4,137 @@
 #                                                                          
 # PROGRAMMER: Chaklader A. Arefe
 # DATE CREATED: 08/03/2024
-# REVISED DATE: 08/03/2024
-# PURPOSE: Create a function that retrieves the following 3 command line inputs 
+# REVISED DATE: 10/18/2026
+# PURPOSE: Create a function that retrieves the following command line inputs 
 #          from the user using the Argparse Python module. If the user fails to 
-#          provide some or all of the 3 inputs, then the default values are
+#          provide some or all of the inputs, then the default values are
 #          used for the missing inputs. Command Line Arguments:
 #     1. Image Folder as --dir with default value 'pet_images'
-#     2. CNN Model Architecture as --arch with default value 'vgg'
+#     2. CNN Model Architecture as --arch with default value 'vgg', several
+#        architectures are compared in one run with a comma separated list
+#        (ex. resnet,alexnet,vgg) or 'all'
 #     3. Text File with Dog Names as --dogfile with default value 'dognames.txt'
+#     4. Images per Forward Pass as --batch_size with default value 32
+#     5. Folder with Pretrained Weights as --weights_dir with default value
+#        'weights/'
+#     6. Number of Image Decode Workers as --decode_workers with default value 4
+#     7. Decoded Batches Queued Ahead of the Model as --prefetch with default
+#        value 2
+#     8. Kind of Decode Workers as --decode_backend with default value 'thread'
+#     9. Prediction Cache File as --cache_file with default value None (no
+#        cache)
+#    10. Predictions Kept in the Cache as --cache_size with default value 100000
+#    11. Most Probable Classes Kept per Image as --topk with default value 5
+#    12. Count an Image as Classified a Dog when Any of its Top-k Predictions
+#        is a Dog as --dog_in_topk (flag)
+#    13. Lowest Probability of a Prediction that Classifies an Image as a Dog
+#        as --min_confidence with default value 0.0
+#    14. Also Classify the Images in Subfolders of --dir as --recursive (flag)
+#    15. Compiled Dog Name Index File as --dog_index with default value None
+#    16. Print the Running Statistics Every N Images as --print_every with
+#        default value 0 (never)
+#    17. Number of Classification Worker Processes as --workers with default
+#        value 0 (classify in this process)
+#    18. How the Worker Processes Get the Model Weights as --weights_sharing
+#        with default value 'none'
+#    19. Inference Precision as --precision with default value 'fp32'
+#    20. Use the Exported TorchScript Models as --scripted (flag)
+#    21. Classification Server to Classify the Images on as --server with
+#        default value None (classify in this process)
+#    22. Decode JPEGs in Draft Mode to at Least this Many Times the Resize
+#        Target as --jpeg_draft with default value 0 (full decode)
+#    23. Folder of the Preprocessed Tensor Cache as --tensor_cache with
+#        default value None (no cache)
+#    24. Report of the Time Spent in Each Stage as --profile with default
+#        value None (no report), 'table' prints it and 'json' writes it
+#    25. JSON File the Report is Written to as --profile_file with default
+#        value 'profile.json'
+#    26. Lab Checks of the Results as --checks with default value 'full'
+#        (every image), 'sample' checks --check_samples random images and
+#        'off' skips them
+#    27. Number of Images Checked with --checks sample as --check_samples
+#        with default value 20
+#    28. Append-Only Checkpoint Log of the Classified Images as --checkpoint
+#        with default value None (no checkpoint)
+#    29. Number of Images Logged per Checkpoint Write as --checkpoint_every
+#        with default value 1000
+#    30. Resume from the Checkpoint Log as --resume (images already in the
+#        log aren't classified again)
+#    31. Print the Top-K Predictions of the Incorrect Classifications as
+#        --print_topk
+#    32. Print the Dog/Not-Dog Confusion Matrix and the Accuracy of Every
+#        Dog Breed as --print_breakdown
+#    33. Start an Existing Checkpoint Log Over as --overwrite_checkpoint
+#        (without it or --resume an existing log is refused)
 ##
 
 import argparse
 
 def get_input_args():
     """
-    Retrieves and parses the 3 command line arguments provided by the user when
+    Retrieves and parses the command line arguments provided by the user when
     they run the program from a terminal window. This function uses Python's 
-    argparse module to created and defined these 3 command line arguments. If 
-    the user fails to provide some or all of the 3 arguments, then the default 
+    argparse module to created and defined these command line arguments. If 
+    the user fails to provide some or all of the arguments, then the default 
     values are used for the missing arguments. 
     Command Line Arguments:
       1. Image Folder as --dir with default value 'pet_images'
-      2. CNN Model Architecture as --arch with default value 'vgg'
+      2. CNN Model Architecture as --arch with default value 'vgg', several
+         architectures are compared in one run with a comma separated list
+         (ex. resnet,alexnet,vgg) or 'all'
       3. Text File with Dog Names as --dogfile with default value 'dognames.txt'
+      4. Images per Forward Pass as --batch_size with default value 32
+      5. Folder with Pretrained Weights as --weights_dir with default value
+         'weights/'
+      6. Number of Image Decode Workers as --decode_workers with default value 4
+      7. Decoded Batches Queued Ahead of the Model as --prefetch with default
+         value 2
+      8. Kind of Decode Workers as --decode_backend with default value 'thread'
+      9. Prediction Cache File as --cache_file with default value None (no
+         cache)
+     10. Predictions Kept in the Cache as --cache_size with default value 100000
+     11. Most Probable Classes Kept per Image as --topk with default value 5
+     12. Count an Image as Classified a Dog when Any of its Top-k Predictions
+         is a Dog as --dog_in_topk (flag)
+     13. Lowest Probability of a Prediction that Classifies an Image as a Dog
+         as --min_confidence with default value 0.0
+     14. Also Classify the Images in Subfolders of --dir as --recursive (flag)
+     15. Compiled Dog Name Index File as --dog_index with default value None
+     16. Print the Running Statistics Every N Images as --print_every with
+         default value 0 (never)
+     17. Number of Classification Worker Processes as --workers with default
+         value 0 (classify in this process)
+     18. How the Worker Processes Get the Model Weights as --weights_sharing
+         with default value 'none'
+     19. Inference Precision as --precision with default value 'fp32'
+     20. Use the Exported TorchScript Models as --scripted (flag)
+     21. Classification Server to Classify the Images on as --server with
+         default value None (classify in this process)
+     22. Decode JPEGs in Draft Mode to at Least this Many Times the Resize
+         Target as --jpeg_draft with default value 0 (full decode)
+     23. Folder of the Preprocessed Tensor Cache as --tensor_cache with
+         default value None (no cache)
+     24. Report of the Time Spent in Each Stage as --profile with default
+         value None (no report), 'table' prints it and 'json' writes it
+     25. JSON File the Report is Written to as --profile_file with default
+         value 'profile.json'
+     26. Lab Checks of the Results as --checks with default value 'full'
+         (every image), 'sample' checks --check_samples random images and
+         'off' skips them
+     27. Number of Images Checked with --checks sample as --check_samples
+         with default value 20
+     28. Append-Only Checkpoint Log of the Classified Images as --checkpoint
+         with default value None (no checkpoint)
+     29. Number of Images Logged per Checkpoint Write as --checkpoint_every
+         with default value 1000
+     30. Resume from the Checkpoint Log as --resume (images already in the
+         log aren't classified again)
+     31. Print the Top-K Predictions of the Incorrect Classifications as
+         --print_topk
+     32. Print the Dog/Not-Dog Confusion Matrix and the Accuracy of Every
+         Dog Breed as --print_breakdown
+     33. Start an Existing Checkpoint Log Over as --overwrite_checkpoint
+         (without it or --resume an existing log is refused)
     This function returns these arguments as an ArgumentParser object.
     Parameters:
      None - simply using argparse module to create & store command line arguments
@@ -39,9 +147,102 @@ def get_input_args():
                        help='path to folder of images')
     
     parser.add_argument('--arch', type=str, default='vgg',
-                       help='chosen model')
+                       help='chosen model, a comma separated list or all compares several')
     
     parser.add_argument('--dogfile', type=str, default='dognames.txt',
                        help='text file that has dognames')
     
+    parser.add_argument('--batch_size', type=int, default=32,
+                       help='number of images classified per forward pass')
+    
+    parser.add_argument('--weights_dir', type=str, default='weights/',
+                       help='folder with the local pretrained weights files')
+    
+    parser.add_argument('--decode_workers', type=int, default=4,
+                       help='number of workers decoding images, 0 decodes on the main thread')
+    
+    parser.add_argument('--prefetch', type=int, default=2,
+                       help='number of decoded batches queued ahead of the model')
+    
+    parser.add_argument('--decode_backend', type=str, default='thread',
+                       choices=['thread', 'process'],
+                       help='kind of decode workers')
+    
+    parser.add_argument('--cache_file', type=str, default=None,
+                       help='file caching predictions across runs, no cache if omitted')
+    
+    parser.add_argument('--cache_size', type=int, default=100000,
+                       help='number of predictions kept in the cache (LRU eviction)')
+    
+    parser.add_argument('--topk', type=int, default=5,
+                       help='number of most probable classes kept for every image')
+    
+    parser.add_argument('--dog_in_topk', action='store_true',
+                       help='classify an image as a dog when any top-k prediction is a dog')
+    
+    parser.add_argument('--min_confidence', type=float, default=0.0,
+                       help='lowest probability of a prediction that classifies an image as a dog')
+    
+    parser.add_argument('--recursive', action='store_true',
+                       help='also classify the images in subfolders of --dir')
+    
+    parser.add_argument('--dog_index', type=str, default=None,
+                       help='binary file caching the compiled dog name index')
+    
+    parser.add_argument('--print_every', type=int, default=0,
+                       help='print the running pct_match and pct_correct_dogs every N images, 0 never')
+    
+    parser.add_argument('--workers', type=int, default=0,
+                       help='number of worker processes classifying shards of the images, 0 classifies in this process')
+    
+    parser.add_argument('--weights_sharing', type=str, default='none',
+                       choices=['none', 'mmap', 'shared'],
+                       help='worker weights: own copy, memory-mapped weights files or shared memory loaded once')
+    
+    parser.add_argument('--precision', type=str, default='fp32',
+                       choices=['fp32', 'bf16', 'int8-dynamic'],
+                       help='inference precision, bf16 and int8-dynamic also run channels-last')
+    
+    parser.add_argument('--scripted', action='store_true',
+                       help='use the TorchScript models exported by export_models.py when they exist')
+    
+    parser.add_argument('--server', type=str, default=None,
+                       help='classification server address, unix:<socket> or http://<host>:<port>')
+    
+    parser.add_argument('--jpeg_draft', type=float, default=0,
+                       help='decode JPEGs in draft mode to at least this many times the resize target, 0 decodes in full')
+    
+    parser.add_argument('--tensor_cache', type=str, default=None,
+                       help='folder caching the preprocessed images (classification in this process only)')
+    
+    parser.add_argument('--profile', type=str, default=None, choices=['table', 'json'],
+                       help='report the time spent in each stage as a table or as JSON')
+    
+    parser.add_argument('--profile_file', type=str, default='profile.json',
+                       help='JSON file the --profile json report is written to')
+    
+    parser.add_argument('--checks', type=str, default='full', choices=['off', 'sample', 'full'],
+                       help='lab checks of the results: every image, a random sample or none')
+    
+    parser.add_argument('--check_samples', type=int, default=20,
+                       help='number of random images checked with --checks sample')
+    
+    parser.add_argument('--checkpoint', type=str, default=None,
+                       help='append-only log of the classified images, a run can be resumed from it')
+    
+    parser.add_argument('--checkpoint_every', type=int, default=1000,
+                       help='number of images logged per (synced) checkpoint write')
+    
+    parser.add_argument('--resume', action='store_true',
+                       help='skip the images already in the --checkpoint log, restoring their results')
+    
+    parser.add_argument('--print_topk', action='store_true',
+                       help='print the top-k predictions under every incorrect classification')
+    
+    parser.add_argument('--print_breakdown', action='store_true',
+                       help='print the dog/not-dog confusion matrix and the accuracy of every breed')
+    
+    parser.add_argument('--overwrite_checkpoint', action='store_true',
+                       help='start an existing --checkpoint log over instead of refusing it')
+    
     return parser.parse_args()
@@ -4,7 +4,7 @@
 #                                                                          
 # PROGRAMMER: Chaklader A. Arefe
 # DATE CREATED: 08/03/2024
-# REVISED DATE: 08/03/2024
+# REVISED DATE: 10/18/2026
 # PURPOSE: Create the function get_pet_labels that creates the pet labels from 
 #          the image's filename. This function inputs: 
 #           - The Image Folder as image_dir within get_pet_labels function and 
@@ -14,9 +14,16 @@
 #          The results_dic dictionary has a 'key' that's the image filename and
 #          a 'value' that's a list. This list will contain the following item
 #          at index 0 : pet image label (string).
+#          iter_pet_labels scans the folder incrementally with os.scandir and
+#          yields (filename, pet label) pairs as it goes, so classification can
+#          start on the first images of a very large folder while the rest of
+#          the folder is still being scanned.
 ##
 
-from os import listdir
+import os
+
+# file extensions (lower case) of the images that are classified
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tif', '.tiff', '.webp')
 
 def create_pet_label(filename):
     """
@@ -29,7 +36,35 @@ def create_pet_label(filename):
     words = filename.lower().split('_')
     return ' '.join(word for word in words if word.isalpha()).strip()
 
-def get_pet_labels(image_dir):
+def iter_pet_labels(image_dir, recursive=False, extensions=IMAGE_EXTENSIONS):
+    """
+    Scans the folder of images with os.scandir and yields the pet label of
+    every image as soon as it's found. Files are filtered by their extension
+    alone, so no entry is stat-ed (subfolders are recognized from the type
+    information returned with the folder listing). Hidden files and folders
+    are skipped.
+    Parameters:
+     image_dir - The (full) path to the folder of images (string)
+     recursive - True also scans the subfolders, False only scans image_dir
+                 itself (default) (bool)
+     extensions - Lower case extensions of the image files (tuple)
+    Yields:
+     (filename, pet label) - The image's path relative to image_dir and its
+                             pet label (strings)
+    """
+    folders = ['']
+    while folders:
+        folder = folders.pop()
+        with os.scandir(os.path.join(image_dir, folder)) as entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                if recursive and entry.is_dir():
+                    folders.append(os.path.join(folder, entry.name))
+                elif entry.name.lower().endswith(extensions):
+                    yield os.path.join(folder, entry.name), create_pet_label(entry.name)
+
+def get_pet_labels(image_dir, recursive=False):
     """
     Creates a dictionary of pet labels (results_dic) based upon the filenames 
     of the image files. These pet image labels are used to check the accuracy 
@@ -41,20 +76,19 @@ def get_pet_labels(image_dir):
     Parameters:
      image_dir - The (full) path to the folder of images that are to be
                 classified by the classifier function (string)
+     recursive - True also labels the images in subfolders, their filenames
+                are then relative paths (bool)
     Returns:
       results_dic - Dictionary with 'key' as image filename and 'value' as a 
       List. The list contains for following item:
          index 0 = pet image label (string)
     """
-    # Get list of files, excluding hidden files
-    image_files = [f for f in listdir(image_dir) if not f.startswith('.')]
-    
     # Create dictionary with filename keys and pet name values
     results_dic = {}
     
-    for filename in image_files:
+    for filename, pet_label in iter_pet_labels(image_dir, recursive):
         if filename not in results_dic:
-            results_dic[filename] = [create_pet_label(filename)]
+            results_dic[filename] = [pet_label]
         else:
             print(f"** Warning: Duplicate files exist in directory: {filename}")
     
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND-revision/intropyproject-classify-pet-images/image_pipeline.py
+#
+# PROGRAMMER: Chaklader A. Arefe
+# DATE CREATED: 10/18/2026
+# REVISED DATE: 10/18/2026
+# PURPOSE: Producer/consumer pipeline that decodes and preprocesses images on
+#          a pool of workers (threads or processes) while the model runs the
+#          forward pass on the previous batch. A producer thread submits one
+#          job per batch to the pool and puts the pending batches into a
+#          bounded queue (the prefetch depth), the inference loop consumes the
+#          batches from that queue in their original order. A PipelineTimer
+#          records how the time was split between decoding and inference and
+#          the cold start: the time from the launch of the process to the
+#          first prediction. It also keeps the decode, preprocess and forward
+#          pass time of every image (nanoseconds) for the per-image latency
+#          percentiles of the stage profiler (see stage_profiler.py).
+#          decode_jobs is the pipeline itself, for callers that decode only
+#          some images of each batch (see tensor_cache.py).
+##
+
+import os
+import queue
+import threading
+from contextlib import closing
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from time import perf_counter, perf_counter_ns, time
+
+import torch
+
+from classifier import open_image, preprocess, preprocess_unnormalized
+
+executors = {'thread': ThreadPoolExecutor, 'process': ProcessPoolExecutor}
+
+# fallback launch time where /proc isn't available: when this module loaded
+imported_at = time()
+
+def process_start_time():
+    """
+    Returns the time (seconds since the epoch) this process was launched,
+    read from /proc (start time in clock ticks since boot plus the boot time).
+    """
+    try:
+        with open('/proc/self/stat') as f:
+            # fields after the command name, which may contain spaces
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/stat') as f:
+            boot_time = next(int(line.split()[1]) for line in f
+                             if line.startswith('btime'))
+        return boot_time + start_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, StopIteration):
+        return imported_at
+
+class PipelineTimer:
+    """
+    Accumulates the time spent in each part of the pipeline (seconds).
+    Attributes:
+     decode - Time the workers spent decoding and preprocessing images, summed
+              over all workers (float)
+     wait - Time the inference loop sat idle waiting for a batch to be
+            decoded (float)
+     inference - Time spent in the models' forward passes (float)
+     inference_by_model - Forward pass time of each model architecture (dict)
+     n_images - Number of images that went through the pipeline (int)
+     first_prediction - Time (seconds since the epoch) the first forward pass
+            finished, None before that (float)
+     image_ns - Dictionary with the image's path as 'key' and its [decode,
+            preprocess, forward pass share] nanoseconds as 'value', the
+            share is the forward time of its batch divided among its images,
+            summed over the models
+    """
+
+    def __init__(self):
+        self.decode = 0.0
+        self.wait = 0.0
+        self.inference = 0.0
+        self.inference_by_model = {}
+        self.n_images = 0
+        self.first_prediction = None
+        self.image_ns = {}
+
+    def add_images(self, img_paths, image_ns):
+        """Records the (decode, preprocess) nanoseconds of every image of a batch."""
+        for img_path, (decode_ns, preprocess_ns) in zip(img_paths, image_ns):
+            self.image_ns[img_path] = [decode_ns, preprocess_ns, 0]
+
+    def add_inference(self, model, seconds, img_paths=None):
+        """
+        Records the time of a forward pass of a model architecture, divided
+        among the images of the batch when their paths are given.
+        """
+        self.inference += seconds
+        self.inference_by_model[model] = self.inference_by_model.get(model, 0.0) + seconds
+        if self.first_prediction is None:
+            self.first_prediction = time()
+        if img_paths:
+            share_ns = int(seconds * 1e9 / len(img_paths))
+            for img_path in img_paths:
+                self.image_ns.setdefault(img_path, [0, 0, 0])[2] += share_ns
+
+    def latencies_ns(self):
+        """Returns the decode + preprocess + forward nanoseconds of every image."""
+        return [sum(times) for times in self.image_ns.values()]
+
+    def print_summary(self):
+        """Prints the split of time between decoding and inference."""
+        busy = self.wait + self.inference
+        print("\n*** Pipeline Timing for {} Images ***".format(self.n_images))
+        print("{:20}: {:8.2f} s".format('Decode (workers)', self.decode))
+        print("{:20}: {:8.2f} s".format('Waiting for decode', self.wait))
+        print("{:20}: {:8.2f} s".format('Inference', self.inference))
+        if len(self.inference_by_model) > 1:
+            for model, seconds in self.inference_by_model.items():
+                print("{:20}: {:8.2f} s".format('  ' + model.upper(), seconds))
+        if busy > 0:
+            print("{:20}: {:7.1f}%".format('Inference share', 100.0 * self.inference / busy))
+            print("Bottleneck: {}".format('decode' if self.wait > self.inference
+                                          else 'inference'))
+        if self.first_prediction is not None:
+            print("{:20}: {:8.2f} s (launch to first prediction)".format(
+                'Cold start', self.first_prediction - process_start_time()))
+
+def load_batch(img_paths, normalized=True, draft_scale=0):
+    """
+    Decodes and preprocesses a batch of images into one (N x 3 x 224 x 224)
+    tensor (see classifier.load_image for normalized and draft_scale). Runs
+    inside the pool workers, returns the tensor, the seconds it took and the
+    (decode, preprocess) nanoseconds of every image.
+    """
+    start = perf_counter()
+    transform = preprocess if normalized else preprocess_unnormalized
+    images = []
+    image_ns = []
+    for img_path in img_paths:
+        decode_start = perf_counter_ns()
+        image = open_image(img_path, draft_scale)
+        preprocess_start = perf_counter_ns()
+        images.append(transform(image))
+        image_ns.append((preprocess_start - decode_start, perf_counter_ns() - preprocess_start))
+    batch = torch.stack(images)
+    return batch, perf_counter() - start, image_ns
+
+def iter_batches(img_paths, batch_size=32, workers=4, prefetch=2,
+                 backend='thread', timer=None, normalized=True, draft_scale=0):
+    """
+    Yields the images of img_paths as preprocessed batches, in order.
+    img_paths may be any iterable (ex. a generator scanning a folder), it's
+    consumed incrementally so the first batches are classified while later
+    paths are still being produced. With
+    workers > 0 the batches are decoded by a pool of workers ahead of the
+    consumer, at most prefetch batches are decoded (or decoding) and waiting
+    to be consumed at any time. With workers = 0 each batch is decoded on the
+    calling thread when it's needed.
+    Parameters:
+     img_paths - The (full) paths to the images (iterable)
+     batch_size - Maximum number of images per batch, the final batch holds
+                  whatever images remain (int)
+     workers - Number of decode workers, 0 decodes on the calling thread (int)
+     prefetch - Number of batches queued ahead of the consumer (int)
+     backend - Kind of decode workers, values must be either:
+               thread process (string)
+     timer - Optional PipelineTimer that accumulates decode and wait times
+     normalized - False leaves the ImageNet normalization out of the
+                  preprocessing, for models that normalize their input (bool)
+     draft_scale - JPEG draft mode decoding, 0 decodes in full (see
+                  classifier.open_image) (float)
+    Yields:
+     (batch_paths, batch) - The paths of a batch (list) and its images as a
+                            (N x 3 x 224 x 224) tensor
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1, got {}".format(batch_size))
+
+    timer = timer or PipelineTimer()
+    paths = iter(img_paths)
+    chunks = iter(lambda: list(islice(paths, batch_size)), [])
+    with closing(decode_jobs(((chunk, chunk) for chunk in chunks), workers, prefetch,
+                             backend, timer, normalized, draft_scale)) as jobs:
+        for chunk, (batch, _, image_ns) in jobs:
+            timer.n_images += len(chunk)
+            timer.add_images(chunk, image_ns)
+            yield chunk, batch
+
+def decode_jobs(jobs, workers=4, prefetch=2, backend='thread', timer=None,
+                normalized=True, draft_scale=0):
+    """
+    Runs load_batch on the image paths of every job, on a pool of workers
+    ahead of the consumer like iter_batches (same parameters). jobs is an
+    iterable of (tag, img_paths) consumed incrementally on the producer
+    thread, the tag is handed back with the result.
+    Yields:
+     (tag, result) - In the order of jobs, result is what load_batch returns
+                     or None when img_paths is empty
+    """
+    if backend not in executors:
+        raise ValueError("Unknown decode backend '{}', values must be either: "
+                         "{}".format(backend, ' '.join(executors)))
+
+    timer = timer or PipelineTimer()
+    if workers < 1:
+        for tag, img_paths in jobs:
+            result = None
+            if img_paths:
+                result = load_batch(img_paths, normalized, draft_scale)
+                timer.decode += result[1]
+                timer.wait += result[1]
+            yield tag, result
+        return
+
+    pending = queue.Queue(maxsize=max(1, prefetch))
+    stop = threading.Event()
+    pool = executors[backend](max_workers=workers)
+
+    def produce():
+        try:
+            for tag, img_paths in jobs:
+                if stop.is_set():
+                    return
+                pending.put((tag, pool.submit(load_batch, img_paths, normalized, draft_scale)
+                             if img_paths else None))
+        except Exception as error:
+            # hand errors of img_paths (ex. a missing folder) to the consumer
+            pending.put(error)
+            return
+        pending.put(None)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+
+    try:
+        while True:
+            start = perf_counter()
+            item = pending.get()
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                raise item
+            tag, future = item
+            result = future.result() if future is not None else None
+            timer.wait += perf_counter() - start
+            if result is not None:
+                timer.decode += result[1]
+            yield tag, result
+    finally:
+        # consumer done (or gone) - unblock the producer and drop queued work
+        stop.set()
+        while producer.is_alive():
+            try:
+                pending.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -1,7 +1,24 @@
 import math
+import numpy as np
 import matplotlib.pyplot as plt
 from .Generaldistribution import Distribution
 
+try:
+	from scipy.special import erf as _erf
+except ImportError:
+	def _erf(z):
+		"""Error function of an array in one vectorized pass (Abramowitz and
+		Stegun 7.1.26, absolute error below 1.5e-7)."""
+		sign = np.sign(z)
+		z = np.abs(z)
+		t = 1.0 / (1.0 + 0.3275911 * z)
+		poly = t * np.polyval([1.061405429, -1.453152027, 1.421413741, -0.284496736, 0.254829592], t)
+		return sign * (1.0 - poly * np.exp(-z * z))
+
+def _output(x, values):
+	"""Returns values as a float when x is a scalar, as an array otherwise."""
+	return float(values) if np.ndim(x) == 0 else values
+
 class Gaussian(Distribution):
 	""" Gaussian distribution class for calculating and 
 	visualizing a Gaussian distribution.
@@ -116,14 +133,52 @@ class Gaussian(Distribution):
 		"""Probability density function calculator for the gaussian distribution.
 		
 		Args:
-			x (float): point for calculating the probability density function
+			x (float or array of floats): point(s) for calculating the probability
+				density function, arrays are evaluated in one vectorized call
+			
+		
+		Returns:
+			float: probability density function output (array for array input)
+		"""
+		
+		z = (np.asarray(x, dtype=float) - self.mean) / self.stdev
+		
+		return _output(x, np.exp(-0.5 * z ** 2) / (self.stdev * math.sqrt(2*math.pi)))
+		
+
+	def logpdf(self, x):
+		"""Natural log of the probability density function, accurate far in the
+		tails where pdf underflows to 0.
+		
+		Args:
+			x (float or array of floats): point(s) for calculating the log of the
+				probability density function
 			
 		
 		Returns:
-			float: probability density function output
+			float: log probability density output (array for array input)
 		"""
 		
-		return (1.0 / (self.stdev * math.sqrt(2*math.pi))) * math.exp(-0.5*((x - self.mean) / self.stdev) ** 2)
+		z = (np.asarray(x, dtype=float) - self.mean) / self.stdev
+		
+		return _output(x, -0.5 * z ** 2 - math.log(self.stdev * math.sqrt(2*math.pi)))
+		
+
+	def cdf(self, x):
+		"""Cumulative distribution function calculator for the gaussian distribution.
+		
+		Args:
+			x (float or array of floats): point(s) for calculating the cumulative
+				distribution function
+			
+		
+		Returns:
+			float: probability of a value at most x (array for array input)
+		"""
+		
+		z = (np.asarray(x, dtype=float) - self.mean) / (self.stdev * math.sqrt(2))
+		
+		return _output(x, 0.5 * (1.0 + _erf(z)))
 		
 
 	def plot_histogram_pdf(self, n_spaces = 50):
@@ -149,14 +204,9 @@ class Gaussian(Distribution):
 		 # calculates the interval between x values
 		interval = 1.0 * (max_range - min_range) / n_spaces
 
-		x = []
-		y = []
-		
-		# calculate the x values to visualize
-		for i in range(n_spaces):
-			tmp = min_range + interval*i
-			x.append(tmp)
-			y.append(self.pdf(tmp))
+		# calculate the x values to visualize and their pdf in one call
+		x = min_range + interval * np.arange(n_spaces)
+		y = self.pdf(x)
 
 		# make the plots
 		fig, axes = plt.subplots(2,sharex=True)
@@ -170,7 +220,7 @@ class Gaussian(Distribution):
 		axes[0].set_ylabel('Density')
 		plt.show()
 
-		return x, y
+		return x.tolist(), y.tolist()
 		
 	def __add__(self, other):
 		
@@ -1,5 +1,4 @@
 import math
-import matplotlib.pyplot as plt
 from .Generaldistribution import Distribution
 
 class Binomial(Distribution):
@@ -129,6 +128,8 @@ class Binomial(Distribution):
         Returns:
             None
         """
+        # imported here so the package works without matplotlib until plotting
+        import matplotlib.pyplot as plt
             
         # TODO: Use the matplotlib package to plot a bar chart of the data
         #       The x-axis should have the value zero or one
@@ -176,6 +177,7 @@ class Binomial(Distribution):
             list: y values for the pdf plot
             
         """
+        import matplotlib.pyplot as plt
     
         # TODO: Use a bar chart to plot the probability density function from
         # k = 0 to k = n
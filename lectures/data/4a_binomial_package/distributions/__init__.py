@@ -0,0 +1,9 @@
+from .Gaussiandistribution import Gaussian
+
+try:
+    from .Binomialdistribution import Binomial
+except ModuleNotFoundError as error:
+    # Binomialdistribution.py is moved in here by the binomial exercise
+    if error.name != __name__ + '.Binomialdistribution':
+        raise
+    Binomial = None
@@ -6,6 +6,8 @@
 
 import unittest
 
+import numpy as np
+
 from distributions import Gaussian
 from distributions import Binomial
 
@@ -38,6 +40,22 @@ class TestGaussianClass(unittest.TestCase):
         self.assertEqual(round(self.gaussian.pdf(75), 5), 0.00429,\
         'pdf function after calculating mean and stdev does not give expected result')      
 
+    def test_pdf_array(self):
+        x = np.array([21, 25, 27.5])
+        self.assertEqual([round(y, 5) for y in self.gaussian.pdf(x)],\
+         [round(self.gaussian.pdf(float(value)), 5) for value in x], 'pdf of an array not as expected')
+        self.assertIsInstance(self.gaussian.pdf(25), float, 'pdf of a scalar is not a float')
+
+    def test_logpdf(self):
+        self.assertEqual(round(self.gaussian.logpdf(25), 5), -1.61209)
+        self.assertTrue(np.allclose(np.exp(self.gaussian.logpdf([20, 30])),\
+         self.gaussian.pdf([20, 30])), 'logpdf does not match pdf')
+
+    def test_cdf(self):
+        self.assertEqual(self.gaussian.cdf(25), 0.5)
+        self.assertEqual([round(p, 5) for p in self.gaussian.cdf(np.array([23, 27]))],\
+         [0.15866, 0.84134], 'cdf function does not give expected result')
+
     def test_add(self):
         gaussian_one = Gaussian(25, 3)
         gaussian_two = Gaussian(30, 4)
@@ -46,6 +64,7 @@ class TestGaussianClass(unittest.TestCase):
         self.assertEqual(gaussian_sum.mean, 55)
         self.assertEqual(gaussian_sum.stdev, 5)
         
+@unittest.skipIf(Binomial is None, 'Binomialdistribution.py is not in the distributions package yet')
 class TestBinomialClass(unittest.TestCase):
     def setUp(self):
         self.binomial = Binomial(0.4, 20)
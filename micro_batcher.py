@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND-revision/intropyproject-classify-pet-images/micro_batcher.py
+#
+# PROGRAMMER: Chaklader A. Arefe
+# DATE CREATED: 10/18/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Coalesces concurrent requests into micro-batches. Callers submit
+#          single items from any thread and get a Future back, a background
+#          thread collects the pending items into a batch until it holds
+#          max_batch_size items or max_wait seconds have passed since its first
+#          item, then processes the whole batch with one call (ex. one forward
+#          pass) and resolves every item's Future with its own result. Used by
+#          the classification server and the asyncio API.
+##
+
+import queue
+import threading
+from concurrent.futures import Future
+from time import monotonic
+
+class MicroBatcher:
+    """
+    Batches items submitted concurrently and processes them together.
+    Attributes:
+     process_batch - Function called with a list of items that returns the
+                     list of their results, in the same order
+     max_batch_size - Largest number of items processed together (int)
+     max_wait - Longest time (seconds) the first item of a batch waits for
+                more items to arrive (float)
+     n_batches - Number of batches processed so far (int)
+     n_items - Number of items processed so far (int)
+    """
+
+    def __init__(self, process_batch, max_batch_size=32, max_wait=0.005, name=None):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1, got {}".format(max_batch_size))
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.n_batches = 0
+        self.n_items = 0
+        self.pending = queue.Queue()
+        self.closed = False
+        self.thread = threading.Thread(target=self.run, name=name, daemon=True)
+        self.thread.start()
+
+    def submit(self, item):
+        """Queues an item, returns the Future of its result."""
+        if self.closed:
+            raise RuntimeError("MicroBatcher is closed")
+        future = Future()
+        self.pending.put((item, future))
+        return future
+
+    def __call__(self, item):
+        """Processes an item within a batch and returns its result (blocking)."""
+        return self.submit(item).result()
+
+    def next_batch(self):
+        """
+        Waits for the first pending item, then collects more until the batch
+        is full or the deadline has passed. Returns None once closed.
+        """
+        first = self.pending.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - monotonic()
+            try:
+                item = self.pending.get(timeout=remaining) if remaining > 0 \
+                    else self.pending.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # finish this batch, then stop
+                self.pending.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def run(self):
+        """Processes batches until closed (runs on the background thread)."""
+        while True:
+            batch = self.next_batch()
+            if batch is None:
+                return
+            # cancelled items are dropped
+            batch = [(item, future) for item, future in batch
+                     if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            items = [item for item, _ in batch]
+            futures = [future for _, future in batch]
+            try:
+                results = self.process_batch(items)
+            except Exception as error:
+                for future in futures:
+                    future.set_exception(error)
+                continue
+            self.n_batches += 1
+            self.n_items += len(items)
+            for future, result in zip(futures, results):
+                future.set_result(result)
+
+    def close(self):
+        """Processes the items already submitted, then stops the thread."""
+        if not self.closed:
+            self.closed = True
+            self.pending.put(None)
+            self.thread.join()
+
+    def stats(self):
+        """Returns the batch counters (dict)."""
+        return {
+            'n_batches': self.n_batches,
+            'n_items': self.n_items,
+            'mean_batch_size': self.n_items / self.n_batches if self.n_batches else 0.0
+        }
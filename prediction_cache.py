@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND-revision/intropyproject-classify-pet-images/prediction_cache.py
+#
+# PROGRAMMER: Chaklader A. Arefe
+# DATE CREATED: 10/18/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Persistent, content-addressed cache of classifier predictions so
+#          repeated runs over mostly unchanged image folders only run the model
+#          on new or changed images. Every prediction is stored in an SQLite
+#          file under the SHA-256 of the image's content together with a model
+#          key made from the architecture, the hash of its weights and the
+#          preprocessing configuration, so changing any of these misses the
+#          cache. The cache keeps at most max_entries predictions and evicts
+#          the least recently used ones beyond that.
+#
+# Use argparse Expected Call with <> indicating expected user input:
+#      python prediction_cache.py --cache_file <cache file> stats|prune|clear
+#             --max_entries <number of predictions kept by prune>
+#   Example call:
+#    python prediction_cache.py --cache_file .prediction_cache.sqlite stats
+##
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+from time import time
+
+# size of the chunks files are hashed in
+HASH_CHUNK = 1 << 20
+
+def topk_probabilities(topk, lse):
+    """
+    Converts cached (class index, logit) pairs and the log-sum-exp of all the
+    logits into (class index, softmax probability) pairs.
+    """
+    return [(class_idx, math.exp(logit - lse)) for class_idx, logit in topk]
+
+def file_digest(path):
+    """Returns the SHA-256 (hex string) of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class PredictionCache:
+    """
+    On-disk cache of predictions keyed by (image content hash, model key).
+    Every entry holds the predicted ImageNet class index, the top-k logits as
+    (class index, logit) pairs and the log-sum-exp over all logits.
+    Attributes:
+     path - The SQLite file holding the cache (string)
+     max_entries - Number of predictions kept, the least recently used ones
+                   beyond that are evicted when the cache is flushed (int)
+     hits - Number of lookups answered by the cache in this process (int)
+     misses - Number of lookups that had to run the model (int)
+    """
+
+    def __init__(self, path='.prediction_cache.sqlite', max_entries=100000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # lookups may come from the pipeline's producer thread
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS predictions (
+                image_hash TEXT NOT NULL,
+                model_key TEXT NOT NULL,
+                class_idx INTEGER NOT NULL,
+                topk TEXT NOT NULL,
+                lse REAL NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (image_hash, model_key));
+            CREATE INDEX IF NOT EXISTS predictions_last_used
+                ON predictions (last_used);
+            CREATE TABLE IF NOT EXISTS weights (
+                path TEXT PRIMARY KEY,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL,
+                digest TEXT NOT NULL);
+        """)
+
+    def weights_digest(self, path):
+        """
+        Returns the SHA-256 of a weights file. Hashing hundreds of megabytes
+        on every run is avoided by remembering the digest for the file's
+        mtime and size.
+        """
+        stat = os.stat(path)
+        row = self.connection.execute(
+            "SELECT digest FROM weights WHERE path = ? AND mtime = ? AND size = ?",
+            (os.path.abspath(path), stat.st_mtime, stat.st_size)).fetchone()
+        if row:
+            return row[0]
+
+        digest = file_digest(path)
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO weights VALUES (?, ?, ?, ?)",
+                (os.path.abspath(path), stat.st_mtime, stat.st_size, digest))
+            # other processes (workers, a server) may write to the same file
+            self.connection.commit()
+        return digest
+
+    def model_key(self, session, preprocess_config):
+        """
+        Returns the key identifying the predictions of a model: its
+        architecture, the hash of its weights and the preprocessing
+        configuration (ex. repr of the transforms), plus the inference
+        precision when it isn't fp32.
+        Parameters:
+         session - The InferenceSession making the predictions
+         preprocess_config - Text describing the preprocessing (string)
+        """
+        if session.weights_file:
+            weights = self.weights_digest(session.weights_file)
+        else:
+            weights = 'torchvision-pretrained'
+        preprocess = hashlib.sha256(preprocess_config.encode()).hexdigest()
+        key = '{}:{}:{}'.format(session.model_name, weights, preprocess)
+        if session.precision == 'fp32':
+            return key
+        return '{}:{}'.format(key, session.precision)
+
+    def get(self, image_hash, model_key, k=1):
+        """
+        Returns the cached (class_idx, topk, lse) prediction of an image or
+        None when there isn't one holding at least k logits, and counts the
+        hit or miss.
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT class_idx, topk, lse FROM predictions "
+                "WHERE image_hash = ? AND model_key = ?",
+                (image_hash, model_key)).fetchone()
+            if row is None or len(json.loads(row[1])) < k:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.connection.execute(
+                "UPDATE predictions SET last_used = ? "
+                "WHERE image_hash = ? AND model_key = ?",
+                (time(), image_hash, model_key))
+        class_idx, topk, lse = row
+        return class_idx, [tuple(pair) for pair in json.loads(topk)], lse
+
+    def put(self, image_hash, model_key, class_idx, topk, lse):
+        """Stores the prediction of an image (see get)."""
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?, ?, ?)",
+                (image_hash, model_key, class_idx, json.dumps(topk), lse, time()))
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+
+    def prune(self, max_entries=None):
+        """
+        Evicts the least recently used predictions until at most max_entries
+        (defaults to the cache's max_entries) remain. Returns how many
+        predictions were evicted.
+        """
+        max_entries = self.max_entries if max_entries is None else max_entries
+        n_evict = len(self) - max_entries
+        if n_evict <= 0:
+            return 0
+
+        self.connection.execute(
+            "DELETE FROM predictions WHERE rowid IN (SELECT rowid FROM predictions "
+            "ORDER BY last_used LIMIT ?)", (n_evict,))
+        self.connection.commit()
+        return n_evict
+
+    def clear(self):
+        """Removes every cached prediction."""
+        self.connection.execute("DELETE FROM predictions")
+        self.connection.commit()
+
+    def flush(self):
+        """Writes pending changes to disk and enforces the size cap."""
+        with self.lock:
+            self.connection.commit()
+            self.prune()
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+    def stats(self):
+        """Returns a dictionary describing the cache's content."""
+        n_entries, oldest, newest = self.connection.execute(
+            "SELECT COUNT(*), MIN(last_used), MAX(last_used) FROM predictions").fetchone()
+        models = self.connection.execute(
+            "SELECT model_key, COUNT(*) FROM predictions GROUP BY model_key").fetchall()
+        return {
+            'path': self.path,
+            'n_entries': n_entries,
+            'max_entries': self.max_entries,
+            'file_bytes': os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+            'oldest_used': oldest,
+            'newest_used': newest,
+            'models': dict(models)
+        }
+
+    def print_summary(self):
+        """Prints the hit/miss counters of this run."""
+        lookups = self.hits + self.misses
+        print("\n*** Prediction Cache {} ***".format(self.path))
+        print("{:20}: {:5d}".format('Hits', self.hits))
+        print("{:20}: {:5d}".format('Misses', self.misses))
+        if lookups:
+            print("{:20}: {:5.1f}%".format('Hit rate', 100.0 * self.hits / lookups))
+
+def main():
+    parser = argparse.ArgumentParser(description='inspect and prune the prediction cache')
+    parser.add_argument('command', choices=['stats', 'prune', 'clear'])
+    parser.add_argument('--cache_file', type=str, default='.prediction_cache.sqlite',
+                        help='file holding the prediction cache')
+    parser.add_argument('--max_entries', type=int, default=100000,
+                        help='number of predictions kept by prune')
+    in_arg = parser.parse_args()
+
+    cache = PredictionCache(in_arg.cache_file, in_arg.max_entries)
+    if in_arg.command == 'stats':
+        for key, value in cache.stats().items():
+            if key == 'models':
+                for model_key, count in value.items():
+                    print("{:20}: {} ({} entries)".format('model', model_key, count))
+            else:
+                print("{:20}: {}".format(key, value))
+    elif in_arg.command == 'prune':
+        print("Evicted {} predictions".format(cache.prune()))
+    else:
+        cache.clear()
+        print("Cleared {}".format(in_arg.cache_file))
+    cache.close()
+
+if __name__ == "__main__":
+    main()
@@ -4,15 +4,27 @@
 #                                                                             
 # PROGRAMMER: Jennifer S.                                                    
 # DATE CREATED: 05/14/2018                                  
-# REVISED DATE: 08/03/2024                      
+# REVISED DATE: 10/18/2026                      
 # PURPOSE: Functions for checking and validating the image classification code.
 #          Each function is designed to test a specific part of the classification
-#          process and print relevant statistics and comparisons.
+#          process and print relevant statistics and comparisons. The checks
+#          run in one of CHECK_MODES: 'full' checks every image and reuses the
+#          precomputed columnar summary (see
+#          calculates_results_stats.results_columns) instead of looping over
+#          the results again: the match listings read its flags and the
+#          statistics are recounted from them with NumPy reductions of their
+#          own (not calculates_results_stats_columns), 'sample' checks a
+#          random subset with the reference loops, 'off' skips the checks.
 ##
 
+import random
 from typing import Dict, List, Union, Optional
 from argparse import Namespace
 
+import numpy as np
+
+CHECK_MODES = ('off', 'sample', 'full')
+
 def print_header(title: str) -> None:
     """Print a formatted section header."""
     print(f"\n{title}")
@@ -57,13 +69,45 @@ def check_creating_pet_image_labels(results_dic: Optional[Dict[str, List[str]]])
         
     print_dict_preview(results_dic)
 
-def print_match_results(results_dic: Dict[str, List], match: bool = True) -> tuple:
+def sample_results(results_dic: Dict[str, List], keys: List[str]) -> Dict[str, List]:
+    """
+    Copy the entries of the sampled keys into a plain results dictionary, in
+    one pass over the sample.
+    
+    Args:
+        results_dic: Results dictionary (or ResultsStore)
+        keys: Keys of the sample, see sample_keys
+    
+    Returns:
+        dict: Results dictionary holding only the sample
+    """
+    return {key: results_dic[key] for key in keys}
+
+def sample_keys(results_dic: Dict[str, List], n_samples: int, seed: int = 0) -> List[str]:
+    """Pick n_samples random keys (all of them when there are fewer), in their order."""
+    keys = list(results_dic)
+    if n_samples >= len(keys):
+        return keys
+    rows = sorted(random.Random(seed).sample(range(len(keys)), n_samples))
+    return [keys[row] for row in rows]
+
+def match_column(results_dic: Dict[str, List]) -> np.ndarray:
+    """Read the match flags of a results dictionary (or ResultsStore) as a bool array."""
+    if hasattr(results_dic, 'column'):
+        return results_dic.column('match') == 1
+    return np.fromiter((values[2] for values in results_dic.values()), dtype=bool,
+                       count=len(results_dic))
+
+def print_match_results(results_dic: Dict[str, List], match: bool = True,
+                        columns: Optional[dict] = None) -> tuple:
     """
     Print matching or non-matching classification results.
     
     Args:
         results_dic: Results dictionary containing classification data
         match: If True, print matches; if False, print non-matches
+        columns: Optional columnar summary holding the 'match' flags, only
+                 the entries to print are read from results_dic
     
     Returns:
         tuple: Count of matches/non-matches
@@ -73,7 +117,13 @@ def print_match_results(results_dic: Dict[str, List], match: bool = True) -> tup
     print_header(header)
     
     match_value = 1 if match else 0
-    for key, values in results_dic.items():
+    if columns is None:
+        entries = results_dic.items()
+    else:
+        keys = list(results_dic)
+        rows = np.flatnonzero(columns['match'] == match).tolist()
+        entries = ((keys[row], results_dic[keys[row]]) for row in rows)
+    for key, values in entries:
         if values[2] == match_value:
             count += 1
             if len(values) >= 5:  # Full results including dog classification
@@ -84,56 +134,73 @@ def print_match_results(results_dic: Dict[str, List], match: bool = True) -> tup
     
     return count
 
-def check_classifying_images(results_dic: Optional[Dict[str, List]]) -> None:
+def check_classifying_images(results_dic: Optional[Dict[str, List]],
+                             columns: Optional[dict] = None) -> None:
     """
     Validate and print image classification results.
     
     Args:
         results_dic: Dictionary containing classification results
+        columns: Optional columnar summary, see print_match_results
     """
     if not results_dic or len(next(iter(results_dic.values()))) < 2:
         print("* Doesn't Check the Results Dictionary because 'classify_images' hasn't been defined.")
         return
         
-    n_match = print_match_results(results_dic, match=True)
-    n_notmatch = print_match_results(results_dic, match=False)
+    n_match = print_match_results(results_dic, True, columns)
+    n_notmatch = print_match_results(results_dic, False, columns)
     
     print(f"\n# Total Images {n_match + n_notmatch}, # Matches: {n_match}, "
           f"# NOT Matches: {n_notmatch}")
 
-def check_classifying_labels_as_dogs(results_dic: Optional[Dict[str, List]]) -> None:
+def check_classifying_labels_as_dogs(results_dic: Optional[Dict[str, List]],
+                                     columns: Optional[dict] = None) -> None:
     """
     Validate and print dog classification results.
     
     Args:
         results_dic: Dictionary containing dog classification results
+        columns: Optional columnar summary, see print_match_results
     """
     if not results_dic or len(next(iter(results_dic.values()))) < 4:
         print("* Doesn't Check the Results Dictionary because 'adjust_results4_isadog' hasn't been defined.")
         return
         
-    n_match = print_match_results(results_dic, match=True)
-    n_notmatch = print_match_results(results_dic, match=False)
+    n_match = print_match_results(results_dic, True, columns)
+    n_notmatch = print_match_results(results_dic, False, columns)
     
     print(f"\n# Total Images {n_match + n_notmatch}, # Matches: {n_match}, "
           f"# NOT Matches: {n_notmatch}")
 
-def calculate_statistics(results_dic: Dict[str, List]) -> dict:
+def calculate_statistics(results_dic: Dict[str, List], columns: Optional[dict] = None) -> dict:
     """
     Calculate classification statistics from results dictionary.
     
     Args:
         results_dic: Dictionary containing classification results
+        columns: Optional columnar summary with the 'match', 'is_dog' and
+                 'classified_as_dog' flags (bool arrays), recounted with
+                 reductions of this check instead of looping over results_dic
     
     Returns:
         dict: Calculated statistics
     """
     n_images = len(results_dic)
-    n_pet_dog = sum(1 for v in results_dic.values() if v[3] == 1)
+    if columns is None:
+        n_pet_dog = n_class_cdog = n_class_cnotd = n_match_breed = 0
+        # one pass over the rows
+        for v in results_dic.values():
+            n_pet_dog += v[3] == 1
+            n_class_cdog += v[3] == 1 and v[4] == 1
+            n_class_cnotd += v[3] == 0 and v[4] == 0
+            n_match_breed += v[2] == 1 and v[3] == 1 and v[4] == 1
+    else:
+        is_dog, as_dog = columns['is_dog'], columns['classified_as_dog']
+        n_pet_dog = int(np.count_nonzero(is_dog))
+        n_class_cdog = int(np.count_nonzero(is_dog & as_dog))
+        n_class_cnotd = int(np.count_nonzero(~is_dog & ~as_dog))
+        n_match_breed = int(np.count_nonzero(columns['match'] & is_dog & as_dog))
     n_pet_notd = n_images - n_pet_dog
-    n_class_cdog = sum(1 for v in results_dic.values() if v[3] == 1 and v[4] == 1)
-    n_class_cnotd = sum(1 for v in results_dic.values() if v[3] == 0 and v[4] == 0)
-    n_match_breed = sum(1 for v in results_dic.values() if v[2] == 1 and v[3] == 1 and v[4] == 1)
     
     return {
         'n_images': n_images,
@@ -159,13 +226,15 @@ def print_statistics(stats: dict, source: str) -> None:
               stats['pct_corr_dog'], stats['pct_corr_notdog'], stats['pct_corr_breed']))
 
 def check_calculating_results(results_dic: Optional[Dict[str, List]], 
-                            results_stats_dic: Optional[Dict[str, Union[int, float]]]) -> None:
+                            results_stats_dic: Optional[Dict[str, Union[int, float]]],
+                            columns: Optional[dict] = None) -> None:
     """
     Compare calculated statistics with provided statistics dictionary.
     
     Args:
         results_dic: Dictionary containing classification results
         results_stats_dic: Dictionary containing pre-calculated statistics
+        columns: Optional columnar summary, see calculate_statistics
     """
     if results_stats_dic is None:
         print("* Doesn't Check the Results Dictionary because 'calculates_results_stats' hasn't been defined.")
@@ -183,5 +252,5 @@ def check_calculating_results(results_dic: Optional[Dict[str, List]],
     print_statistics(provided_stats, "calculates_results_stats() function")
     
     # Calculate and print verification statistics
-    calc_stats = calculate_statistics(results_dic)
+    calc_stats = calculate_statistics(results_dic, columns)
     print_statistics(calc_stats, "function check")
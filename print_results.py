@@ -4,19 +4,22 @@
 #                                                                             
 # PROGRAMMER: Chaklader A. Arefe
 # DATE CREATED: 08/03/2024
-# REVISED DATE: 08/03/2024
+# REVISED DATE: 10/18/2026
 # PURPOSE: Create a function print_results that prints the results statistics
 #          from the results statistics dictionary (results_stats_dic). It 
 #          should also allow the user to be able to print out cases of misclassified
 #          dogs and cases of misclassified breeds of dog using the Results 
-#          dictionary (results_dic).  
+#          dictionary (results_dic). When several model architectures are
+#          compared in one run, print_results_comparison prints their
+#          statistics side by side. The dog/not-dog confusion matrix and the
+#          accuracy of every dog breed can be printed as well.
 ##
 
-def print_percentage_stats(results_stats_dic):
-    """Print percentage statistics from results."""
+def print_percentage_stats(results_stats_dic, show_topk=False):
+    """Print percentage statistics from results (pct_breed_in_topk with show_topk)."""
     print("\nModel Statistics:")
     for key, value in results_stats_dic.items():
-        if key.startswith('p'):
+        if key.startswith('p') and (show_topk or key != 'pct_breed_in_topk'):
             print("{:20}: {:.1f}%".format(key, value))
 
 def check_incorrect_dogs(results_stats_dic):
@@ -29,25 +32,53 @@ def check_incorrect_breeds(results_stats_dic):
     """Check if there are any incorrect breed classifications."""
     return results_stats_dic['n_correct_dogs'] != results_stats_dic['n_correct_breed']
 
-def display_incorrect_dogs(results_dic):
+def display_topk(values):
+    """Print the top-k predictions (idx 5) of a result, when it holds them."""
+    if len(values) > 5:
+        print("      top-k: " + ", ".join("{} ({:.1%})".format(label, prob)
+                                         for _, label, prob in values[5]))
+
+def display_incorrect_dogs(results_dic, show_topk=False):
     """Print cases where dogs/not-dogs were incorrectly classified."""
     print("\nINCORRECT Dog/NOT Dog Assignments:")
     for key, values in results_dic.items():
         # Check if exactly one of is_dog or classified_as_dog is True
-        if sum(values[3:]) == 1:
+        if sum(values[3:5]) == 1:
             print("Real: {:>26}   Classifier: {:>30}".format(values[0], values[1]))
+            if show_topk:
+                display_topk(values)
 
-def display_incorrect_breeds(results_dic):
+def display_incorrect_breeds(results_dic, show_topk=False):
     """Print cases where dog breeds were incorrectly classified."""
     print("\nINCORRECT Dog Breed Assignment:")
     for key, values in results_dic.items():
         # Both are dogs (sum == 2) but breeds don't match (idx 2 == 0)
-        if sum(values[3:]) == 2 and values[2] == 0:
+        if sum(values[3:5]) == 2 and values[2] == 0:
             print("Real: {:>26}   Classifier: {:>30}".format(values[0], values[1]))
+            if show_topk:
+                display_topk(values)
+
+def print_confusion_matrix(results_stats_dic):
+    """Print the dog/not-dog confusion matrix (pet image x classifier)."""
+    (dog_dog, dog_notdog), (notdog_dog, notdog_notdog) = results_stats_dic['confusion_matrix']
+    print("\nConfusion Matrix (rows: pet image, columns: classifier):")
+    print("{:20} {:>10} {:>10}".format('', 'Dog', 'Not Dog'))
+    print("{:20} {:10d} {:10d}".format('Dog', dog_dog, dog_notdog))
+    print("{:20} {:10d} {:10d}".format('Not Dog', notdog_dog, notdog_notdog))
+
+def print_breed_accuracy(results_stats_dic):
+    """Print the number of images and the accuracy of every dog breed."""
+    print("\nBreed Accuracy:")
+    print("{:30} {:>8} {:>8} {:>8}".format('Breed', 'Images', 'Correct', 'Pct'))
+    for breed, (n_images, n_correct, pct) in sorted(
+            results_stats_dic['breed_accuracy'].items()):
+        print("{:30} {:8d} {:8d} {:7.1f}%".format(breed, n_images, n_correct, pct))
 
 def print_results(results_dic, results_stats_dic, model, 
                  should_print_incorrect_dogs=False, 
-                 should_print_incorrect_breed=False):
+                 should_print_incorrect_breed=False,
+                 should_print_topk=False,
+                 should_print_breakdown=False):
     """
     Prints summary results on the classification and then prints incorrectly 
     classified dogs and incorrectly classified dog breeds if user indicates 
@@ -63,6 +94,8 @@ def print_results(results_dic, results_stats_dic, model,
                     idx 4 = 1/0 (int)  where 1 = Classifier classifies image 
                             'as-a' dog and 0 = Classifier classifies image  
                             'as-NOT-a' dog.
+                    idx 5 = top-k predictions (list) of (class index,
+                            classifier label, probability) tuples, optional
       results_stats_dic - Dictionary that contains the results statistics (either
                      a percentage or a count) where the key is the statistic's 
                      name (starting with 'pct' for percentage or 'n' for count)
@@ -74,6 +107,13 @@ def print_results(results_dic, results_stats_dic, model,
                            False doesn't print anything(default) (bool)  
       should_print_incorrect_breed - True prints incorrectly classified dog breeds
                             False doesn't print anything(default) (bool) 
+      should_print_topk - True prints the top-k predictions with their
+                            probabilities under every incorrect classification
+                            and pct_breed_in_topk
+                            False doesn't print them(default) (bool)
+      should_print_breakdown - True prints the dog/not-dog confusion matrix
+                            and the accuracy of every dog breed
+                            False doesn't print them(default) (bool)
     Returns:
            None - simply printing results.
     """
@@ -85,12 +125,58 @@ def print_results(results_dic, results_stats_dic, model,
     print("{:20}: {:3d}".format('N Not-Dog Images', results_stats_dic['n_notdogs_img']))
     
     # Print percentage statistics
-    print_percentage_stats(results_stats_dic)
+    print_percentage_stats(results_stats_dic, should_print_topk)
+    
+    if should_print_breakdown:
+        print_confusion_matrix(results_stats_dic)
+        if 'breed_accuracy' in results_stats_dic:
+            print_breed_accuracy(results_stats_dic)
     
     # Print incorrect dogs if requested and if there are any
     if should_print_incorrect_dogs and check_incorrect_dogs(results_stats_dic):
-        display_incorrect_dogs(results_dic)
+        display_incorrect_dogs(results_dic, should_print_topk)
         
     # Print incorrect breeds if requested and if there are any
     if should_print_incorrect_breed and check_incorrect_breeds(results_stats_dic):
-        display_incorrect_breeds(results_dic)
\ No newline at end of file
+        display_incorrect_breeds(results_dic, should_print_topk)
+
+def print_results_comparison(results_stats_by_model, inference_by_model=None,
+                             wall_by_model=None, should_print_topk=False):
+    """
+    Prints the results statistics of several CNN model architectures side by
+    side, one column per architecture, with each model's inference and
+    wall-clock time when they're given.
+    Parameters:
+      results_stats_by_model - Dictionary with the model architecture as 'key'
+                     and its results statistics dictionary (see print_results)
+                     as 'value'
+      inference_by_model - Dictionary with the model architecture as 'key' and
+                     the seconds spent in its forward passes as 'value'
+      wall_by_model - Dictionary with the model architecture as 'key' and the
+                     wall-clock seconds of its run as 'value'
+      should_print_topk - True also prints pct_breed_in_topk (bool)
+    Returns:
+           None - simply printing results.
+    """
+    model_names = list(results_stats_by_model)
+    row = "{:20}" + " {:>10}" * len(model_names)
+
+    print("\n\n*** Results Comparison of CNN Model Architectures ***")
+    print(row.format('', *(model.upper() for model in model_names)))
+
+    for key, name in (('n_images', 'N Images'), ('n_dogs_img', 'N Dog Images'),
+                      ('n_notdogs_img', 'N Not-Dog Images')):
+        print(row.format(name, *(results_stats_by_model[model][key]
+                                 for model in model_names)))
+
+    first = results_stats_by_model[model_names[0]]
+    for key in first:
+        if key.startswith('p') and (should_print_topk or key != 'pct_breed_in_topk'):
+            print(row.format(key, *("{:.1f}%".format(results_stats_by_model[model][key])
+                                    for model in model_names)))
+
+    for name, seconds_by_model in (('Inference (s)', inference_by_model),
+                                   ('Wall-clock (s)', wall_by_model)):
+        if seconds_by_model:
+            print(row.format(name, *("{:.2f}".format(seconds_by_model.get(model, 0.0))
+                                     for model in model_names)))
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND-revision/intropyproject-classify-pet-images/results_store.py
+#
+# PROGRAMMER: Chaklader A. Arefe
+# DATE CREATED: 10/18/2026
+# REVISED DATE: 10/18/2026
+# PURPOSE: Columnar, array-backed replacement of the results dictionary. The
+#          results dictionary holds one Python list per image that grows
+#          through extend calls, at a million images that's millions of small
+#          lists and boxed ints. ResultsStore keeps the same information in
+#          columns instead: the filenames, interned pet and classifier label
+#          ids and uint8 NumPy columns for match, is-dog and
+#          classified-as-dog (plus the top-k class ids and probabilities).
+#          It's also a read-only dictionary view with the exact 'key' and
+#          'value' layout of the results dictionary, so existing callers that
+#          read results_dic (print_results, the lab checks) keep working, while
+#          classify_images, adjust_results4_isadog and calculates_results_stats
+#          fill and read the columns directly.
+##
+
+from collections.abc import Mapping
+
+import numpy as np
+
+# value of the flag columns for images that haven't been classified yet
+UNSET = 255
+
+class LabelPool:
+    """
+    Interns label strings as small int ids so every label is stored once.
+    Attributes:
+     labels - The distinct labels, labels[label id] (list)
+     ids - Dictionary with the label as 'key' and its id as 'value' (dict)
+    """
+
+    def __init__(self):
+        self.labels = []
+        self.ids = {}
+
+    def intern(self, label):
+        """Returns the id of a label, adding the label when it's new."""
+        label_id = self.ids.get(label)
+        if label_id is None:
+            label_id = self.ids[label] = len(self.labels)
+            self.labels.append(label)
+        return label_id
+
+    def __len__(self):
+        return len(self.labels)
+
+class ResultsStore(Mapping):
+    """
+    Results of classifying the pet images, stored as columns (one entry per
+    image, in the order the images were added). Reading store[filename]
+    returns a list with the same layout as a results dictionary value at the
+    current stage: [pet label], then classifier label, match and top-k added
+    by classify_images, then is-dog and classified-as-dog inserted by
+    adjust_results4_isadog.
+    Attributes:
+     filenames - Image filenames, the 'keys' (list)
+     rows - Dictionary with the filename as 'key' and its row as 'value' (dict)
+     pool - LabelPool interning the pet and classifier labels
+     pet_label - Label id of every pet image label (NumPy int32 column)
+     classifier_label - Label id of every classifier label, -1 when the image
+                        hasn't been classified (NumPy int32 column)
+     match, is_dog, classified_as_dog - 1/0 flags as in the results dictionary,
+                        UNSET until set (NumPy uint8 columns)
+     topk_ids - Class ids of the top-k predictions, one row per image
+                (NumPy int16 array, None until predictions are set)
+     topk_probs - Probabilities of the top-k predictions (NumPy float32 array)
+     class_labels - Classifier label of every class id, used to show the top-k
+                    predictions (sequence of strings)
+    """
+
+    def __init__(self, capacity=1024):
+        self.filenames = []
+        self.rows = {}
+        self.pool = LabelPool()
+        self.size = 0
+        self.pet_label = np.zeros(capacity, dtype=np.int32)
+        self.classifier_label = np.full(capacity, -1, dtype=np.int32)
+        self.match = np.full(capacity, UNSET, dtype=np.uint8)
+        self.is_dog = np.full(capacity, UNSET, dtype=np.uint8)
+        self.classified_as_dog = np.full(capacity, UNSET, dtype=np.uint8)
+        self.topk_ids = None
+        self.topk_probs = None
+        self.class_labels = None
+
+    def column(self, name):
+        """Returns the filled part of a column (a view, no copy)."""
+        return getattr(self, name)[:self.size]
+
+    def grow(self, capacity):
+        """Grows every column to hold at least capacity rows (doubling)."""
+        old = len(self.pet_label)
+        if capacity <= old:
+            return
+        new = max(capacity, 2 * old)
+        for name, fill in (('pet_label', 0), ('classifier_label', -1), ('match', UNSET),
+                           ('is_dog', UNSET), ('classified_as_dog', UNSET),
+                           ('topk_ids', 0), ('topk_probs', 0)):
+            values = getattr(self, name)
+            if values is None:
+                continue
+            grown = np.full((new,) + values.shape[1:], fill, dtype=values.dtype)
+            grown[:old] = values
+            setattr(self, name, grown)
+
+    def add(self, filename, pet_label):
+        """Adds an image with its pet label, returns its row."""
+        row = self.rows.get(filename)
+        if row is not None:
+            print(f"** Warning: Duplicate files exist in directory: {filename}")
+            return row
+
+        row = self.size
+        self.grow(row + 1)
+        self.rows[filename] = row
+        self.filenames.append(filename)
+        self.pet_label[row] = self.pool.intern(pet_label)
+        self.size += 1
+        return row
+
+    def row_indexes(self, filenames):
+        """Returns the rows of the filenames (NumPy int array)."""
+        return np.fromiter((self.rows[filename] for filename in filenames),
+                           dtype=np.int64, count=len(filenames))
+
+    def set_predictions(self, filenames, classifier_labels, matches, topk_ids,
+                        topk_probs):
+        """
+        Stores what classify_images adds for some images: the classifier
+        labels (strings), the 1/0 matches and the top-k class ids and
+        probabilities (images x k arrays).
+        """
+        rows = self.row_indexes(filenames)
+        topk_ids = np.asarray(topk_ids)
+        k = topk_ids.shape[1]
+        if self.topk_ids is None or self.topk_ids.shape[1] < k:
+            # wider top-k columns, keeping the predictions already stored
+            widened_ids = np.zeros((len(self.pet_label), k), dtype=np.int16)
+            widened_probs = np.zeros((len(self.pet_label), k), dtype=np.float32)
+            if self.topk_ids is not None:
+                old_k = self.topk_ids.shape[1]
+                widened_ids[:, :old_k] = self.topk_ids
+                widened_probs[:, :old_k] = self.topk_probs
+            self.topk_ids = widened_ids
+            self.topk_probs = widened_probs
+        self.classifier_label[rows] = [self.pool.intern(label) for label in classifier_labels]
+        self.match[rows] = matches
+        self.topk_ids[rows, :k] = topk_ids
+        self.topk_probs[rows, :k] = topk_probs
+
+    def set_dog_flags(self, is_dog, classified_as_dog):
+        """Stores what adjust_results4_isadog adds, for all images (columns)."""
+        self.is_dog[:self.size] = is_dog
+        self.classified_as_dog[:self.size] = classified_as_dog
+
+    def topk(self, row):
+        """Returns the top-k (class index, label, probability) list of a row."""
+        labels = self.class_labels
+        return [(int(class_id), labels[class_id] if labels is not None else str(class_id),
+                 float(prob))
+                for class_id, prob in zip(self.topk_ids[row].tolist(),
+                                          self.topk_probs[row].tolist())]
+
+    def nbytes(self):
+        """Returns the bytes held by the NumPy columns."""
+        return sum(values.nbytes for values in (
+            self.pet_label, self.classifier_label, self.match, self.is_dog,
+            self.classified_as_dog, self.topk_ids, self.topk_probs) if values is not None)
+
+    def __getitem__(self, filename):
+        row = self.rows[filename]
+        labels = self.pool.labels
+        value = [labels[self.pet_label[row]]]
+        if self.classifier_label[row] >= 0:
+            value += [labels[self.classifier_label[row]], int(self.match[row])]
+            if self.is_dog[row] != UNSET:
+                value += [int(self.is_dog[row]), int(self.classified_as_dog[row])]
+            if self.topk_ids is not None:
+                value.append(self.topk(row))
+        return value
+
+    def __setitem__(self, filename, value):
+        """Adds an image from a results dictionary value holding its pet label."""
+        self.add(filename, value[0])
+
+    def __iter__(self):
+        return iter(self.filenames)
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, filename):
+        return filename in self.rows
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND-revision/intropyproject-classify-pet-images/sharded_classify.py
+#
+# PROGRAMMER: Chaklader A. Arefe
+# DATE CREATED: 10/18/2026
+# REVISED DATE: 10/18/2026
+# PURPOSE: Classifies the pet images with a pool of worker processes so the
+#          forward passes of several batches run on separate CPU cores. The
+#          (filename, pet label) entries are cut into shards of a few batches
+#          that are handed to the workers, every worker loads the models once
+#          and pins its PyTorch intra-op threads to its share of the cores so
+#          the workers don't oversubscribe the CPU. Each shard is classified
+#          with classify_images_multi inside the worker and the shards are
+#          merged back in their original order, so the results dictionaries
+#          (and the statistics calculated from them) are the same as those of
+#          a single process run.
+#          The workers don't need a copy of the weights each: with 'mmap'
+#          every worker memory-maps the local weights files (one copy in the
+#          page cache), with 'shared' the parent loads the weights once into
+#          shared memory and the workers attach to those tensors. Each worker
+#          reports its resident memory (from /proc/self/status) to show what
+#          it holds privately and what it shares.
+##
+
+import os
+from collections import deque
+from itertools import islice
+
+import torch
+import torch.multiprocessing
+
+from classifier import attach_model, get_session, models
+from class_table import get_class_table
+from classify_images import classify_images_multi
+from image_pipeline import PipelineTimer
+from prediction_cache import PredictionCache
+from results_store import ResultsStore
+
+# state of a worker process, set once by init_worker
+worker = {}
+
+# how the workers get the model weights
+weights_sharing_modes = ('none', 'mmap', 'shared')
+
+# fields of /proc/<pid>/status and smaps_rollup describing resident memory (kB)
+MEMORY_FIELDS = ('VmRSS', 'RssAnon', 'RssFile', 'RssShmem', 'Pss')
+
+def threads_per_worker(n_workers):
+    """Returns the intra-op threads of each worker: its share of the cores."""
+    return max(1, (os.cpu_count() or 1) // n_workers)
+
+def memory_status():
+    """
+    Returns the resident memory of this process (kB) by MEMORY_FIELDS name:
+    VmRSS is RssAnon (private) + RssFile (file pages, ex. memory-mapped
+    weights) + RssShmem (shared memory), Pss splits the shared pages between
+    the processes sharing them. Empty where /proc isn't available.
+    """
+    status = {}
+    for path in ('/proc/self/status', '/proc/self/smaps_rollup'):
+        try:
+            with open(path) as f:
+                for line in f:
+                    name, _, value = line.partition(':')
+                    if name in MEMORY_FIELDS and name not in status:
+                        status[name] = int(value.split()[0])
+        except OSError:
+            pass
+    return status
+
+def shared_state_dicts(model_names):
+    """
+    Loads the models once in this process and moves their weights to shared
+    memory. Returns the state dicts by model architecture, passed to spawned
+    workers they attach to the same memory instead of copying it.
+    """
+    state_dicts = {}
+    for model in model_names:
+        models[model].share_memory()
+        state_dicts[model] = models[model].state_dict()
+    return state_dicts
+
+def init_worker(model_names, weights_dir, n_threads, settings, weights_sharing='none',
+                state_dicts=None):
+    """
+    Prepares a worker process: pins its PyTorch threads, loads every model
+    once and opens its own connection to the prediction cache. The weights are
+    memory-mapped with weights_sharing 'mmap' and attached from state_dicts
+    (shared memory tensors) with 'shared'.
+    """
+    torch.set_num_threads(n_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # already set (ex. by a forked parent)
+        pass
+    models.weights_dir = weights_dir
+    models.mmap = weights_sharing == 'mmap'
+    models.scripted = settings['scripted']
+    for model in model_names:
+        if state_dicts:
+            models[model] = attach_model(model, state_dicts[model])
+        get_session(model, settings['precision'])
+
+    worker['model_names'] = model_names
+    worker['settings'] = settings
+    worker['cache'] = None
+    if settings['cache_file']:
+        worker['cache'] = PredictionCache(settings['cache_file'], settings['cache_size'])
+
+def classify_shard(shard):
+    """
+    Classifies a shard of (filename, pet label) entries in a worker process.
+    Returns the classifier label, match and top-k predictions of every image
+    by model architecture (lists in the shard's order), the worker's timings,
+    its cache hits and misses and its (pid, memory_status()).
+    """
+    settings = worker['settings']
+    cache = worker['cache']
+    hits, misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+    results_by_model = {model: {} for model in worker['model_names']}
+    timer = PipelineTimer()
+    classify_images_multi(settings['images_dir'], results_by_model,
+                          settings['batch_size'], settings['decode_workers'],
+                          settings['prefetch'], 'thread', timer, cache,
+                          settings['topk'], shard, precision=settings['precision'],
+                          draft_scale=settings['draft_scale'])
+
+    predictions = {model: [results_dic[key][1:] for key, _ in shard]
+                   for model, results_dic in results_by_model.items()}
+    timings = (timer.decode, timer.wait, timer.inference_by_model, timer.n_images,
+               timer.first_prediction, timer.image_ns)
+    if cache is not None:
+        hits, misses = cache.hits - hits, cache.misses - misses
+    return predictions, timings, (hits, misses), (os.getpid(), memory_status())
+
+def classify_images_sharded(images_dir, results_by_model, n_workers, batch_size=32,
+                            decode_workers=1, prefetch=2, timer=None, cache=None,
+                            topk=5, entries=None, on_batch=None, shard_size=None,
+                            weights_sharing='none', precision='fp32',
+                            draft_scale=0):
+    """
+    Classifies the pet images like classify_images_multi (see
+    classify_images.py) with n_workers worker processes.
+    Parameters:
+     images_dir - The (full) path to the folder of images that are to be
+                 classified by the classifier function (string)
+     results_by_model - Dictionary with the model architecture (string) as
+                 'key' and that model's results dictionary (or ResultsStore)
+                 as 'value', filled exactly as by classify_images_multi
+     n_workers - Number of worker processes (int)
+     batch_size, prefetch, timer, topk, entries, on_batch, precision,
+     draft_scale - See classify_images_multi, on_batch gets each shard's
+                 predictions in the original order of the images
+     decode_workers - Number of threads decoding images inside each worker (int)
+     cache - Optional PredictionCache, every worker opens its own connection
+                 to the same cache file
+     shard_size - Number of images per shard, defaults to 4 batches (int)
+     weights_sharing - How the workers get the weights, values must be either:
+                 none (each worker loads its own copy), mmap (memory-mapped
+                 local weights files), shared (loaded once by this process
+                 into shared memory) (string)
+    Returns:
+     worker_memory - Dictionary with each worker's pid as 'key' and its
+                 memory_status() after its last shard as 'value'
+    """
+    if n_workers < 1:
+        raise ValueError("n_workers must be at least 1, got {}".format(n_workers))
+    if weights_sharing not in weights_sharing_modes:
+        raise ValueError("Unknown weights sharing '{}', values must be either: "
+                         "{}".format(weights_sharing, ' '.join(weights_sharing_modes)))
+    shard_size = shard_size or 4 * batch_size
+    if entries is None:
+        entries = [(key, value[0]) for key, value
+                   in next(iter(results_by_model.values())).items()]
+
+    def shards():
+        """Yields the shards, adding the pet labels of their images to the results."""
+        entries_iter = iter(entries)
+        for shard in iter(lambda: list(islice(entries_iter, shard_size)), []):
+            for key, pet_label in shard:
+                for results_dic in results_by_model.values():
+                    if key not in results_dic:
+                        results_dic[key] = [pet_label]
+            yield shard
+
+    settings = {
+        'images_dir': images_dir,
+        'batch_size': batch_size,
+        'decode_workers': decode_workers,
+        'prefetch': prefetch,
+        'topk': topk,
+        'precision': precision,
+        'draft_scale': draft_scale,
+        'scripted': models.scripted,
+        'cache_file': cache.path if cache is not None else None,
+        'cache_size': cache.max_entries if cache is not None else 0
+    }
+    if cache is not None:
+        # let the workers see everything this process wrote
+        cache.flush()
+
+    state_dicts = None
+    if weights_sharing == 'shared':
+        state_dicts = shared_state_dicts(results_by_model)
+
+    # spawned workers don't inherit the parent's OpenMP/thread pool state,
+    # torch's context passes shared memory tensors without copying them
+    context = torch.multiprocessing.get_context('spawn')
+    predictions_by_model = {model: [] for model in results_by_model}
+    keys = []
+    worker_memory = {}
+    with context.Pool(n_workers, initializer=init_worker,
+                      initargs=(list(results_by_model), models.weights_dir,
+                                threads_per_worker(n_workers), settings,
+                                weights_sharing, state_dicts)) as pool:
+        # shards handed back in their original order, at most two per worker
+        # submitted at a time
+        for shard, (predictions, timings, (hits, misses), (pid, memory)) in zip_shards(
+                pool, shards(), 2 * n_workers):
+            worker_memory[pid] = memory
+            shard_keys = [key for key, _ in shard]
+            keys.extend(shard_keys)
+            for model, shard_predictions in predictions.items():
+                predictions_by_model[model].extend(shard_predictions)
+                if on_batch is not None:
+                    on_batch(model, shard_keys, [topk for _, _, topk in shard_predictions])
+
+            if timer is not None:
+                (decode, wait, inference_by_model, n_images, first_prediction,
+                 image_ns) = timings
+                if first_prediction is not None and (timer.first_prediction is None or
+                                                     first_prediction < timer.first_prediction):
+                    timer.first_prediction = first_prediction
+                timer.decode += decode
+                timer.wait += wait
+                timer.n_images += n_images
+                for model, seconds in inference_by_model.items():
+                    timer.add_inference(model, seconds)
+                timer.image_ns.update(image_ns)
+            if cache is not None:
+                cache.hits += hits
+                cache.misses += misses
+
+    merge_predictions(results_by_model, keys, predictions_by_model)
+    return worker_memory
+
+def print_worker_memory(worker_memory):
+    """Prints the resident memory of every worker and of this process (MB)."""
+    print("\n*** Resident Memory of the Workers (MB) ***")
+    print("{:12}".format('') + "".join(" {:>9}".format(name) for name in MEMORY_FIELDS))
+    rows = sorted(worker_memory.items()) + [('parent', memory_status())]
+    for name, memory in rows:
+        print("{:12}".format(str(name)) + "".join(
+            " {:9.1f}".format(memory[field] / 1024) if field in memory
+            else " {:>9}".format('-') for field in MEMORY_FIELDS))
+
+def zip_shards(pool, shards, window):
+    """
+    Yields (shard, result) pairs of the shards classified by the pool, in
+    order. The shards are pulled on the calling thread and at most window of
+    them are submitted (queued or being classified) at a time, so a large
+    input isn't queued all at once.
+    """
+    in_flight = deque()
+    for shard in shards:
+        in_flight.append((shard, pool.apply_async(classify_shard, (shard,))))
+        if len(in_flight) >= window:
+            shard, result = in_flight.popleft()
+            yield shard, result.get()
+    while in_flight:
+        shard, result = in_flight.popleft()
+        yield shard, result.get()
+
+def merge_predictions(results_by_model, keys, predictions_by_model):
+    """
+    Adds the classifier label, match and top-k predictions the workers made
+    (lists in the order of keys) to every model's results, the way
+    classify_images_multi does.
+    """
+    if not keys:
+        return
+    for model, results_dic in results_by_model.items():
+        predictions = predictions_by_model[model]
+        if isinstance(results_dic, ResultsStore):
+            results_dic.class_labels = get_class_table().labels
+            results_dic.set_predictions(
+                keys, [label for label, _, _ in predictions],
+                [match for _, match, _ in predictions],
+                [[class_id for class_id, _, _ in topk] for _, _, topk in predictions],
+                [[prob for _, _, prob in topk] for _, _, topk in predictions])
+            continue
+
+        for key, prediction in zip(keys, predictions):
+            results_dic[key].extend(prediction)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND-revision/intropyproject-classify-pet-images/stage_profiler.py
+#
+# PROGRAMMER: Chaklader A. Arefe
+# DATE CREATED: 10/18/2026
+# REVISED DATE: 10/18/2026
+# PURPOSE: Times the stages of check_images.py with the monotonic nanosecond
+#          clock (time.perf_counter_ns): listing the images and making their
+#          pet labels, decoding, preprocessing, the forward passes,
+#          adjust_results4_isadog, calculates_results_stats and print_results.
+#          Decode, preprocess and forward times come from the PipelineTimer
+#          (see image_pipeline.py), decode and preprocess are summed over the
+#          decode workers. The report adds the per-image latency percentiles
+#          (decode + preprocess + the image's share of its batch's forward
+#          passes), the throughput in images per second and the cold start
+#          (launch to first prediction), printed as a table or written as JSON
+#          with --profile.
+##
+
+import json
+from contextlib import contextmanager
+from time import perf_counter_ns
+
+import numpy as np
+
+from image_pipeline import process_start_time
+
+# stages in the order they run, get_pet_labels overlaps the classification
+STAGES = ('get_pet_labels', 'decode', 'preprocess', 'forward', 'adjust_results4_isadog',
+          'calculates_results_stats', 'print_results')
+PERCENTILES = (50, 95, 99)
+
+class StageProfiler:
+    """
+    Accumulates the time spent in each stage of a run.
+    Attributes:
+     start_ns - perf_counter_ns() when the run started (int)
+     stages - Dictionary with the stage name as 'key' and its [total
+              nanoseconds, number of calls] as 'value'
+    """
+
+    def __init__(self):
+        self.start_ns = perf_counter_ns()
+        self.stages = {}
+
+    def add(self, name, ns, calls=1):
+        """Adds the nanoseconds of calls of a stage."""
+        totals = self.stages.setdefault(name, [0, 0])
+        totals[0] += ns
+        totals[1] += calls
+
+    @contextmanager
+    def stage(self, name):
+        """Times the code within the with block as a call of a stage."""
+        start = perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add(name, perf_counter_ns() - start)
+
+    def timed(self, name, iterable):
+        """
+        Yields the items of iterable, timing the production of every item (ex.
+        the folder scanner of iter_pet_labels) as a call of a stage.
+        """
+        items = iter(iterable)
+        while True:
+            start = perf_counter_ns()
+            try:
+                item = next(items)
+            except StopIteration:
+                self.add(name, perf_counter_ns() - start, 0)
+                return
+            self.add(name, perf_counter_ns() - start)
+            yield item
+
+    def report(self, n_images, timer=None):
+        """
+        Returns the profile of the run so far (dict): the wall time, the
+        throughput, the total and per-image milliseconds and the calls of
+        every stage, the per-image latency percentiles and the cold start
+        (milliseconds, None before the first prediction).
+        Parameters:
+         n_images - Number of images of the run (int)
+         timer - Optional PipelineTimer of the classification
+        """
+        wall_ns = perf_counter_ns() - self.start_ns
+        stages = dict(self.stages)
+        latencies = np.array([], dtype=np.int64)
+        if timer is not None:
+            image_ns = np.array(list(timer.image_ns.values()), dtype=np.int64).reshape(-1, 3)
+            stages['decode'] = [int(image_ns[:, 0].sum()), len(image_ns)]
+            stages['preprocess'] = [int(image_ns[:, 1].sum()), len(image_ns)]
+            stages['forward'] = [int(timer.inference * 1e9), len(image_ns)]
+            latencies = image_ns.sum(axis=1)
+
+        names = [name for name in STAGES if name in stages]
+        names += [name for name in stages if name not in STAGES]
+        report = {
+            'n_images': n_images,
+            'wall_ms': wall_ns / 1e6,
+            'images_per_sec': n_images * 1e9 / wall_ns if wall_ns else 0.0,
+            'stages': {name: {'total_ms': stages[name][0] / 1e6,
+                              'ms_per_image': stages[name][0] / 1e6 / n_images if n_images
+                              else 0.0,
+                              'calls': stages[name][1]}
+                       for name in names},
+            'latency_ms': {},
+            'cold_start_ms': None
+        }
+        if timer is not None and timer.first_prediction is not None:
+            report['cold_start_ms'] = (timer.first_prediction - process_start_time()) * 1e3
+        if len(latencies):
+            report['latency_ms'] = {'p{}'.format(q): value / 1e6 for q, value in zip(
+                PERCENTILES, np.percentile(latencies, PERCENTILES).tolist())}
+            report['latency_ms'].update(mean=latencies.mean() / 1e6,
+                                        max=int(latencies.max()) / 1e6)
+        return report
+
+def print_profile(report):
+    """Prints a report of StageProfiler.report as a table."""
+    print("\n*** Profile of {} Images: {:.1f} ms Wall, {:.2f} Images/s ***".format(
+        report['n_images'], report['wall_ms'], report['images_per_sec']))
+    print("{:26} {:>12} {:>10} {:>7} {:>8}".format('stage', 'total ms', 'ms/image',
+                                                    'wall %', 'calls'))
+    for name, stage in report['stages'].items():
+        print("{:26} {:12.2f} {:10.3f} {:6.1f}% {:8d}".format(
+            name, stage['total_ms'], stage['ms_per_image'],
+            100.0 * stage['total_ms'] / report['wall_ms'] if report['wall_ms'] else 0.0,
+            stage['calls']))
+    if report['latency_ms']:
+        print("Per-image latency (ms): " + "  ".join(
+            "{} {:.2f}".format(name, value) for name, value in report['latency_ms'].items()))
+    print("(decode and preprocess are summed over the decode workers)")
+
+def write_profile(report, path):
+    """Writes a report of StageProfiler.report to a JSON file."""
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print("\nProfile written to {}".format(path))
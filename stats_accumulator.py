@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND-revision/intropyproject-classify-pet-images/stats_accumulator.py
+#
+# PROGRAMMER: Chaklader A. Arefe
+# DATE CREATED: 10/18/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Incremental version of calculates_results_stats for long running
+#          jobs. A StatsAccumulator holds the counts of the results statistics
+#          and is updated with every batch of predictions as it's classified,
+#          so the percentages are available at any time instead of only once
+#          every image has been classified. Accumulators of different workers
+#          or shards of the images combine with merge(). score_predictions
+#          turns a batch of top-k predictions into the match, is-dog and
+#          classified-as-dog flags with the same rules as classify_images and
+#          adjust_results4_isadog. RollingStats plugs accumulators into
+#          classify_images_multi's on_batch callback and prints the running
+#          pct_match and pct_correct_dogs every N images.
+##
+
+import numpy as np
+
+from class_table import get_class_table
+from calculates_results_stats import add_percentages, calculates_results_stats_columns
+
+# the counts the percentages of calculates_results_stats are derived from
+COUNT_KEYS = ('n_dogs_img', 'n_match', 'n_correct_dogs', 'n_correct_notdogs',
+              'n_correct_breed', 'n_images')
+
+def score_predictions(table, dog_names, pet_labels, predictions, dog_in_topk=False,
+                      min_confidence=0.0):
+    """
+    Returns the match, is-dog and classified-as-dog flags of a batch of images
+    (NumPy bool arrays).
+    Parameters:
+     table - ClassTable built with the dog names (see class_table.py)
+     dog_names - DogNameIndex the pet labels are looked up in
+     pet_labels - Pet image label of every image (sequence of strings)
+     predictions - Top-k predictions of every image, lists of (class index,
+                   classifier label, probability) tuples, most probable first
+     dog_in_topk, min_confidence - See adjust_results4_isadog
+    """
+    n_candidates = None if dog_in_topk else 1
+    pred_ids = [topk[0][0] for topk in predictions]
+    topk_ids = [[class_id for class_id, _, _ in topk[:n_candidates]] for topk in predictions]
+    topk_probs = [[prob for _, _, prob in topk[:n_candidates]] for topk in predictions]
+    return (table.matches(pet_labels, pred_ids) == 1,
+            np.fromiter((label in dog_names for label in pet_labels),
+                        dtype=bool, count=len(pet_labels)),
+            table.classified_as_dog(topk_ids, topk_probs, min_confidence) == 1)
+
+class StatsAccumulator:
+    """
+    Running counts of the results statistics (see calculates_results_stats).
+    Attributes:
+     counts - Dictionary with the name of every count in COUNT_KEYS as 'key'
+              and its value so far as 'value'
+    """
+
+    def __init__(self):
+        self.counts = dict.fromkeys(COUNT_KEYS, 0)
+
+    def update(self, match, is_dog, classified_as_dog):
+        """
+        Adds a batch of images given as match, is-dog and classified-as-dog
+        flags (NumPy bool arrays, one entry per image).
+        """
+        batch = calculates_results_stats_columns(match, is_dog, classified_as_dog)
+        for key in COUNT_KEYS:
+            self.counts[key] += batch[key]
+        return self
+
+    def merge(self, other):
+        """Adds the counts of another accumulator (ex. of another shard)."""
+        for key in COUNT_KEYS:
+            self.counts[key] += other.counts[key]
+        return self
+
+    def stats(self):
+        """
+        Returns the results statistics so far, with the same count and pct_*
+        keys as calculates_results_stats.
+        """
+        return add_percentages(dict(self.counts))
+
+    def __len__(self):
+        return self.counts['n_images']
+
+class RollingStats:
+    """
+    on_batch callback of classify_images_multi (see classify_images.py) that
+    keeps a StatsAccumulator per model architecture and prints its running
+    pct_match and pct_correct_dogs every print_every images.
+    Attributes:
+     accumulators - Dictionary with the model architecture as 'key' and its
+                    StatsAccumulator as 'value'
+    """
+
+    def __init__(self, results_by_model, dog_names, print_every, dog_in_topk=False,
+                 min_confidence=0.0):
+        self.results_by_model = results_by_model
+        self.dog_names = dog_names
+        self.table = get_class_table(dog_names)
+        self.print_every = print_every
+        self.dog_in_topk = dog_in_topk
+        self.min_confidence = min_confidence
+        self.accumulators = {model: StatsAccumulator() for model in results_by_model}
+        self.next_print = dict.fromkeys(results_by_model, print_every)
+
+    def __call__(self, model, filenames, predictions):
+        results_dic = self.results_by_model[model]
+        pet_labels = [results_dic[filename][0] for filename in filenames]
+        accumulator = self.accumulators[model]
+        accumulator.update(*score_predictions(self.table, self.dog_names, pet_labels,
+                                              predictions, self.dog_in_topk,
+                                              self.min_confidence))
+        if len(accumulator) >= self.next_print[model]:
+            self.print_stats(model)
+            self.next_print[model] = (len(accumulator) // self.print_every + 1) * self.print_every
+
+    def print_stats(self, model):
+        """Prints the running statistics of a model architecture."""
+        stats = self.accumulators[model].stats()
+        print("{:>8d} images {:>8}: pct_match {:5.1f}%  pct_correct_dogs {:5.1f}%".format(
+            stats['n_images'], model.upper(), stats['pct_match'], stats['pct_correct_dogs']))
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND-revision/intropyproject-classify-pet-images/tensor_cache.py
+#
+# PROGRAMMER: Chaklader A. Arefe
+# DATE CREATED: 10/18/2026
+# REVISED DATE: 10/18/2026
+# PURPOSE: Cache of preprocessed image tensors for repeated evaluation runs
+#          (ex. several weights checkpoints or architectures over the same
+#          images). The (3 x 224 x 224) float32 tensors are kept as the rows of
+#          one memory-mapped array file, tensors.bin, next to a filename index,
+#          index.json, that maps every image's path to its row, mtime and size.
+#          Later runs read their batches straight from the mapping: no
+#          decoding, and batches of consecutive rows are views of the mapping
+#          (no copies). The paths are looked up as they stream in and the
+#          batches keep their order, only the missing images of a batch are
+#          decoded (on the decode pipeline, see image_pipeline.py). An image
+#          whose mtime or size changed is decoded again into its row, the rows
+#          of deleted images are freed for new ones when the cache is closed
+#          and changing the preprocessing (see classifier.preprocess_config,
+#          the normalization included) empties the cache. A cache belongs to
+#          one process at a time.
+##
+
+import json
+import os
+from itertools import islice
+
+import numpy as np
+import torch
+
+from classifier import preprocess_config
+from image_pipeline import PipelineTimer, decode_jobs
+
+ROW_SHAPE = (3, 224, 224)
+ROW_BYTES = int(np.prod(ROW_SHAPE)) * np.dtype(np.float32).itemsize
+
+class TensorCache:
+    """
+    Memory-mapped cache of preprocessed image tensors.
+    Attributes:
+     cache_dir - Folder of the array file and its index (string)
+     config - Preprocessing the cached tensors were made with (string)
+     rows - Number of rows of the array file in use (int)
+     images - Dictionary with the image's absolute path as 'key' and its
+              [row, mtime (ns), size] as 'value'
+     free_rows - Rows below rows that no image uses, filled first (list)
+     hits, misses - Images read from the cache and images decoded (int)
+     freed - Rows of deleted images freed by prune (int)
+    """
+
+    def __init__(self, cache_dir='.tensor_cache'):
+        self.cache_dir = cache_dir
+        self.data_path = os.path.join(cache_dir, 'tensors.bin')
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        os.makedirs(cache_dir, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self.freed = 0
+
+        self.config = None
+        self.rows = 0
+        self.images = {}
+        if os.path.isfile(self.index_path):
+            with open(self.index_path) as f:
+                index = json.load(f)
+            self.config, self.rows, self.images = (index['config'], index['rows'],
+                                                   index['images'])
+
+        self.array = None
+        self.capacity = 0
+        if os.path.isfile(self.data_path):
+            self.map(os.path.getsize(self.data_path) // ROW_BYTES)
+        if self.rows > self.capacity:
+            # index ahead of a truncated array file
+            self.reset(self.config)
+        used = {row for row, _, _ in self.images.values()}
+        self.free_rows = [row for row in range(self.rows - 1, -1, -1) if row not in used]
+
+    def map(self, capacity):
+        """Memory-maps the array file with room for capacity rows."""
+        if self.array is not None:
+            self.array.flush()
+        with open(self.data_path, 'r+b' if os.path.isfile(self.data_path) else 'w+b') as f:
+            if capacity * ROW_BYTES > os.fstat(f.fileno()).st_size:
+                f.truncate(capacity * ROW_BYTES)
+        self.capacity = capacity
+        self.array = (np.memmap(self.data_path, np.float32, 'r+', shape=(capacity,) + ROW_SHAPE)
+                      if capacity else None)
+
+    def reset(self, config):
+        """Empties the cache, its tensors are made with config from now on."""
+        self.config = config
+        self.rows = 0
+        self.images = {}
+        self.free_rows = []
+
+    def lookup(self, img_path):
+        """
+        Returns the row of an image when its tensor is cached and the image is
+        unchanged (same mtime and size), None otherwise.
+        """
+        entry = self.images.get(os.path.abspath(img_path))
+        if entry is None:
+            return None
+        row, mtime, size = entry
+        stat = os.stat(img_path)
+        return row if (stat.st_mtime_ns, stat.st_size) == (mtime, size) else None
+
+    def store(self, img_paths, batch):
+        """
+        Writes a batch of preprocessed images into their rows (their old row,
+        a freed one or a new one), a path repeated within the batch is stored
+        once. Returns the row of every path of img_paths (list).
+        """
+        keys = [os.path.abspath(img_path) for img_path in img_paths]
+        # first index within the batch and row of every distinct image
+        unique = {}
+        for index, key in enumerate(keys):
+            if key in unique:
+                continue
+            if key in self.images:
+                row = self.images[key][0]
+            elif self.free_rows:
+                row = self.free_rows.pop()
+            else:
+                row = self.rows
+                self.rows += 1
+            unique[key] = (index, row)
+        if self.rows > self.capacity:
+            self.map(max(self.rows, 2 * self.capacity, 64))
+
+        indexes, rows = zip(*unique.values())
+        self.array[list(rows)] = batch.numpy()[list(indexes)]
+        # the index entry last: a path found by lookup has its tensor written
+        for key, (index, row) in unique.items():
+            stat = os.stat(img_paths[index])
+            self.images[key] = [row, stat.st_mtime_ns, stat.st_size]
+        return [unique[key][1] for key in keys]
+
+    def read(self, rows):
+        """Returns the tensors of rows as a batch, a view when they're consecutive."""
+        if rows[-1] - rows[0] == len(rows) - 1:
+            return torch.from_numpy(self.array[rows[0]:rows[-1] + 1])
+        return torch.from_numpy(self.array[rows])
+
+    def prune(self):
+        """Frees the rows of the cached images that no longer exist."""
+        for key in [key for key in self.images if not os.path.exists(key)]:
+            self.free_rows.append(self.images.pop(key)[0])
+            self.freed += 1
+
+    def iter_batches(self, img_paths, batch_size=32, workers=4, prefetch=2,
+                     backend='thread', timer=None, normalized=True, draft_scale=0):
+        """
+        Yields the images of img_paths as preprocessed batches, in order, like
+        image_pipeline.iter_batches (same parameters). The paths are looked up
+        as they're consumed, the batches that are fully cached are read from
+        the mapping and only the missing (or changed) images of the others
+        are decoded and stored.
+        """
+        config = "{} normalized={}".format(preprocess_config(draft_scale), normalized)
+        if config != self.config:
+            self.reset(config)
+        timer = timer or PipelineTimer()
+        paths = iter(img_paths)
+
+        def jobs():
+            """Yields every batch with its rows (None when missing) and its missing paths."""
+            for chunk in iter(lambda: list(islice(paths, batch_size)), []):
+                rows = [self.lookup(img_path) for img_path in chunk]
+                yield (chunk, rows), [img_path for img_path, row in zip(chunk, rows)
+                                      if row is None]
+
+        for (chunk, rows), result in decode_jobs(jobs(), workers, prefetch, backend, timer,
+                                                 normalized, draft_scale):
+            missing = [index for index, row in enumerate(rows) if row is None]
+            self.hits += len(chunk) - len(missing)
+            self.misses += len(missing)
+            image_ns = [(0, 0)] * len(chunk)
+            if result is None:
+                batch = self.read(rows)
+            else:
+                decoded, _, decoded_ns = result
+                stored = self.store([chunk[index] for index in missing], decoded)
+                for index, row, ns in zip(missing, stored, decoded_ns):
+                    rows[index] = row
+                    image_ns[index] = ns
+                batch = decoded if len(missing) == len(chunk) else self.read(rows)
+            timer.n_images += len(chunk)
+            timer.add_images(chunk, image_ns)
+            yield chunk, batch
+
+    def flush(self):
+        """Writes the array file's pages and the index to disk."""
+        if self.array is not None:
+            self.array.flush()
+        index_tmp = self.index_path + '.tmp'
+        with open(index_tmp, 'w') as f:
+            json.dump({'config': self.config, 'rows': self.rows, 'images': self.images}, f)
+        os.replace(index_tmp, self.index_path)
+
+    def close(self):
+        self.prune()
+        self.flush()
+        self.array = None
+
+    def print_summary(self):
+        """Prints the hit/miss counters of this run."""
+        lookups = self.hits + self.misses
+        print("\n*** Tensor Cache {} ***".format(self.cache_dir))
+        print("{:20}: {:5d}".format('Hits', self.hits))
+        print("{:20}: {:5d}".format('Misses', self.misses))
+        if self.freed:
+            print("{:20}: {:5d}".format('Freed rows', self.freed))
+        if lookups:
+            print("{:20}: {:5.1f}%".format('Hit rate', 100.0 * self.hits / lookups))